@@ -0,0 +1,351 @@
+# #############################################################################
+#
+#  benchmark.py - reproducible benchmarks for sartopo_python hot paths
+#
+#   Times sync merges and deletions, cache queries, and geometry operations
+#    against synthetic maps served by sartopo_python.fake_server, in-process,
+#    with no network access needed.
+#
+#  usage:
+#     python benchmarks/benchmark.py [--profile quick|full] [--only <substring>]
+#                                    [--repeat <n>] [--output <file>]
+#
+#  Output is one JSON object per line (to stdout, or appended to --output), so
+#   that results from different releases can be collected and compared:
+#
+#     {"name": "getFeatures.title", "size": 10000, "repeat": 5, "min": 0.0123,
+#      "median": 0.0125, "mean": 0.0127, "version": "2.0.0", ...}
+#
+#   times are in seconds; 'size' is the number of features, or the number of
+#   points for the single-geometry benchmarks.
+#
+#  profiles:
+#   quick - small maps and tracks; runs in well under a minute
+#   full  - maps from 100 to 100k features, tracks up to 200k points
+#
+#  Benchmarks whose current implementation is known to be quadratic in the
+#   number of points are limited to smaller sizes (see CAPS below), so that
+#   a full run finishes in reasonable time.
+#
+#-----------------------------------------------------------------------------
+
+import argparse
+import base64
+import json
+import logging
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from sartopo_python import SartopoSession
+from sartopo_python.fake_server import FakeCalTopoServer
+
+PROFILES={
+    'quick':{
+        'mapSizes':[100,1000],
+        'trackSizes':[1000,10000],
+        'deltaSizes':[10,100]
+    },
+    'full':{
+        'mapSizes':[100,1000,10000,100000],
+        'trackSizes':[1000,10000,50000,200000],
+        'deltaSizes':[10,100,1000]
+    }
+}
+
+# maximum size for benchmarks that are quadratic in the current implementation
+CAPS={
+    '_fourify.scan':20000
+}
+
+CREDENTIAL_ID='BENCHMARK000'
+CREDENTIAL_KEY=base64.b64encode(b'sartopo_python benchmark key...').decode()
+
+
+def timeit(fn,repeat: int,setup=None) -> list:
+    """Run fn repeat times (calling setup before each run, untimed) and return the list of elapsed times in seconds."""
+    times=[]
+    for i in range(repeat):
+        arg=setup() if setup else None
+        t0=time.perf_counter()
+        if setup:
+            fn(arg)
+        else:
+            fn()
+        times.append(time.perf_counter()-t0)
+    return times
+
+
+class BenchmarkRunner():
+    def __init__(self,profile: str='quick',only: str=None,repeat: int=5,output: str=None):
+        self.profile=PROFILES[profile]
+        self.profileName=profile
+        self.only=only
+        self.repeat=repeat
+        self.output=output
+        self.meta={
+            'version':_packageVersion(),
+            'commit':_gitCommit(),
+            'python':platform.python_version(),
+            'platform':platform.platform(),
+            'profile':profile,
+            'timestamp':int(time.time())
+        }
+
+    def wanted(self,name: str) -> bool:
+        return not self.only or self.only in name
+
+    def report(self,name: str,size: int,times: list,**extra):
+        rec={'name':name,'size':size,'repeat':len(times),
+            'min':min(times),'median':statistics.median(times),'mean':statistics.mean(times)}
+        rec.update(extra)
+        self.write(rec)
+
+    def skip(self,name: str,size: int,reason: str):
+        self.write({'name':name,'size':size,'skipped':reason})
+
+    def write(self,rec: dict):
+        """Tag a result or skip record with the run metadata, print it, and append it to the output file, if any."""
+        rec.update(self.meta)
+        line=json.dumps(rec)
+        if self.output:
+            with open(self.output,'a') as f:
+                f.write(line+'\n')
+        print(line,flush=True)
+
+    def capped(self,name: str,size: int) -> bool:
+        cap=CAPS.get(name)
+        if cap and size>cap:
+            self.skip(name,size,'larger than the cap of '+str(cap)+' points for this benchmark')
+            return True
+        return False
+
+    # session and map construction
+
+    def newSession(self,server: FakeCalTopoServer,mapID: str) -> SartopoSession:
+        """Open a non-syncing session on the fake server, in-process; syncInterval is huge so that
+        getFeatures never triggers a refresh in the middle of a timed run."""
+        sts=SartopoSession('caltopo.com',id=CREDENTIAL_ID,key=CREDENTIAL_KEY,accountId=server.accountId,
+                sync=False,syncInterval=10**6)
+        server.mount(sts)
+        sts.openMap(mapID)
+        return sts
+
+    def newServer(self,features: int,**kwargs) -> tuple:
+        """Fake server with one map of roughly the specified number of features, mixed like a real incident map:
+        60% markers, 20% polygons, 10% lines, 10% assignments."""
+        server=FakeCalTopoServer(credentials={CREDENTIAL_ID:CREDENTIAL_KEY},seed=1)
+        mapID=server.addMap(title='Benchmark Map')
+        server.populate(mapID,
+                markers=int(features*0.6),
+                shapes=int(features*0.2),
+                lines=int(features*0.1),
+                assignments=features-int(features*0.6)-int(features*0.2)-int(features*0.1),
+                **kwargs)
+        return (server,mapID)
+
+    # benchmarks
+
+    def run(self):
+        for size in self.profile['mapSizes']:
+            (server,mapID)=self.newServer(size)
+            sts=self.newSession(server,mapID)
+            self.benchSync(server,mapID,sts,size)
+            self.benchQueries(sts,size)
+            self.benchMapGeometry(sts,size)
+        for points in self.profile['trackSizes']:
+            self.benchTrack(points)
+
+    def benchSync(self,server,mapID,sts,size):
+        if self.wanted('_doSync.initial'):
+            def initial():
+                s=SartopoSession('caltopo.com',id=CREDENTIAL_ID,key=CREDENTIAL_KEY,accountId=server.accountId,sync=False)
+                server.mount(s)
+                return s
+            self.report('_doSync.initial',size,timeit(lambda s: s.openMap(mapID),self.repeat,setup=initial))
+        features=server.getMapFeatures(mapID)
+        markers=[f for f in features if f['properties']['class']=='Marker']
+        # sync requests overlap the previous one by 500ms; let the map population fall outside
+        #  that window, so that the delta benchmarks only see the edits they made
+        time.sleep(0.6)
+        sts._doSync()
+        for delta in self.profile['deltaSizes']:
+            if delta>len(markers):
+                continue
+            if self.wanted('_doSync.properties'):
+                def editProps(n=[0]):
+                    n[0]+=1
+                    for f in markers[:delta]:
+                        server.editFeature(mapID,f['id'],'Marker',properties={'description':'edit '+str(n[0])})
+                self.report('_doSync.properties',size,timeit(lambda x: sts._doSync(),self.repeat,setup=editProps),delta=delta)
+            if self.wanted('_doSync.geometry'):
+                def editGeom(n=[0]):
+                    n[0]+=1
+                    for f in markers[:delta]:
+                        c=f['geometry']['coordinates']
+                        server.editFeature(mapID,f['id'],'Marker',geometry={'type':'Point','coordinates':[c[0]+n[0]*1e-5,c[1]]})
+                self.report('_doSync.geometry',size,timeit(lambda x: sts._doSync(),self.repeat,setup=editGeom),delta=delta)
+            if self.wanted('_doSync.deletions'):
+                def deleteSome():
+                    doomed=[f for f in server.getMapFeatures(mapID) if f['properties']['class']=='Marker'][:delta]
+                    for f in doomed:
+                        server.deleteFeature(mapID,f['id'],'Marker')
+                    # put them back afterwards, so that every run deletes the same number of features
+                    return doomed
+                def restore(doomed):
+                    for f in doomed:
+                        server.addFeature(mapID,f)
+                    sts._doSync()
+                times=[]
+                for i in range(self.repeat):
+                    doomed=deleteSome()
+                    t0=time.perf_counter()
+                    sts._doSync()
+                    times.append(time.perf_counter()-t0)
+                    restore(doomed)
+                self.report('_doSync.deletions',size,times,delta=delta)
+
+    def benchQueries(self,sts,size):
+        features=sts.mapData['state']['features']
+        marker=[f for f in features if f['properties']['class']=='Marker'][-1]
+        assignment=[f for f in features if f['properties']['class']=='Assignment'][-1]
+        if self.wanted('getFeatures.id'):
+            self.report('getFeatures.id',size,timeit(lambda: sts.getFeatures(id=marker['id']),self.repeat))
+        if self.wanted('getFeatures.title'):
+            self.report('getFeatures.title',size,timeit(lambda: sts.getFeatures(title=marker['properties']['title']),self.repeat))
+        if self.wanted('getFeatures.letter'):
+            self.report('getFeatures.letter',size,timeit(lambda: sts.getFeatures(featureClass='Assignment',title=assignment['properties']['letter'],letterOnly=True),self.repeat))
+        if self.wanted('getFeatures.class'):
+            self.report('getFeatures.class',size,timeit(lambda: sts.getFeatures(featureClass='Marker'),self.repeat))
+        if self.wanted('_getUsedSuffixList'):
+            self.report('_getUsedSuffixList',size,timeit(lambda: sts._getUsedSuffixList('P1'),self.repeat))
+
+    def benchMapGeometry(self,sts,size):
+        features=sts.mapData['state']['features']
+        shapes=[f for f in features if f['properties']['class']=='Shape' and f['geometry']['type']=='Polygon']
+        assignments=[f for f in features if f['properties']['class']=='Assignment']
+        if self.wanted('getBounds'):
+            self.report('getBounds',size,timeit(lambda: sts.getBounds(assignments),self.repeat))
+        if self.wanted('getMapExtent'):
+            self.report('getMapExtent',size,timeit(lambda: sts.getMapExtent(),self.repeat))
+        if self.wanted('getMeasurements'):
+            # cold: every feature is measured; warm: every measurement comes from the measurement cache
+            self.report('getMeasurements',size,timeit(lambda x: sts.getMeasurements(),self.repeat,setup=lambda: sts.measurementCache.clear()))
+            self.report('getMeasurements.cached',size,timeit(lambda: sts.getMeasurements(),self.repeat))
+        if self.wanted('classifyPoints'):
+            # full spatial join of markers into assignments, then with nothing changed since the last join
+            self.report('classifyPoints',size,timeit(lambda x: sts.classifyPoints(polygonClasses=['Assignment']),self.repeat,setup=lambda: sts.pointClassifiers.clear()))
+            self.report('classifyPoints.cached',size,timeit(lambda: sts.classifyPoints(polygonClasses=['Assignment']),self.repeat))
+        if self.wanted('analyzeCoverage'):
+            self.report('analyzeCoverage',size,timeit(lambda: sts.analyzeCoverage(boundary=shapes[0] if shapes else None),self.repeat),assignments=len(assignments))
+        if len(shapes)<2:
+            return
+        # geometry operations: each run works on a fresh pair of overlapping polygons,
+        #  so that the map (and the feature lookups) stay the same size from run to run
+        def pair():
+            a=sts.addPolygon([[-120,39],[-119.99,39],[-119.99,39.01],[-120,39.01],[-120,39]],title='benchTarget')
+            b=sts.addPolygon([[-120.005,39.005],[-119.995,39.005],[-119.995,39.015],[-120.005,39.015],[-120.005,39.005]],title='benchOther')
+            return (a,b)
+        def cleanup(ids):
+            cached=[f['id'] for f in sts.mapData['state']['features']]
+            sts.delFeatures([{'id':i,'class':'Shape'} for i in set(ids) if i in cached])
+        for (name,op) in [
+                ('cut',lambda p: sts.cut(p[0],p[1],deleteCutter=False)),
+                ('cut.parallel',lambda p: sts.cut(p[0],p[1],deleteCutter=False,parallel=True)),
+                ('cutMany',lambda p: sts.cutMany([p[0]],[p[1]],deleteCutters=False)[p[0]]),
+                ('expand',lambda p: sts.expand(p[0],p[1],deleteP2=False)),
+                ('crop',lambda p: sts.crop(p[0],p[1],beyond=0))]:
+            if not self.wanted(name):
+                continue
+            times=[]
+            for i in range(self.repeat):
+                p=pair()
+                t0=time.perf_counter()
+                rids=op(p)
+                times.append(time.perf_counter()-t0)
+                cleanup(list(p)+(rids if isinstance(rids,list) else []))
+            self.report(name,size,times)
+
+    def benchTrack(self,points):
+        server=FakeCalTopoServer(credentials={CREDENTIAL_ID:CREDENTIAL_KEY},seed=2)
+        mapID=server.addMap(title='Track Benchmark Map')
+        server.populate(mapID,tracks=1,trackPoints=points,spread=0)
+        sts=self.newSession(server,mapID)
+        track=sts.getFeature(title='Track0')
+        coords=track['geometry']['coordinates']
+        if self.wanted('_validatePoints'):
+            # vectorized classification, and the python loop that it replaces, for comparison
+            swapped=[[p[1],p[0]]+p[2:] for p in coords]
+            for (suffix,vectorize) in [('',True),('.loop',False)]:
+                self.report('_validatePoints'+suffix,points,timeit(lambda: sts._validatePoints(coords,modify=True,vectorize=vectorize),self.repeat))
+                self.report('_validatePoints.swapped'+suffix,points,timeit(lambda: sts._validatePoints(swapped,modify=True,vectorize=vectorize),self.repeat))
+        if self.wanted('_removeSpurs'):
+            self.report('_removeSpurs',points,timeit(lambda: sts._removeSpurs(coords),self.repeat))
+        if self.wanted('_removeDuplicatePoints'):
+            self.report('_removeDuplicatePoints',points,timeit(lambda: sts._removeDuplicatePoints(coords),self.repeat))
+        if self.wanted('_reduceGeometry'):
+            # simplification to 5 meters and rounding to 6 decimal places, as done for each request if enabled
+            (sts.simplifyTolerance,sts.coordinatePrecision)=(5,6)
+            geometry={'type':'LineString','coordinates':coords}
+            reduced=sts._reduceGeometry(geometry)
+            self.report('_reduceGeometry',points,timeit(lambda: sts._reduceGeometry(geometry),self.repeat),
+                    verticesAfter=len(reduced['coordinates']),bytesBefore=len(json.dumps(geometry)),bytesAfter=len(json.dumps(reduced)))
+            (sts.simplifyTolerance,sts.coordinatePrecision)=(0,None)
+        if self.wanted('getBounds.track'):
+            self.report('getBounds.track',points,timeit(lambda: sts.getBounds([track]),self.repeat))
+        # a boundary that covers the middle half of the track, so that crop produces
+        #  new endpoints that need to be fourified
+        xs=sorted(p[0] for p in coords)
+        ys=sorted(p[1] for p in coords)
+        (x0,x1,y0,y1)=(xs[len(xs)//4],xs[3*len(xs)//4],ys[0]-1,ys[-1]+1)
+        boundary=[[x0,y0],[x1,y0],[x1,y1],[x0,y1],[x0,y0]]
+        if self.wanted('_fourify'):
+            cropped=sts.crop(track,{'id':'b','properties':{'title':'b'},'geometry':{'type':'Polygon','coordinates':[boundary]}},beyond=0,noDraw=True)
+            if cropped:
+                two=[p[0:2] for p in max(cropped,key=len)]
+                self.report('_fourify',points,timeit(lambda pts: sts._fourify(pts,coords),self.repeat,setup=lambda: [list(p) for p in two]))
+                # the per-point scan of the original points that the index replaces, for comparison
+                if not self.capped('_fourify.scan',points):
+                    self.report('_fourify.scan',points,timeit(lambda pts: sts._fourify(pts,coords,indexed=False),self.repeat,setup=lambda: [list(p) for p in two]))
+        if self.wanted('crop.track') and not self.capped('crop.track',points):
+            b={'id':'b','properties':{'title':'b'},'geometry':{'type':'Polygon','coordinates':[boundary]}}
+            self.report('crop.track',points,timeit(lambda: sts.crop(track,b,beyond=0,noDraw=True),self.repeat))
+            # oversizing the boundary in meters, in a local projection
+            self.report('crop.track.meters',points,timeit(lambda: sts.crop(track,b,beyondMeters=10,noDraw=True),self.repeat))
+
+
+def _packageVersion() -> str:
+    # the version in the checked-out setup.py, i.e. of the tree being benchmarked (which is first on sys.path),
+    #  rather than of whatever sartopo_python distribution happens to be installed
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','setup.py')) as f:
+            m=re.search(r'''version\s*=\s*['"]([^'"]+)['"]''',f.read())
+        return m.group(1) if m else 'unknown'
+    except Exception:
+        return 'unknown'
+
+def _gitCommit() -> str:
+    try:
+        return subprocess.run(['git','rev-parse','--short','HEAD'],capture_output=True,text=True,
+                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or 'unknown'
+    except Exception:
+        return 'unknown'
+
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description='sartopo_python benchmarks')
+    parser.add_argument('--profile',choices=sorted(PROFILES.keys()),default='quick')
+    parser.add_argument('--only',default=None,help='only run benchmarks whose name contains this string')
+    parser.add_argument('--repeat',type=int,default=5)
+    parser.add_argument('--output',default=None,help='append JSON lines to this file as well as printing them')
+    args=parser.parse_args()
+    # the session logs every request and sync at INFO level, and some benchmarks deliberately
+    #  trigger warnings (e.g. swapped points); that is not what we want to measure
+    logging.getLogger().setLevel(logging.ERROR)
+    BenchmarkRunner(profile=args.profile,only=args.only,repeat=args.repeat,output=args.output).run()
@@ -0,0 +1,43 @@
+# #############################################################################
+#
+#  replay.py - replay the sync traffic of a recorded session, for performance
+#               comparison across versions of sartopo_python
+#
+#   Record a capture with SartopoSession(...,captureFile='incident.capture.gz'),
+#    then run this script against each version of the module to be compared.
+#
+#  usage:
+#     python benchmarks/replay.py <captureFile> [--speed <factor>] [--output <file>]
+#
+#  Output is one JSON object per sync (see sartopo_python.capture.replaySync),
+#   followed by one summary object with name 'replay.total'.
+#
+#-----------------------------------------------------------------------------
+
+import argparse
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0,os.path.abspath(os.path.join(os.path.dirname(__file__),'..')))
+
+from sartopo_python.capture import replaySync
+
+if __name__=='__main__':
+    parser=argparse.ArgumentParser(description='replay the sync traffic of a sartopo_python capture file')
+    parser.add_argument('capture')
+    parser.add_argument('--speed',type=float,default=None,help='replay at this multiple of the original speed; default is as fast as possible')
+    parser.add_argument('--output',default=None,help='append JSON lines to this file as well as printing them')
+    args=parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    stats=replaySync(args.capture,speed=args.speed)
+    total={'name':'replay.total','syncs':len(stats),
+        'cpu':sum(s['cpu'] for s in stats),
+        'wall':sum(s['wall'] for s in stats),
+        'peakMemory':max([s['peakMemory'] for s in stats],default=0)}
+    lines=[json.dumps(dict(s,name='replay.sync')) for s in stats]+[json.dumps(total)]
+    if args.output:
+        with open(args.output,'a') as f:
+            f.write('\n'.join(lines)+'\n')
+    print('\n'.join(lines))
@@ -0,0 +1,269 @@
+# #############################################################################
+#
+#  capture.py - record and replay sartopo_python HTTP traffic
+#
+#   developed for Nevada County Sheriff's Search and Rescue
+#
+#   A SartopoSession created with captureFile=<filename> writes every
+#    request/response pair that goes through ._sendRequest to a capture file.
+#    The capture can later be fed back to a SartopoSession, with no server,
+#    to compare the CPU time and memory used by each sync across versions of
+#    this module, using the exact sync traffic of a real incident.
+#
+#   Unlike syncDumpFile, which writes one indented json file per 'since'
+#    response, a capture is a single file with one compact json line per
+#    request (gzip-compressed if the filename ends in .gz), and it includes
+#    every request type, not just sync.
+#
+#   Credentials are never written to the capture: the 'id', 'expires', and
+#    'signature' request parameters are redacted.
+#
+#  www.github.com/ncssar/sartopo_python
+#
+############################################################
+#
+# EXAMPLES:
+#
+#  1. record a session:
+#
+#     sts=SartopoSession('caltopo.com','ABC1234',configpath='../../sts.ini',account='me',
+#           captureFile='incident.capture.gz')
+#
+#  2. replay its sync traffic as fast as possible, and print per-sync statistics:
+#
+#     from sartopo_python.capture import replaySync
+#     for s in replaySync('incident.capture.gz'):
+#         print(s)
+#
+#  3. replay at ten times the original speed:
+#
+#     replaySync('incident.capture.gz',speed=10)
+#
+#  Capture file format: one json object per line, with these keys:
+#
+#   t - request start time, integer milliseconds since the epoch
+#   m - request method: 'GET', 'POST', or 'DELETE'
+#   u - request URL, without query string
+#   p - request parameters (query string or form body), redacted; omitted if empty
+#   s - response status code
+#   e - response time, integer milliseconds
+#   b - response body text
+#
+#-----------------------------------------------------------------------------
+
+import re
+import gzip
+import json
+import time
+import logging
+import threading
+import collections
+import tracemalloc
+import urllib.parse
+import requests
+
+REDACTED_PARAMS=['id','expires','signature']
+
+# placeholder value used in place of redacted parameters; same as the log output of ._sendRequest
+REDACTED='.....'
+
+
+def _open(filename: str,mode: str):
+    if filename.lower().endswith('.gz'):
+        return gzip.open(filename,mode+'t',encoding='utf-8')
+    return open(filename,mode,encoding='utf-8')
+
+def normalizePath(url: str) -> str:
+    """Reduce a request URL to the part that identifies the request, for replay matching:
+    the path only (no scheme, host, or query string), with any 'since' timestamp replaced by '*'.
+
+    :param url: Request URL
+    :type url: str
+    :return: Normalized path, e.g. '/api/v1/map/ABC1234/since/*'
+    :rtype: str
+    """
+    path=urllib.parse.urlsplit(url).path
+    return re.sub(r'/since/\d+',r'/since/*',path)
+
+def readCapture(filename: str):
+    """Iterate over the records in a capture file.
+
+    :param filename: Capture file name; gzip-compressed if it ends in .gz
+    :type filename: str
+    :return: Generator of capture record dicts; see the module header for the keys
+    """
+    with _open(filename,'r') as f:
+        for line in f:
+            line=line.strip()
+            if line:
+                yield json.loads(line)
+
+
+class CaptureWriter():
+    """Thread-safe writer for capture files; see the module header.
+    Each record is flushed as soon as it is written, so that the capture is usable even if the process ends abruptly.
+    """
+    def __init__(self,filename: str):
+        self.filename=filename
+        self.lock=threading.Lock()
+        self.count=0
+        self.f=_open(filename,'w')
+        logging.info('Capturing all requests and responses to '+filename)
+
+    def record(self,method: str,url: str,params: dict,response):
+        """Write one request/response pair.
+
+        :param method: Request method
+        :type method: str
+        :param url: Request URL
+        :type url: str
+        :param params: Request parameters as sent; credential parameters are redacted before writing
+        :type params: dict
+        :param response: The response object
+        :type response: requests.Response
+        """
+        elapsed=response.elapsed.total_seconds() if response.elapsed else 0
+        rec={
+            't':int((time.time()-elapsed)*1000),
+            'm':method.upper(),
+            'u':url.split('?')[0]
+        }
+        if params:
+            rec['p']={k:(REDACTED if k in REDACTED_PARAMS else v) for (k,v) in params.items()}
+        rec['s']=response.status_code
+        rec['e']=int(elapsed*1000)
+        rec['b']=response.text
+        line=json.dumps(rec,separators=(',',':'))
+        with self.lock:
+            if self.f:
+                self.f.write(line+'\n')
+                self.f.flush()
+                self.count+=1
+
+    def close(self):
+        with self.lock:
+            if self.f:
+                self.f.close()
+                self.f=None
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """requests transport adapter that answers requests from a capture file, with no server.\n
+    Requests are matched by method and normalized path (see normalizePath); each match consumes
+    the next unused record for that method and path, so that repeated requests (e.g. successive
+    'since' requests) get their recorded responses in the original order.  A request that has no
+    remaining match gets a 404 response with an error status.
+
+    :param capture: Capture file name, or a list of capture records
+    :param speed: If specified, responses are held until the recorded request time, relative to the
+        first record and divided by speed, has elapsed since the first replayed request; e.g. 1 for
+        the original timing, 10 for ten times faster; defaults to None, which answers immediately
+    :type speed: float, optional
+    """
+    def __init__(self,capture,speed: float=None):
+        super().__init__()
+        records=readCapture(capture) if isinstance(capture,str) else capture
+        self.records=collections.defaultdict(collections.deque)
+        self.t0=None
+        for rec in records:
+            if self.t0 is None:
+                self.t0=rec['t']
+            self.records[(rec['m'],normalizePath(rec['u']))].append(rec)
+        self.speed=speed
+        self.start=None
+        self.lock=threading.Lock()
+        self.unmatched=0
+
+    def remaining(self,method: str=None,path: str=None) -> int:
+        """Number of records not yet replayed, optionally for one method and/or normalized path only.
+        """
+        return sum(len(q) for ((m,p),q) in self.records.items() if (method is None or m==method) and (path is None or p==path))
+
+    def send(self,request,stream=False,timeout=None,verify=True,cert=None,proxies=None):
+        key=(request.method.upper(),normalizePath(request.url))
+        with self.lock:
+            if self.start is None:
+                self.start=time.time()
+            q=self.records.get(key)
+            rec=q.popleft() if q else None
+            if not rec:
+                self.unmatched+=1
+        r=requests.models.Response()
+        r.url=request.url
+        r.request=request
+        r.headers['Content-Type']='application/json'
+        r.encoding='utf-8'
+        if rec:
+            if self.speed:
+                wait=self.start+(rec['t']-self.t0)/1000/self.speed-time.time()
+                if wait>0:
+                    time.sleep(wait)
+            r.status_code=rec['s']
+            r._content=rec['b'].encode()
+        else:
+            logging.warning('replay: no recorded response for '+key[0]+' '+key[1])
+            r.status_code=404
+            r._content=json.dumps({'status':'error','message':'no recorded response for '+key[0]+' '+key[1]}).encode()
+        r.reason='OK' if r.status_code==200 else 'ERROR'
+        return r
+
+    def close(self):
+        pass
+
+
+def replaySync(capture,speed: float=None,**kwargs) -> list:
+    """Replay the sync traffic of a capture through a new SartopoSession, measuring each sync.\n
+    The session is opened on the map and domain of the first 'since' request in the capture, with sync disabled;
+    the initial cache population by .openMap is the first sync, and ._doSync is then called once for each remaining
+    recorded 'since' request.  Non-sync requests in the capture are not replayed.
+
+    :param capture: Capture file name, or a list of capture records
+    :param speed: See ReplayAdapter; defaults to None, which replays as fast as possible
+    :type speed: float, optional
+    :param kwargs: Additional SartopoSession constructor arguments, e.g. caseSensitiveComparisons
+    :return: List of per-sync dicts with keys 'sync' (count, starting at 0), 't' (recorded request time),
+        'cpu' (process CPU seconds), 'wall' (seconds), 'peakMemory' (bytes allocated at peak, per tracemalloc),
+        and 'features' (number of cached features after the sync)
+    :rtype: list
+    """
+    from sartopo_python import SartopoSession # here rather than at the top of the file, since sartopo_python imports this module
+    records=list(readCapture(capture)) if isinstance(capture,str) else capture
+    syncRecords=[rec for rec in records if rec['m']=='GET' and re.search(r'/map/[^/]+/since/\d+$',rec['u'].split('?')[0])]
+    if not syncRecords:
+        logging.error('replaySync: the capture does not contain any sync requests.')
+        return []
+    u=urllib.parse.urlsplit(syncRecords[0]['u'])
+    mapID=u.path.split('/map/')[1].split('/')[0]
+    adapter=ReplayAdapter(syncRecords,speed=speed)
+    kwargs['sync']=False
+    if u.netloc.lower() in ['caltopo.com','sartopo.com']:
+        # requests are signed, but the signatures are not checked during replay
+        kwargs.setdefault('id','REPLAY000000')
+        kwargs.setdefault('key','UkVQTEFZ')
+    sts=SartopoSession(u.netloc,**kwargs)
+    sts.s.mount('http://',adapter)
+    sts.s.mount('https://',adapter)
+    stats=[]
+    tracemalloc.start()
+    try:
+        for n in range(len(syncRecords)):
+            tracemalloc.reset_peak()
+            (cpu0,wall0)=(time.process_time(),time.perf_counter())
+            if n==0:
+                sts.openMap(mapID)
+            else:
+                sts._doSync()
+            (cpu1,wall1)=(time.process_time(),time.perf_counter())
+            stats.append({
+                'sync':n,
+                't':syncRecords[n]['t'],
+                'cpu':cpu1-cpu0,
+                'wall':wall1-wall0,
+                'peakMemory':tracemalloc.get_traced_memory()[1],
+                'features':len(sts.mapData['state']['features'])
+            })
+    finally:
+        tracemalloc.stop()
+    if adapter.unmatched:
+        logging.warning('replaySync: '+str(adapter.unmatched)+' request(s) had no recorded response')
+    return stats
@@ -0,0 +1,681 @@
+# #############################################################################
+#
+#  fake_server.py - local stand-in for the CalTopo API, for tests and benchmarks
+#
+#   developed for Nevada County Sheriff's Search and Rescue
+#
+#   This module implements the small subset of the (non-publicized) CalTopo API
+#    that is used by sartopo_python, so that a SartopoSession can be exercised
+#    without a live caltopo.com or CalTopo Desktop.  It is not a model of the
+#    real server's behavior beyond what sartopo_python depends on.
+#
+#  www.github.com/ncssar/sartopo_python
+#
+############################################################
+#
+# EXAMPLES:
+#
+#  1. CalTopo Desktop style (plain http on localhost, no signatures required):
+#
+#     from sartopo_python import SartopoSession
+#     from sartopo_python.fake_server import FakeCalTopoServer
+#
+#     with FakeCalTopoServer() as server:
+#         mapID=server.addMap(title='Test Map')
+#         server.populate(mapID,markers=1000,assignments=50)
+#         sts=SartopoSession(server.domainAndPort,mapID,sync=False)
+#         print(len(sts.getFeatures(featureClass='Marker')))
+#
+#  2. caltopo.com style (signed https requests, handled in-process with no sockets):
+#
+#     server=FakeCalTopoServer(credentials={'ABCDEFGHIJKL':'<base64 key>'})
+#     mapID=server.addMap()
+#     sts=SartopoSession('caltopo.com',id='ABCDEFGHIJKL',key='<base64 key>',accountId=server.accountId,sync=False)
+#     server.mount(sts) # mapless session: no requests have been sent yet
+#     sts.openMap(mapID)
+#
+#  3. in-memory transport (no sockets, no requests library in the request path):
+#
+#     server=FakeCalTopoServer()
+#     mapID=server.addMap()
+#     sts=SartopoSession('localhost:8080',mapID,transport=server.transport(),sync=False)
+#
+#  Simulated conditions:
+#
+#   - latency: seconds added to each response; a number, or a (min,max) tuple
+#   - errorRate: fraction of requests (0 to 1) that get a 500 response
+#   - failNext(n): the next n requests get a 500 response
+#   - populate(): synthetic markers, shapes, assignments and GPS tracks, for large maps
+#
+#  Every handled request is counted in .requestCounts, keyed by (method,endpoint),
+#   so that benchmarks can measure write fan-out.
+#
+#-----------------------------------------------------------------------------
+
+import hmac
+import base64
+import json
+import time
+import random
+import string
+import threading
+import uuid
+import logging
+import collections
+import http.server
+import urllib.parse
+from math import cos,sin,pi
+
+import requests
+import requests.adapters
+
+from sartopo_python.transport import Transport,TransportResponse
+
+# classes that are always listed in the 'ids' dict of a since response; the session
+#  expects every class that it might receive to already have a key in 'ids'
+ID_CLASSES=['Folder','Marker','Shape','Assignment','OperationalPeriod','AppTrack','Clue','Subject','LiveTrack']
+
+class FakeCalTopoServer():
+    def __init__(self,
+            credentials=None,
+            accountId='ACCT01',
+            accountTitle='Personal Account',
+            groupAccounts=None,
+            requireSignature=False,
+            latency=0,
+            errorRate=0,
+            seed=None):
+        """An in-process stand-in for the CalTopo API.
+
+        :param credentials: Dict of credential ID --> base64 credential key, used to verify signed requests; defaults to None (no valid credentials)
+        :type credentials: dict, optional
+        :param accountId: Account ID of the signed-in user's personal account; defaults to 'ACCT01'
+        :type accountId: str, optional
+        :param accountTitle: Title of the personal account; defaults to 'Personal Account'
+        :type accountTitle: str, optional
+        :param groupAccounts: Dict of group account ID --> group account title; defaults to None
+        :type groupAccounts: dict, optional
+        :param requireSignature: If True, unsigned requests to the http listener (see .start) are rejected; requests sent through .mount always require a signature; defaults to False
+        :type requireSignature: bool, optional
+        :param latency: Simulated latency in seconds, added to every response; a number, or a (min,max) tuple for a uniformly random latency; defaults to 0
+        :param errorRate: Fraction of requests, from 0 to 1, that will get a simulated 500 response; defaults to 0
+        :type errorRate: float, optional
+        :param seed: Seed for the random number generator used for simulated errors and latency, and by .populate; defaults to None
+        :type seed: int, optional
+        """
+        self.credentials=credentials or {}
+        self.accountId=accountId
+        self.requireSignature=requireSignature
+        self.latency=latency
+        self.errorRate=errorRate
+        self.random=random.Random(seed)
+        self.lock=threading.RLock()
+        self.lastTimestamp=0
+        self.maps={}
+        self.accounts=[{'id':accountId,'type':'Feature','properties':{'class':'UserAccount','title':accountTitle,'subscriptionType':'pro-1'}}]
+        for (gid,gtitle) in (groupAccounts or {}).items():
+            self.accounts.append({'id':gid,'type':'Feature','properties':{'class':'UserAccount','title':gtitle,'subscriptionType':'team-1'}})
+        self.accountsUpdated=self._now()
+        self.rels={}
+        self.acctIdsChanged=0
+        self.failCount=0
+        self.requestCounts=collections.Counter()
+        self.httpServer=None
+        self.domainAndPort=None
+
+    def _now(self) -> int:
+        """Server timestamp in integer milliseconds; strictly increasing, so that every change has a distinct timestamp.
+
+        :rtype: int
+        """
+        with self.lock:
+            self.lastTimestamp=max(self.lastTimestamp+1,int(time.time()*1000))
+            return self.lastTimestamp
+
+    # map and feature data management - can be called directly from test or benchmark code
+    #  to simulate changes made by other clients
+
+    def addMap(self,mapID=None,title='Fake Map',accountId=None,mode='sar',features=None) -> str:
+        """Add a map to the fake server.
+
+        :param mapID: Map ID; defaults to None, in which case a random 5-character ID is generated
+        :type mapID: str, optional
+        :param title: Map title; defaults to 'Fake Map'
+        :type title: str, optional
+        :param accountId: ID of the account that owns the map; defaults to None, in which case the personal account is used
+        :type accountId: str, optional
+        :param mode: 'sar' or 'cal'; defaults to 'sar'
+        :type mode: str, optional
+        :param features: List of initial feature data objects; defaults to None
+        :type features: list, optional
+        :return: Map ID
+        :rtype: str
+        """
+        with self.lock:
+            if not mapID:
+                mapID=''.join(self.random.choice(string.ascii_uppercase+string.digits) for i in range(5))
+            self.maps[mapID]={
+                'title':title,
+                'mode':mode,
+                'accountId':accountId or self.accountId,
+                'features':{}, # (id,class) --> feature
+                'updated':{}, # (id,class) --> timestamp
+                'idsChanged':self._now(),
+                'mapUpdated':self._now()
+            }
+            for f in features or []:
+                self.addFeature(mapID,f)
+        return mapID
+
+    def addFeature(self,mapID: str,feature: dict,featureClass: str=None) -> dict:
+        """Add a feature to a map, or replace an existing feature with the same id and class.
+
+        :param mapID: Map ID
+        :type mapID: str
+        :param feature: Feature data object; 'id' will be generated if needed
+        :type feature: dict
+        :param featureClass: Feature class; defaults to None, in which case properties['class'] is used
+        :type featureClass: str, optional
+        :return: The stored feature data object
+        :rtype: dict
+        """
+        with self.lock:
+            m=self.maps[mapID]
+            ts=self._now()
+            prop=dict(feature.get('properties') or {})
+            prop['class']=prop.get('class') or featureClass
+            prop['updated']=ts
+            f={'type':'Feature','id':feature.get('id') or str(uuid.uuid4()),'properties':prop}
+            if feature.get('geometry'):
+                f['geometry']=feature['geometry']
+            key=(f['id'],prop['class'])
+            if key not in m['features']:
+                m['idsChanged']=ts
+            m['features'][key]=f
+            m['updated'][key]=ts
+            m['mapUpdated']=ts
+            return f
+
+    def editFeature(self,mapID: str,id: str,featureClass: str,properties: dict=None,geometry: dict=None) -> dict:
+        """Edit properties and/or geometry of an existing feature, as another client would.
+
+        :param mapID: Map ID
+        :type mapID: str
+        :param id: Feature ID
+        :type id: str
+        :param featureClass: Feature class
+        :type featureClass: str
+        :param properties: Properties to merge into the existing properties; defaults to None
+        :type properties: dict, optional
+        :param geometry: Geometry to replace the existing geometry; defaults to None
+        :type geometry: dict, optional
+        :return: The stored feature data object, or None if the feature does not exist
+        """
+        with self.lock:
+            m=self.maps[mapID]
+            key=(id,featureClass)
+            f=m['features'].get(key)
+            if not f:
+                return None
+            ts=self._now()
+            if properties:
+                prop=dict(f['properties'])
+                prop.update(properties)
+                prop['class']=featureClass
+                prop['updated']=ts
+                f['properties']=prop
+            if geometry:
+                f['geometry']=geometry
+            m['updated'][key]=ts
+            m['mapUpdated']=ts
+            return f
+
+    def deleteFeature(self,mapID: str,id: str,featureClass: str=None) -> bool:
+        """Delete a feature from a map.
+
+        :param mapID: Map ID
+        :type mapID: str
+        :param id: Feature ID
+        :type id: str
+        :param featureClass: Feature class; defaults to None, in which case all features with the specified ID are deleted
+        :type featureClass: str, optional
+        :return: True if anything was deleted
+        :rtype: bool
+        """
+        with self.lock:
+            m=self.maps[mapID]
+            keys=[k for k in m['features'].keys() if k[0]==id and (featureClass is None or k[1].lower()==featureClass.lower())]
+            for key in keys:
+                del m['features'][key]
+                del m['updated'][key]
+            if keys:
+                ts=self._now()
+                m['idsChanged']=ts
+                m['mapUpdated']=ts
+            return bool(keys)
+
+    def getMapFeatures(self,mapID: str) -> list:
+        """Get a list of all features of a map, as stored on the fake server.
+
+        :param mapID: Map ID
+        :type mapID: str
+        :rtype: list
+        """
+        with self.lock:
+            return list(self.maps[mapID]['features'].values())
+
+    def addBookmark(self,mapID: str,title: str=None,accountId: str=None,permission: int=16) -> str:
+        """Add a bookmark (UserAccountMapRel) to an account.
+
+        :param mapID: ID of the bookmarked map; does not need to exist on the fake server
+        :type mapID: str
+        :param title: Bookmark title; defaults to None, in which case the map title (or the map ID) is used
+        :type title: str, optional
+        :param accountId: ID of the account that holds the bookmark; defaults to None, in which case the personal account is used
+        :type accountId: str, optional
+        :param permission: Bookmark permission type: 10=read, 16=update, 20=write; defaults to 16
+        :type permission: int, optional
+        :return: ID of the bookmark
+        :rtype: str
+        """
+        with self.lock:
+            ts=self._now()
+            m=self.maps.get(mapID)
+            rid=str(uuid.uuid4())
+            self.rels[rid]={'id':rid,'type':'Feature','properties':{
+                'class':'UserAccountMapRel',
+                'accountId':accountId or self.accountId,
+                'mapId':mapID,
+                'title':title or (m['title'] if m else mapID),
+                'mapUpdated':m['mapUpdated'] if m else ts,
+                'type':permission,
+                'updated':ts}}
+            self.acctIdsChanged=ts
+            return rid
+
+    def populate(self,mapID: str,markers: int=0,shapes: int=0,lines: int=0,assignments: int=0,tracks: int=0,trackPoints: int=1000,center=(-120.9,39.25),spread: float=0.1) -> list:
+        """Add synthetic features to a map, for large-map tests and benchmarks.\n
+        The results are repeatable for a given seed (see the constructor).
+
+        :param mapID: Map ID
+        :type mapID: str
+        :param markers: Number of markers; defaults to 0
+        :type markers: int, optional
+        :param shapes: Number of polygon shapes; defaults to 0
+        :type shapes: int, optional
+        :param lines: Number of line shapes; defaults to 0
+        :type lines: int, optional
+        :param assignments: Number of area assignments; defaults to 0
+        :type assignments: int, optional
+        :param tracks: Number of GPS tracks (LineString shapes with four-element [lon,lat,ele,timestamp] points); defaults to 0
+        :type tracks: int, optional
+        :param trackPoints: Number of points per GPS track; defaults to 1000
+        :type trackPoints: int, optional
+        :param center: [lon,lat] of the center of the area in which features are created; defaults to (-120.9,39.25)
+        :param spread: Half-width of the area in which features are created, in degrees; defaults to 0.1
+        :type spread: float, optional
+        :return: List of IDs of the created features
+        :rtype: list
+        """
+        r=self.random
+        (cx,cy)=center
+        def rp():
+            return [round(cx+r.uniform(-spread,spread),6),round(cy+r.uniform(-spread,spread),6)]
+        def ring(n=8,size=0.005):
+            [x,y]=rp()
+            pts=[[round(x+size*r.uniform(0.6,1)*cos(2*pi*i/n),6),round(y+size*r.uniform(0.6,1)*sin(2*pi*i/n),6)] for i in range(n)]
+            return pts+[pts[0]]
+        ids=[]
+        with self.lock:
+            for i in range(markers):
+                ids.append(self.addFeature(mapID,{'properties':{'class':'Marker','title':'M'+str(i),'marker-symbol':'point'},
+                        'geometry':{'type':'Point','coordinates':rp()}})['id'])
+            for i in range(shapes):
+                ids.append(self.addFeature(mapID,{'properties':{'class':'Shape','title':'P'+str(i)},
+                        'geometry':{'type':'Polygon','coordinates':[ring()]}})['id'])
+            for i in range(lines):
+                pts=[rp()]
+                for n in range(20):
+                    pts.append([round(pts[-1][0]+r.uniform(-0.002,0.002),6),round(pts[-1][1]+r.uniform(-0.002,0.002),6)])
+                ids.append(self.addFeature(mapID,{'properties':{'class':'Shape','title':'L'+str(i)},
+                        'geometry':{'type':'LineString','coordinates':pts}})['id'])
+            for i in range(assignments):
+                letter=_letters(i)
+                ids.append(self.addFeature(mapID,{'properties':{'class':'Assignment','letter':letter,'number':str(100+i),'title':letter+' '+str(100+i),'status':'DRAFT','resourceType':'GROUND'},
+                        'geometry':{'type':'Polygon','coordinates':[ring(12,0.01)]}})['id'])
+            t0=int(time.time()*1000)-trackPoints*1000
+            for i in range(tracks):
+                [x,y]=rp()
+                pts=[]
+                for n in range(trackPoints):
+                    x+=r.uniform(-0.0001,0.0001)
+                    y+=r.uniform(-0.0001,0.0001)
+                    pts.append([round(x,6),round(y,6),0,t0+n*1000])
+                ids.append(self.addFeature(mapID,{'properties':{'class':'Shape','title':'Track'+str(i)},
+                        'geometry':{'type':'LineString','coordinates':pts,'size':len(pts)}})['id'])
+        return ids
+
+    # request handling - shared by the http listener and the in-process adapter
+
+    def failNext(self,count: int=1):
+        """Make the next *count* requests fail with a simulated 500 response.
+
+        :param count: Number of requests that should fail; defaults to 1
+        :type count: int, optional
+        """
+        with self.lock:
+            self.failCount+=count
+
+    def resetStats(self):
+        """Clear .requestCounts.
+        """
+        with self.lock:
+            self.requestCounts.clear()
+
+    def _verifySignature(self,method: str,path: str,params: dict,body: str):
+        """Verify the HMAC signature of a signed request, in the same format as SartopoSession._getToken.
+
+        :return: None if the signature is valid, or a string describing why it is not
+        """
+        cid=params.get('id')
+        expires=params.get('expires')
+        signature=params.get('signature')
+        if not (cid and expires and signature):
+            return 'request is not signed'
+        key=self.credentials.get(cid)
+        if not key:
+            return 'unknown credential id'
+        try:
+            if int(expires)<int(time.time()*1000):
+                return 'signature has expired'
+        except ValueError:
+            return 'invalid expires value'
+        data=method+' '+path+'\n'+str(expires)+'\n'+(body or '')
+        token=base64.b64encode(hmac.new(base64.b64decode(key),data.encode(),'sha256').digest()).decode()
+        if not hmac.compare_digest(token,signature):
+            return 'invalid signature'
+        return None
+
+    def handle(self,method: str,path: str,params: dict,signed: bool=False):
+        """Handle one API request.
+
+        :param method: HTTP method: 'GET', 'POST' or 'DELETE'
+        :type method: str
+        :param path: URL path, without the query string
+        :type path: str
+        :param params: Dict of query string parameters (GET, DELETE) or form fields (POST)
+        :type params: dict
+        :param signed: If True, the request must carry a valid signature; defaults to False
+        :type signed: bool, optional
+        :return: Tuple of (HTTP status code, response body dict)
+        :rtype: tuple
+        """
+        method=method.upper()
+        latency=self.latency
+        if isinstance(latency,(list,tuple)):
+            latency=self.random.uniform(latency[0],latency[1])
+        if latency:
+            time.sleep(latency)
+        parts=[p for p in path.split('/') if p]
+        endpoint=self._endpointName(method,parts)
+        with self.lock:
+            self.requestCounts[(method,endpoint)]+=1
+            fail=False
+            if self.failCount>0:
+                self.failCount-=1
+                fail=True
+            elif self.errorRate and self.random.random()<self.errorRate:
+                fail=True
+        if fail:
+            return (500,{'status':'error','message':'simulated server error'})
+        body=params.get('json','')
+        if signed or self.requireSignature or 'signature' in params:
+            problem=self._verifySignature(method,path,params,body if method=='POST' else '')
+            if problem:
+                logging.warning('fake server: rejected '+method+' '+path+': '+problem)
+                return (401,{'status':'error','message':problem})
+        try:
+            j=json.loads(body) if (method=='POST' and body) else None
+        except ValueError:
+            return (400,{'status':'error','message':'invalid json'})
+        try:
+            return self._route(method,parts,j)
+        except KeyError as e:
+            return (404,{'status':'error','message':'not found: '+str(e)})
+
+    def _endpointName(self,method: str,parts: list) -> str:
+        """Short name of the endpoint for a request path, used as a .requestCounts key: 'since', 'acct/since', 'save', 'userdata', or the feature class name.
+
+        :rtype: str
+        """
+        if len(parts)>=5 and parts[4]=='since':
+            return 'since' if parts[2]=='map' else 'acct/since'
+        if len(parts)>=5:
+            return parts[4]
+        return parts[-1] if parts else ''
+
+    def _route(self,method: str,parts: list,j: dict):
+        """Dispatch a parsed request to the matching endpoint.
+
+        :return: Tuple of (HTTP status code, response body dict)
+        :rtype: tuple
+        """
+        ts=self._now()
+        ok=lambda result: (200,{'status':'ok','timestamp':ts,'result':result})
+        # /api/v1/map/<mapID>/since/<ts>  and  /api/v1/map/<mapID>/<class>[/<id>]
+        if parts[:3]==['api','v1','map'] and len(parts)>=5:
+            mapID=parts[3]
+            if mapID not in self.maps:
+                return (404,{'status':'error','message':'no such map: '+mapID})
+            if parts[4]=='since' and method=='GET':
+                return ok(self._mapSince(mapID,int(parts[5]) if len(parts)>5 else 0,ts))
+            featureClass=parts[4]
+            id=parts[5] if len(parts)>5 else None
+            if method=='POST':
+                j=j or {}
+                if id:
+                    j['id']=id
+                    prop=j.get('properties') or {}
+                    existing=self.maps[mapID]['features'].get((id,prop.get('class') or featureClass))
+                    if existing:
+                        prop=dict(existing['properties'],**prop)
+                        j['properties']=prop
+                return ok(self.addFeature(mapID,j,featureClass))
+            if method=='DELETE' and id:
+                if self.deleteFeature(mapID,id,featureClass):
+                    return ok({'id':id})
+                return (404,{'status':'error','message':'no such feature: '+id})
+        # /api/v0/map/<mapID>/save - payload is a dict of class name --> list of features
+        if parts[:3]==['api','v0','map'] and len(parts)==5 and parts[4]=='save' and method=='POST':
+            mapID=parts[3]
+            if mapID not in self.maps:
+                return (404,{'status':'error','message':'no such map: '+mapID})
+            ids=[]
+            for (featureClass,features) in (j or {}).items():
+                featureClass=featureClass[0].upper()+featureClass[1:]
+                for f in features:
+                    ids.append(self.addFeature(mapID,f,featureClass)['id'])
+            return ok({'ids':ids})
+        # /api/v1/acct/<accountId>/since/<ts>  and  /api/v1/acct/<accountId>/CollaborativeMap
+        if parts[:3]==['api','v1','acct'] and len(parts)>=5:
+            if parts[4]=='since' and method=='GET':
+                return ok(self._acctSince(int(parts[5]) if len(parts)>5 else 0,ts))
+            if parts[4]=='CollaborativeMap' and method=='POST':
+                j=j or {}
+                prop=j.get('properties') or {}
+                mapID=self.addMap(title=prop.get('title','newMap'),accountId=parts[3],mode=prop.get('mode','cal'),
+                        features=(j.get('state') or {}).get('features',[]))
+                return ok({'id':mapID})
+        if parts[:3]==['api','v0','userdata'] and method=='POST':
+            return ok({})
+        return (404,{'status':'error','message':'unhandled request: '+method+' /'+'/'.join(parts)})
+
+    def _mapSince(self,mapID: str,since: int,ts: int) -> dict:
+        """Build the result of a map 'since' request.
+
+        :rtype: dict
+        """
+        with self.lock:
+            m=self.maps[mapID]
+            features=[f for (key,f) in m['features'].items() if m['updated'][key]>since]
+            result={'timestamp':ts,'state':{'type':'FeatureCollection','features':json.loads(json.dumps(features))}}
+            if since==0 or m['idsChanged']>since:
+                ids={c:[] for c in ID_CLASSES}
+                for (id,c) in m['features'].keys():
+                    ids.setdefault(c,[]).append(id)
+                result['ids']=ids
+            return result
+
+    def _acctSince(self,since: int,ts: int) -> dict:
+        """Build the result of an account 'since' request.
+
+        :rtype: dict
+        """
+        with self.lock:
+            maps=[{'type':'Feature','id':mapID,'properties':{'class':'CollaborativeMap','title':m['title'],'mode':m['mode'],
+                    'accountId':m['accountId'],'updated':m['mapUpdated']}}
+                    for (mapID,m) in self.maps.items() if m['mapUpdated']>since]
+            rels=[r for r in self.rels.values() if r['properties']['updated']>since]
+            result={'timestamp':ts,'features':maps,'rels':json.loads(json.dumps(rels)),'groups':[],
+                    'accounts':json.loads(json.dumps(self.accounts)) if (since==0 or self.accountsUpdated>since) else []}
+            if since==0 or self.acctIdsChanged>since:
+                result['ids']={'CollaborativeMap':list(self.maps.keys()),'UserAccountMapRel':list(self.rels.keys())}
+            return result
+
+    # transports: an http listener on localhost (CalTopo Desktop style), and a requests
+    #  transport adapter that can be mounted on a session (caltopo.com style, no sockets)
+
+    def start(self,port: int=0) -> str:
+        """Start listening for plain http requests on localhost, in a background thread, as CalTopo Desktop would.
+
+        :param port: Port number; defaults to 0, in which case a free port is chosen
+        :type port: int, optional
+        :return: Domain-and-port string to use when creating a SartopoSession, e.g. 'localhost:54321'; also saved as .domainAndPort
+        :rtype: str
+        """
+        server=self
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version='HTTP/1.1'
+            def _respond(self,method):
+                u=urllib.parse.urlsplit(self.path)
+                params=dict(urllib.parse.parse_qsl(u.query,keep_blank_values=True))
+                if method=='POST':
+                    length=int(self.headers.get('Content-Length',0))
+                    params.update(urllib.parse.parse_qsl(self.rfile.read(length).decode(),keep_blank_values=True))
+                (status,body)=server.handle(method,u.path,params)
+                data=json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type','application/json')
+                self.send_header('Content-Length',str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            def do_GET(self):
+                self._respond('GET')
+            def do_POST(self):
+                self._respond('POST')
+            def do_DELETE(self):
+                self._respond('DELETE')
+            def log_message(self,*args):
+                pass
+        self.httpServer=http.server.ThreadingHTTPServer(('127.0.0.1',port),Handler)
+        self.httpServer.daemon_threads=True
+        threading.Thread(target=self.httpServer.serve_forever,name='fakeCalTopoServer',daemon=True).start()
+        self.domainAndPort='localhost:'+str(self.httpServer.server_address[1])
+        return self.domainAndPort
+
+    def stop(self):
+        """Stop the http listener started by .start.
+        """
+        if self.httpServer:
+            self.httpServer.shutdown()
+            self.httpServer.server_close()
+            self.httpServer=None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self,*args):
+        self.stop()
+
+    def adapter(self):
+        """Get a requests transport adapter that sends requests to this fake server in-process, with no sockets.
+
+        :rtype: requests.adapters.BaseAdapter
+        """
+        return _FakeAdapter(self)
+
+    def transport(self):
+        """Get a SartopoSession transport that sends requests to this fake server in-process, without going through requests at all.
+        Pass it as the transport argument of the SartopoSession constructor; the session's domainAndPort is only used to decide
+        whether requests are signed, as usual.
+
+        :rtype: sartopo_python.transport.Transport
+        """
+        return _FakeTransport(self)
+
+    def mount(self,session,domains=('caltopo.com','sartopo.com')):
+        """Route a session's https requests for the specified domains to this fake server, in-process.\n
+        This must be done before the session sends any requests to those domains, i.e. on a mapless session, before calling .openMap.
+        Requests routed this way must be signed, as they would be for the real domains.
+
+        :param session: The SartopoSession object
+        :param domains: Domains to intercept; defaults to ('caltopo.com','sartopo.com')
+        :type domains: tuple, optional
+        """
+        for domain in domains:
+            session.s.mount('https://'+domain+'/',self.adapter())
+
+
+class _FakeAdapter(requests.adapters.BaseAdapter):
+    """requests transport adapter that hands each request to a FakeCalTopoServer in-process.
+    """
+    def __init__(self,server):
+        super().__init__()
+        self.server=server
+
+    def send(self,request,stream=False,timeout=None,verify=True,cert=None,proxies=None):
+        u=urllib.parse.urlsplit(request.url)
+        params=dict(urllib.parse.parse_qsl(u.query,keep_blank_values=True))
+        if request.body:
+            body=request.body.decode() if isinstance(request.body,bytes) else request.body
+            params.update(urllib.parse.parse_qsl(body,keep_blank_values=True))
+        (status,rj)=self.server.handle(request.method,u.path,params,signed=True)
+        r=requests.models.Response()
+        r.status_code=status
+        r._content=json.dumps(rj).encode()
+        r.headers['Content-Type']='application/json'
+        r.encoding='utf-8'
+        r.url=request.url
+        r.request=request
+        r.reason='OK' if status==200 else 'ERROR'
+        return r
+
+    def close(self):
+        pass
+
+
+class _FakeTransport(Transport):
+    """SartopoSession transport that hands each request to a FakeCalTopoServer in-process.
+    """
+    def __init__(self,server):
+        self.server=server
+
+    def request(self,method: str,url: str,params: dict=None,data: dict=None,timeout: float=None,proxies: dict=None,allowRedirects: bool=True):
+        u=urllib.parse.urlsplit(url)
+        # values are strings on the wire; expires is sent as an int
+        p={k:str(v) for (k,v) in (params or {}).items()}
+        p.update({k:str(v) for (k,v) in (data or {}).items()})
+        t0=time.time()
+        (status,rj)=self.server.handle(method,u.path,p,signed=u.netloc.lower() in ['caltopo.com','sartopo.com'])
+        return TransportResponse(status,json.dumps(rj),headers={'Content-Type':'application/json'},elapsed=time.time()-t0)
+
+
+def _letters(n: int) -> str:
+    """Assignment letter sequence: A..Z, AA..AZ, BA..."""
+    s=''
+    n+=1
+    while n>0:
+        (n,rem)=divmod(n-1,26)
+        s=chr(65+rem)+s
+    return s
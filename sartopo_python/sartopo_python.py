@@ -142,9 +142,10 @@ import logging
 import sys
 import threading
 import copy
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor,Future
 import functools
+import collections
+import math
 
 # import objgraph
 # import psutil
@@ -153,16 +154,490 @@ import functools
 
 # syncing=False
 
-# shapely.geometry imports will generate a logging message if numpy is not installed;
-#  numpy is not actually required
-from shapely.geometry import LineString,Point,Polygon,MultiLineString,MultiPolygon,GeometryCollection
+# numpy is required: the point-list helpers (_validatePoints, _removeSpurs, _removeDuplicatePoints, _fourify,
+#  _xyArrays) and the bulk geometry methods use numpy arrays directly; it is also a dependency of shapely 2
+from shapely.geometry import LineString,Point,Polygon,MultiLineString,MultiPolygon,GeometryCollection,box
 from shapely.ops import split,unary_union
+from shapely.strtree import STRtree
+import shapely
+import numpy
+
+# pyproj is optional: if it is installed, metric geometry operations use a proper local projection;
+#  otherwise they use an equirectangular approximation (see _LocalProjection)
+try:
+    import pyproj
+except ImportError:
+    pyproj=None
+
+from sartopo_python.capture import CaptureWriter
+from sartopo_python.transport import RequestsTransport,RecordingTransport
 
 # silent exception class to be raised during __init__ and handlded by the caller,
 #  since __init__ should always return None: https://stackoverflow.com/questions/20059766
 class STSException(BaseException):
     pass
 
+# secondary indexes of the feature cache (.mapData['state']['features']), so that getFeatures
+#  and _doSync don't need to scan every cached feature for each lookup.
+#  - entries are keyed by the python id() of the cached feature dict, since the same feature id
+#    can exist in more than one class (e.g. an apptrack and the finished shape)
+#  - each entry has a sequence number, assigned when the feature is added to the index; since
+#    features are only ever appended to the cache list, sequence order is cache list order,
+#    so lookups return features in the same order as a scan of the cache list would
+#  - title and first-word keys are upper-cased unless comparisons are case-sensitive, which
+#    is equivalent to ._caseMatch; the index is rebuilt if that setting changes
+#  - 'irregular' features (no properties dict, no class, or a non-string title or letter)
+#    are tracked separately; getFeatures falls back to a scan while any exist, so that its
+#    error handling for such features is unchanged
+#  - the bounding box of each feature is also kept here once computed (see _getFeatureBounds),
+#    and discarded when the feature is removed or its geometry changes
+class _FeatureIndex():
+    def __init__(self,features: list,caseSensitive: bool=False):
+        self.features=features # the cache list that this index describes
+        self.caseSensitive=caseSensitive
+        self.seq=0
+        self.entries={} # id(feature) --> [seq,feature,keys]
+        self.byId={} # each of these: key --> {id(feature):None}
+        self.byClass={}
+        self.byTitle={}
+        self.byFirstWord={}
+        self.byLetter={}
+        self.byFolderId={}
+        self.irregular={}
+        self.bounds={} # id(feature) --> (minx,miny,maxx,maxy)
+        for f in features:
+            self.add(f)
+
+    def _keys(self,f: dict):
+        # (class,title,first word of title,letter,folderId); None if irregular
+        prop=f.get('properties')
+        if not isinstance(prop,dict) or not isinstance(prop.get('class'),str) or not isinstance(prop.get('title'),str):
+            return None
+        letter=None
+        if 'letter' in prop:
+            letter=prop['letter']
+            if not isinstance(letter,str):
+                return None
+            letter=letter.rstrip()
+        title=prop['title']
+        words=title.split()
+        firstWord=words[0] if words else None
+        title=title.rstrip()
+        if not self.caseSensitive:
+            title=title.upper()
+            if firstWord:
+                firstWord=firstWord.upper()
+        return (prop['class'],title,firstWord,letter,prop.get('folderId'))
+
+    def normalize(self,title: str) -> str:
+        return title if self.caseSensitive else title.upper()
+
+    def _link(self,oid: int,fid,keys):
+        if fid is not None:
+            self.byId.setdefault(fid,{})[oid]=None
+        if keys is None:
+            self.irregular[oid]=None
+            return
+        for (index,key) in zip([self.byClass,self.byTitle,self.byFirstWord,self.byLetter,self.byFolderId],keys):
+            if key is not None:
+                index.setdefault(key,{})[oid]=None
+
+    def _unlink(self,oid: int,fid,keys):
+        if fid is not None:
+            self._discard(self.byId,fid,oid)
+        if keys is None:
+            self.irregular.pop(oid,None)
+            return
+        for (index,key) in zip([self.byClass,self.byTitle,self.byFirstWord,self.byLetter,self.byFolderId],keys):
+            if key is not None:
+                self._discard(index,key,oid)
+
+    def _discard(self,index: dict,key,oid: int):
+        d=index.get(key)
+        if d is not None:
+            d.pop(oid,None)
+            if not d:
+                del index[key]
+
+    def add(self,f: dict):
+        oid=id(f)
+        if oid in self.entries:
+            return
+        keys=self._keys(f)
+        self.entries[oid]=[self.seq,f,keys]
+        self.seq+=1
+        self._link(oid,f.get('id'),keys)
+
+    def remove(self,f: dict):
+        e=self.entries.pop(id(f),None)
+        if e:
+            self._unlink(id(f),f.get('id'),e[2])
+        self.bounds.pop(id(f),None)
+
+    def contains(self,f: dict) -> bool:
+        e=self.entries.get(id(f))
+        return e is not None and e[1] is f
+
+    def update(self,f: dict):
+        # re-key a feature whose properties have changed; its position (sequence number) is unchanged
+        oid=id(f)
+        e=self.entries.get(oid)
+        if not e:
+            self.add(f)
+            return
+        keys=self._keys(f)
+        if keys!=e[2]:
+            self._unlink(oid,f.get('id'),e[2])
+            self._link(oid,f.get('id'),keys)
+            if keys and e[2] and keys[0]!=e[2][0]:
+                # class changed: keep the class bucket in cache order
+                c=self.byClass[keys[0]]
+                self.byClass[keys[0]]=dict.fromkeys(sorted(c,key=lambda o: self.entries[o][0]))
+            e[2]=keys
+
+    def get(self,index: dict,key) -> list:
+        """Features with the specified key in the specified index (e.g. .byTitle), in cache order."""
+        d=index.get(key)
+        if not d:
+            return []
+        entries=self.entries
+        if index is self.byClass: # class buckets are always in cache order
+            return [entries[o][1] for o in d]
+        return [entries[o][1] for o in sorted(d,key=lambda o: entries[o][0])]
+
+    def merge(self,*lists) -> list:
+        """Union of lists of indexed features, in cache order."""
+        merged={id(f):f for features in lists for f in features}
+        return sorted(merged.values(),key=lambda f: self.entries[id(f)][0])
+
+    def first(self,fid,featureClass: str):
+        """First cached feature with the specified id and class (exact match), or None."""
+        for f in self.get(self.byId,fid):
+            prop=f.get('properties')
+            if isinstance(prop,dict) and prop.get('class')==featureClass:
+                return f
+        return None
+
+# spatial index of the feature cache, for getFeaturesInBounds, getFeaturesNear, and getFeaturesContaining.
+#  - an STRtree can't be modified after it is built, so the cache hooks only mark the index as
+#    dirty, and the tree is rebuilt on the next spatial query
+#  - shapely geometries are kept per cached feature (keyed by python id() of the feature dict)
+#    until that feature's geometry changes, so a rebuild after a small sync only needs to build
+#    geometries for the features that changed
+#  - features whose geometry can't be made into a shapely object (e.g. unsupported type, or a
+#    polygon with too few points) are left out of the tree
+class _SpatialIndex():
+    def __init__(self,features: list,geomFunc):
+        self.features=features # the cache list that this index describes
+        self.geomFunc=geomFunc
+        self.geoms={} # id(feature) --> shapely geometry, or None if it can't be built
+        self.tree=None
+        self.treeFeatures=[]
+        self.dirty=True
+
+    def invalidate(self,feature: dict=None):
+        """Mark the tree for rebuild; also discard the specified feature's geometry, if any."""
+        self.dirty=True
+        if feature is not None:
+            self.geoms.pop(id(feature),None)
+
+    def _rebuild(self):
+        geoms={}
+        treeGeoms=[]
+        treeFeatures=[]
+        for f in self.features:
+            oid=id(f)
+            if oid in self.geoms:
+                g=self.geoms[oid]
+            else:
+                try:
+                    g=self.geomFunc(f)
+                except Exception as e:
+                    logging.warning('spatial index: geometry of '+str(f.get('id'))+' could not be used: '+str(e))
+                    g=None
+                if g is not None and g.is_empty:
+                    g=None
+            geoms[oid]=g
+            if g is not None:
+                treeGeoms.append(g)
+                treeFeatures.append(f)
+        self.geoms=geoms
+        self.tree=STRtree(treeGeoms)
+        self.treeFeatures=treeFeatures
+        self.dirty=False
+
+    def query(self,geom,predicate: str=None,distance: float=None) -> list:
+        """(feature,geometry) tuples of indexed features that satisfy the predicate with respect to geom, in cache order."""
+        if self.dirty:
+            self._rebuild()
+        if not self.treeFeatures:
+            return []
+        if distance is None:
+            hits=self.tree.query(geom,predicate=predicate)
+        else:
+            hits=self.tree.query(geom,predicate='dwithin',distance=distance)
+        return [(self.treeFeatures[i],self.tree.geometries[i]) for i in sorted(hits)]
+
+# incremental spatial join of point features into polygon features, for classifyPoints.
+#  - one classifier is kept per combination of point classes and polygon classes
+#  - the cache hooks mark the ids of added, removed, and changed features as dirty, and the next
+#    classification only tests the dirty points against all polygons and the dirty polygons against
+#    all points; everything is reclassified if the cache list has been replaced, if features were
+#    added or removed without the hooks, or if most features are dirty
+#  - each test is one vectorized STRtree query (predicate 'contains') of an array of polygons
+#    against a tree of points, or of all polygons against a tree of the dirty points
+#  - ids are used as keys, so that the result can be kept across cache replacements by _doSync
+class _PointClassifier():
+    def __init__(self,pointClasses: list,polygonClasses: list):
+        self.pointClasses=set(pointClasses)
+        self.polygonClasses=set(polygonClasses)
+        self.features=None # the cache list that was classified
+        self.count=0 # length of that list when it was classified
+        self.points={} # point feature id --> shapely Point
+        self.polygons={} # polygon feature id --> shapely geometry
+        self.byPoint={} # point feature id --> {polygon feature id:None}
+        self.byPolygon={} # polygon feature id --> {point feature id:None}
+        self.dirty=set() # feature ids
+
+    def invalidate(self,fid):
+        self.dirty.add(fid)
+
+    def _collect(self,features: list,geomFunc) -> tuple:
+        # ({id:Point},{id:polygon geometry}) of the relevant features in the specified list
+        points={}
+        polygons={}
+        coords=[]
+        pointIds=[]
+        for f in features:
+            prop=f.get('properties')
+            g=f.get('geometry')
+            if not isinstance(prop,dict) or not isinstance(g,dict):
+                continue
+            c=prop.get('class')
+            if c in self.pointClasses and g.get('type')=='Point':
+                try:
+                    coords.append([float(g['coordinates'][0]),float(g['coordinates'][1])])
+                    pointIds.append(f.get('id'))
+                except (KeyError,IndexError,TypeError,ValueError):
+                    logging.warning('classifyPoints: geometry of '+str(f.get('id'))+' could not be used')
+            if c in self.polygonClasses and g.get('type')=='Polygon':
+                try:
+                    geom=geomFunc(f)
+                except Exception as e:
+                    logging.warning('classifyPoints: geometry of '+str(f.get('id'))+' could not be used: '+str(e))
+                    continue
+                if geom is not None and not geom.is_empty:
+                    polygons[f.get('id')]=geom
+        if coords:
+            points=dict(zip(pointIds,shapely.points(numpy.array(coords))))
+        return (points,polygons)
+
+    def _link(self,pairs,pointIds: list,polygonIds: list):
+        # pairs: array [[polygon indices],[point indices]] as returned by STRtree.query
+        for (pi,qi) in zip(pairs[0],pairs[1]):
+            (polygonId,pointId)=(polygonIds[pi],pointIds[qi])
+            self.byPoint[pointId][polygonId]=None
+            self.byPolygon[polygonId][pointId]=None
+
+    def _join(self,points: dict,polygons: dict):
+        # add the pairs of the specified points and polygons (both already in .points and .polygons)
+        if not points or not polygons:
+            return
+        pointIds=list(points.keys())
+        polygonIds=list(polygons.keys())
+        tree=STRtree(list(points.values()))
+        self._link(tree.query(list(polygons.values()),predicate='contains'),pointIds,polygonIds)
+
+    def _drop(self,fid):
+        if fid in self.points:
+            del self.points[fid]
+            for polygonId in self.byPoint.pop(fid,{}):
+                self.byPolygon[polygonId].pop(fid,None)
+        if fid in self.polygons:
+            del self.polygons[fid]
+            for pointId in self.byPolygon.pop(fid,{}):
+                self.byPoint[pointId].pop(fid,None)
+
+    def update(self,features: list,index: _FeatureIndex,geomFunc):
+        """Bring the classification up to date with the specified cache list; call with the cache lock held."""
+        full=features is not self.features or (not self.dirty and len(features)!=self.count) or len(self.dirty)>(len(self.points)+len(self.polygons))//2
+        if full:
+            (self.points,self.polygons)=self._collect(features,geomFunc)
+            self.byPoint={i:{} for i in self.points}
+            self.byPolygon={i:{} for i in self.polygons}
+            self._join(self.points,self.polygons)
+        elif self.dirty:
+            for fid in self.dirty:
+                self._drop(fid)
+            changed=[f for fid in self.dirty for f in index.get(index.byId,fid)]
+            (points,polygons)=self._collect(changed,geomFunc)
+            self.points.update(points)
+            self.polygons.update(polygons)
+            self.byPoint.update({i:{} for i in points})
+            self.byPolygon.update({i:{} for i in polygons})
+            # new points against the polygons that were already classified, then new polygons against all points
+            self._join(points,{i:g for (i,g) in self.polygons.items() if i not in polygons})
+            self._join(self.points,polygons)
+        self.features=features
+        self.count=len(features)
+        self.dirty=set()
+
+# LRU cache of shapely geometries built from feature geometry, for the geometry operations.
+#  - key is (feature id, feature class, geometry fingerprint, variant); the variant names the way the
+#    geometry was built from the coordinates (e.g. with spurs removed, or buffered for crop)
+#  - the fingerprint is a hash of every coordinate of every ring or part (as one numpy array per
+#    ring or part), so any change to any vertex, including hole vertices, gives a new key; this costs
+#    much less than building the geometry, and catches feature dicts that are not from the cache,
+#    while edits through the cache (_doSync and editFeature) also invalidate by feature id
+#  - shapely geometries are immutable, so cached objects can be shared by any number of callers;
+#    prepared geometries (shapely.prepare) make repeated predicates such as .intersects faster
+class _GeometryCache():
+    def __init__(self,maxsize: int):
+        self.maxsize=maxsize
+        self.entries=collections.OrderedDict() # key --> shapely geometry, least recently used first
+        self.keysById={} # feature id --> set of keys
+        self.lock=threading.Lock()
+        self.hits=0
+        self.misses=0
+        self.evictions=0
+        self.invalidations=0
+
+    @classmethod
+    def fingerprint(cls,geometry: dict) -> tuple:
+        gtype=geometry.get('type')
+        c=geometry.get('coordinates') or []
+        if gtype=='Point':
+            parts=[[c]]
+        elif gtype in ['Polygon','MultiLineString']:
+            parts=c
+        elif gtype=='MultiPolygon':
+            parts=[ring for polygon in c for ring in polygon]
+        else:
+            parts=[c]
+        return (gtype,)+tuple(cls._hashPoints(points) for points in parts)
+
+    @staticmethod
+    def _hashPoints(points: list) -> tuple:
+        try:
+            a=numpy.asarray(points,dtype=float)
+            return (a.shape,hash(a.tobytes()))
+        except (ValueError,TypeError): # ragged (e.g. some points with elevation and time, some without) or non-numeric
+            return (len(points) if isinstance(points,list) else None,hash(repr(points)))
+
+    def get(self,feature: dict,variant: str,build,prepared: bool=False):
+        if self.maxsize<=0:
+            geom=build()
+            if prepared and geom is not None:
+                shapely.prepare(geom)
+            return geom
+        fid=feature.get('id')
+        key=(fid,feature.get('properties',{}).get('class'),self.fingerprint(feature['geometry']),variant)
+        with self.lock:
+            geom=self.entries.get(key)
+            if geom is not None:
+                self.entries.move_to_end(key)
+                self.hits+=1
+                if prepared:
+                    shapely.prepare(geom) # no-op if already prepared
+                return geom
+            self.misses+=1
+        geom=build()
+        if geom is None:
+            return None
+        if prepared:
+            shapely.prepare(geom)
+        with self.lock:
+            self.entries[key]=geom
+            self.keysById.setdefault(fid,set()).add(key)
+            while len(self.entries)>self.maxsize:
+                (oldKey,g)=self.entries.popitem(last=False)
+                self._unlinkKey(oldKey)
+                self.evictions+=1
+        return geom
+
+    def _unlinkKey(self,key):
+        keys=self.keysById.get(key[0])
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self.keysById[key[0]]
+
+    def invalidate(self,fid):
+        """Discard all cached geometries of the specified feature id."""
+        with self.lock:
+            for key in self.keysById.pop(fid,()):
+                if self.entries.pop(key,None) is not None:
+                    self.invalidations+=1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keysById.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            lookups=self.hits+self.misses
+            return {
+                'size':len(self.entries),
+                'maxsize':self.maxsize,
+                'hits':self.hits,
+                'misses':self.misses,
+                'hitRate':self.hits/lookups if lookups else 0.0,
+                'evictions':self.evictions,
+                'invalidations':self.invalidations
+            }
+
+# local projection between lon/lat degrees and meters, for the metric geometry operations (e.g. crop(...,beyondMeters=...))
+#  - with pyproj, an azimuthal equidistant projection on the WGS84 ellipsoid, centered at (lon0,lat0);
+#    without pyproj, an equirectangular projection on a sphere, scaled at lat0; both are accurate
+#    to well under 1% within MAX_RADIUS degrees of the center
+#  - transformers are created once per projection (see SartopoSession._getLocalProjection), and
+#    shapely.transform sends all coordinates of a geometry to them as one array
+#  - projections are centered on a GRID_SPACING degree grid where possible, so that nearby geometries
+#    share one projection
+class _LocalProjection():
+    MAX_RADIUS=1.0 # degrees
+    GRID_SPACING=0.5 # degrees
+    EARTH_RADIUS=6371008.8 # meters; mean radius, for the equirectangular approximation
+
+    def __init__(self,lon0: float,lat0: float):
+        self.lon0=lon0
+        self.lat0=lat0
+        if pyproj:
+            crs=pyproj.CRS.from_proj4('+proj=aeqd +lat_0='+repr(lat0)+' +lon_0='+repr(lon0)+' +datum=WGS84 +units=m +no_defs')
+            self.forward=pyproj.Transformer.from_crs('EPSG:4326',crs,always_xy=True)
+            self.inverse=pyproj.Transformer.from_crs(crs,'EPSG:4326',always_xy=True)
+        else:
+            self.forward=None
+            self.inverse=None
+            self.xScale=self.EARTH_RADIUS*math.pi/180*math.cos(math.radians(lat0))
+            self.yScale=self.EARTH_RADIUS*math.pi/180
+
+    def covers(self,bounds) -> bool:
+        (x0,y0,x1,y1)=bounds
+        return max(abs(x0-self.lon0),abs(x1-self.lon0),abs(y0-self.lat0),abs(y1-self.lat0))<=self.MAX_RADIUS
+
+    def _toMeters(self,coords):
+        if self.forward:
+            (x,y)=self.forward.transform(coords[:,0],coords[:,1])
+            return numpy.column_stack((x,y))
+        return numpy.column_stack(((coords[:,0]-self.lon0)*self.xScale,(coords[:,1]-self.lat0)*self.yScale))
+
+    def _toDegrees(self,coords):
+        if self.inverse:
+            (x,y)=self.inverse.transform(coords[:,0],coords[:,1])
+            return numpy.column_stack((x,y))
+        return numpy.column_stack((coords[:,0]/self.xScale+self.lon0,coords[:,1]/self.yScale+self.lat0))
+
+    def toMeters(self,geom):
+        """Copy of a shapely geometry, in meters east and north of the center."""
+        return shapely.transform(geom,self._toMeters)
+
+    def toDegrees(self,geom):
+        """Copy of a shapely geometry in meters, in lon/lat degrees."""
+        return shapely.transform(geom,self._toDegrees)
+
+
 class SartopoSession():
     def __init__(self,
             domainAndPort: str='localhost:8080',
@@ -176,6 +651,7 @@ class SartopoSession():
             sync=True,
             syncInterval=5,
             syncTimeout=10,
+            syncPauseTimeout=30,
             syncDumpFile=None,
             cacheDumpFile=None,
             propertyUpdateCallback=None,
@@ -185,7 +661,17 @@ class SartopoSession():
             syncCallback=None,
             useFiddlerProxy=False,
             caseSensitiveComparisons=False,  # case-insensitive comparisons by default, see _caseMatch()
-            validatePoints='modify'):
+            validatePoints='modify',
+            editCoalesceWindow=0,
+            editCoalesceMaxLatency=5,
+            maxWorkers=10,
+            captureFile=None,
+            transport=None,
+            accountDataTTL=60,
+            geometryCacheSize=256,
+            geometryLogging='summary',
+            simplifyTolerance=0,
+            coordinatePrecision=None):
         """The core session object.
 
         :param domainAndPort: Domain-and-port portion of the URL; defaults to 'localhost:8080'; common values are 'caltopo.com' for the web interface, and 'localhost:8080' (or different hostname or port as needed) for CalTopo Desktop
@@ -210,17 +696,23 @@ class SartopoSession():
         :type syncInterval: int, optional
         :param syncTimeout: Sync timeout in seconds; defaults to 10
         :type syncTimeout: int, optional
+        :param syncPauseTimeout: Maximum time in seconds that the sync thread will wait for in-flight write requests to complete before syncing anyway; defaults to 30
+        :type syncPauseTimeout: int, optional
         :param syncDumpFile: Base filename (will be appended by timestamp) to dump the results of each sync call; defaults to None
         :type syncDumpFile: str, optional
         :param cacheDumpFile: Base filename (will be appended by timestamp) to dump the local cache contents on each sync call; defaults to None
         :type cacheDumpFile: str, optional
-        :param propertyUpdateCallback: Function to call when any feature's property has changed during sync; the function will be called with the affected feature object as the only argument; defaults to None
+        :param propertyUpdateCallback: Function to call when any feature's property has changed during sync; the function will be called with the affected feature object as the only argument; defaults to None \n
+            - this and the geometry, new feature, and deleted feature callbacks are called after the entire sync response has been merged into the cache and cacheLock has been released, in the order the changes were merged, rather than as each feature is merged; so the cache already reflects the whole sync response when any callback runs
         :type propertyUpdateCallback: function, optional
-        :param geometryUpdateCallback: Function to call when any feature's geometry has changed during sync; the function will be called with the affected feature object as the only argument; defaults to None
+        :param geometryUpdateCallback: Function to call when any feature's geometry has changed during sync; the function will be called with the affected feature object as the only argument; defaults to None \n
+            - like propertyUpdateCallback, called after the entire sync response has been merged into the cache
         :type geometryUpdateCallback: function, optional
-        :param newFeatureCallback: Function to call when a new feature was added to the local cache during sync; the function will be called with the new feature object as the only argument; defaults to None
+        :param newFeatureCallback: Function to call when a new feature was added to the local cache during sync; the function will be called with the new feature object as the only argument; defaults to None \n
+            - like propertyUpdateCallback, called after the entire sync response has been merged into the cache
         :type newFeatureCallback: function, optional
-        :param deletedFeatureCallback: Function to call when a feature was deleted from the local cache during sync; the function will be called with the deleted feature object as the only argument; defaults to None
+        :param deletedFeatureCallback: Function to call when a feature was deleted from the local cache during sync; the function will be called with the deleted feature object as the only argument; defaults to None \n
+            - like propertyUpdateCallback, called after the entire sync response has been merged into the cache
         :type deletedFeatureCallback: function, optional
         :param syncCallback: Function to call on each successful sync; the function will be called with no arguments; defaults to None
         :type syncCallback: function, optional
@@ -230,8 +722,30 @@ class SartopoSession():
         :type caseSensitiveComparisons: bool, optional
         :param validatePoints: one of 'modify', 'warn', or False: should coordinates be checked or modified for correct longitude-then-latitide sequence as requests are sent; defaults to 'modify'; setting to False disables calls to ._validatePoints from ._sendRequest
         :type validatePoints: optional
+        :param editCoalesceWindow: Write-behind window in seconds for .editFeature; if greater than 0, edits to the same feature that arrive within this many seconds of each other are merged and sent as one request (see .flushEdits); defaults to 0, which sends every edit immediately \n
+            - while edits are buffered, .editFeature returns before the request is sent, so a failed request is only logged (or returned by .flushEdits)
+        :type editCoalesceWindow: float, optional
+        :param editCoalesceMaxLatency: Maximum time in seconds that a coalesced edit can be held before it is sent, even if more edits to the same feature keep arriving; only relevant if editCoalesceWindow is greater than 0; defaults to 5
+        :type editCoalesceMaxLatency: float, optional
+        :param maxWorkers: Number of worker threads in the session's request thread pool, used by .delFeatures and other batch operations; defaults to 10
+        :type maxWorkers: int, optional
+        :param captureFile: Filename to record every request and response to, with credentials redacted, for later replay (see capture.py); gzip-compressed if it ends in .gz; defaults to None
+        :type captureFile: str, optional
+        :param transport: Transport object used to send all HTTP requests (see transport.py); defaults to None, which uses a RequestsTransport with a connection pool sized for maxWorkers
+        :param accountDataTTL: Maximum age in seconds of the cached account data (see .getAccountData) before account-level methods such as .getMapList automatically fetch the latest changes; 0 to only refresh when requested; defaults to 60
+        :type accountDataTTL: float, optional
+        :param geometryCacheSize: Maximum number of shapely geometries kept by the geometry operations (.cut, .expand, .crop, .getBounds) for reuse, e.g. when cropping many tracks with the same boundary; see .getGeometryCacheStats; 0 to disable; defaults to 256
+        :type geometryCacheSize: int, optional
+        :param geometryLogging: one of 'summary', 'detail', or False: logging done by the point list cleanup methods ._removeSpurs and ._removeDuplicatePoints; 'summary' logs one line per call, only if points were removed; 'detail' logs every spur removed, and every point examined with the entire before and after point lists, as in previous versions, and uses the original per-point loops; defaults to 'summary'
+        :type geometryLogging: optional
+        :param simplifyTolerance: Tolerance in meters for simplifying line and polygon geometry as requests are sent, e.g. to reduce the size of requests for long GPS tracks;
+            vertices are removed only if the geometry stays within this distance of the original, without creating self-intersections (see ._reduceGeometry and .getPayloadStats);
+            edited geometry is reduced before it is merged into the cache, so the cache holds the same vertices as the server; 0 to send all vertices; defaults to 0
+        :type simplifyTolerance: float, optional
+        :param coordinatePrecision: Number of decimal places to round longitude and latitude to as requests are sent, e.g. 6 for about 0.1 meter; elevation, time, and any other
+            elements of each point are not rounded; None to send coordinates at full precision; defaults to None
+        :type coordinatePrecision: int, optional
         """            
-        self.s=requests.session()
         self.apiVersion=-1
         self.mapID=mapID
         self.domainAndPort=domainAndPort
@@ -247,7 +761,10 @@ class SartopoSession():
         self.accountIdInternet=accountIdInternet
         self.sync=sync
         self.syncTimeout=syncTimeout
-        self.syncPause=False
+        self.syncPauseTimeout=syncPauseTimeout
+        self.inFlightWrites=0 # number of POST or DELETE requests currently in flight, from any thread; see _sendRequest
+        self.inFlightCondition=threading.Condition()
+        self.syncPauseRequested=False # set by assigning .syncPause; see the syncPause property
         self.propertyUpdateCallback=propertyUpdateCallback
         self.geometryUpdateCallback=geometryUpdateCallback
         self.newFeatureCallback=newFeatureCallback
@@ -263,7 +780,46 @@ class SartopoSession():
         self.syncing=False
         self.caseSensitiveComparisons=caseSensitiveComparisons
         self.validatePoints=validatePoints
+        self.geometryLogging=geometryLogging
+        self.simplifyTolerance=simplifyTolerance
+        self.coordinatePrecision=coordinatePrecision
+        self.payloadStats={'requests':0,'verticesBefore':0,'verticesAfter':0,'bytesBefore':0,'bytesAfter':0} # see _reduceGeometry
+        self.payloadStatsLock=threading.Lock()
+        self.editCoalesceWindow=editCoalesceWindow
+        self.editCoalesceMaxLatency=editCoalesceMaxLatency
+        self.pendingEdits={} # (id,lowercase class) --> pending edit request data; see editFeature
+        self.pendingEditsLock=threading.Lock()
+        self.pendingEditsCondition=threading.Condition(self.pendingEditsLock)
+        self.sendingEdits={} # (id,lowercase class) --> None, for each feature that has a write request in flight; see _claimEditKey
+        self.editFlushThreadStarted=False
+        self.maxWorkers=maxWorkers
+        self.executor=None # created as needed by _getExecutor
+        self.executorLock=threading.Lock()
+        self.cacheLock=threading.RLock() # held while the cache or its index is modified or searched
+        self.featureIndex=None # secondary indexes of the cache; see _getFeatureIndex
+        self.spatialIndex=None # spatial index of the cache; see _getSpatialIndex
+        self.geometryCache=_GeometryCache(geometryCacheSize) # see _getCachedGeom
+        self.localProjections={} # (lon0,lat0) --> _LocalProjection; see _getLocalProjection
+        self.measurementCache={} # feature id --> (geometry fingerprint, measurement dict); see getMeasurements
+        self.geod=pyproj.Geod(ellps='WGS84') if pyproj else None # for segment lengths; see _measureGeometries
+        self.pointClassifiers={} # (point classes,polygon classes) --> _PointClassifier; see classifyPoints
+        self.localProjectionsLock=threading.Lock()
         self.accountData=None
+        self.accountDataTimestamp=0 # the server's 'since' timestamp of the last account data response
+        self.accountDataFetched=0 # local time of the last account data response
+        self.accountDataVersion=0 # incremented whenever .accountData changes
+        self.accountDataTTL=accountDataTTL
+        self.groupAccounts=[]
+        self.personalAccounts=[]
+        self.accountIndex=None # built from .accountData as needed; see _getAccountIndex
+        self.accountIndexVersion=-1
+        self.mapListCache={}
+        self.transport=transport or RequestsTransport(poolMaxsize=maxWorkers)
+        self.captureFile=captureFile
+        self.captureWriter=None
+        if captureFile:
+            self.captureWriter=CaptureWriter(captureFile)
+            self.transport=RecordingTransport(self.transport,self.captureWriter)
         # call _setupSession even if this is a mapless session, to read the config file, setup fidddler proxy, get userdata/cookies, etc.
         if not self._setupSession():
             raise STSException
@@ -353,7 +909,7 @@ class SartopoSession():
             r=self._sendRequest('post','[NEW]',j,domainAndPort=self.domainAndPort)
             if r:
                 self.mapID=r.rstrip('/').split('/')[-1]
-                self.s=requests.session()
+                self.transport.reset() # new session cookies
                 self._sendUserdata() # to get session cookies for new session
                 time.sleep(1) # to avoid a 401 on the subsequent get request
                 self.delMarker('11111111-1111-1111-1111-111111111111')
@@ -557,9 +1113,13 @@ class SartopoSession():
     #  - maps (not bookmarks) are in the 'features' list, with type:Feature and properties.class:CollaborativeMap
     #  - bookmarks (not maps) are in the 'rels' list, with properties.class:UserAccountMapRel
 
-    def getAccountData(self) -> dict:
-        """Get all account data for the session account.  Populates .accountData, .groupAccounts, and .personalAccounts.
+    def getAccountData(self,full: bool=False) -> dict:
+        """Get all account data for the session account.  Populates .accountData, .groupAccounts, and .personalAccounts.\n
+        The first call gets all account data; later calls only get the changes since the previous call, and merge them into .accountData.
+        .accountDataVersion is incremented whenever .accountData changes.
 
+        :param full: If True, get all account data even if it has been fetched before; defaults to False
+        :type full: bool, optional
         :return: value of .accountData
         :rtype: dict
         """        
@@ -572,13 +1132,80 @@ class SartopoSession():
                 self.accountData=json.load(j)
                 if 'result' in self.accountData.keys():
                     self.accountData=self.accountData['result']
+            self.accountDataVersion+=1
+            self._sortAccounts()
+            return self.accountData
+        incremental=self.accountData is not None and not full
+        since=max(0,self.accountDataTimestamp-500) if incremental else 0
+        url='/api/v1/acct/'+self.accountId+'/since/'+str(since)
+        # logging.info('  sending GET request 2 to '+url)
+        rj=self._sendRequest('get',url,j=None,returnJson='ALL')
+        if not rj:
+            logging.error('Account data request failed; account data was not updated.')
+            return self.accountData
+        # with open('acct_since_0.json','w') as outfile:
+        #     outfile.write(json.dumps(rj,indent=3))
+        rjr=rj['result']
+        self.accountDataTimestamp=rjr.get('timestamp',0)
+        self.accountDataFetched=time.time()
+        if incremental:
+            (changed,accountsChanged)=self._mergeAccountData(rjr)
         else:
-            url='/api/v1/acct/'+self.accountId+'/since/0'
-            # logging.info('  sending GET request 2 to '+url)
-            rj=self._sendRequest('get',url,j=None,returnJson='ALL')
-            self.accountData=rj['result']
-            # with open('acct_since_0.json','w') as outfile:
-            #     outfile.write(json.dumps(rj,indent=3))
+            self.accountData=rjr
+            (changed,accountsChanged)=(True,True)
+        if changed:
+            self.accountDataVersion+=1
+        if accountsChanged:
+            self._sortAccounts()
+        return self.accountData
+
+    def _mergeAccountData(self,rjr: dict) -> tuple:
+        """Internal method to merge an incremental account 'since' response into .accountData.\n
+        Items of each list in the response (features, rels, accounts, etc.) replace the cached items of the same id, or are appended;
+        if the response includes 'ids', cached items of each class listed there are removed if their id is not listed.
+
+        :param rjr: 'result' value of the account 'since' response
+        :type rjr: dict
+        :return: (changed,accountsChanged) - whether .accountData changed at all, and whether .accountData['accounts'] changed
+        :rtype: tuple
+        """
+        changed=False
+        accountsChanged=False
+        for (key,items) in rjr.items():
+            if key=='ids' or not isinstance(items,list) or not items:
+                continue
+            cached=self.accountData.setdefault(key,[])
+            index={x.get('id'):n for (n,x) in enumerate(cached)}
+            for item in items:
+                n=index.get(item.get('id'))
+                if n is None:
+                    index[item.get('id')]=len(cached)
+                    cached.append(item)
+                elif cached[n]!=item:
+                    cached[n]=item
+                else:
+                    continue
+                changed=True
+                if key=='accounts':
+                    accountsChanged=True
+        ids=rjr.get('ids')
+        if ids:
+            keep={c:set(i) for (c,i) in ids.items()}
+            for (key,cached) in self.accountData.items():
+                if key=='ids' or not isinstance(cached,list):
+                    continue
+                kept=[x for x in cached if x.get('id') in keep.get(x.get('properties',{}).get('class'),[x.get('id')])]
+                if len(kept)<len(cached):
+                    self.accountData[key]=kept
+                    changed=True
+                    if key=='accounts':
+                        accountsChanged=True
+        self.accountData['timestamp']=rjr.get('timestamp',self.accountData.get('timestamp'))
+        return (changed,accountsChanged)
+
+    def _sortAccounts(self):
+        """Internal method to rebuild .groupAccounts and .personalAccounts from .accountData.
+        """
         # self.groupAccounts=[x for x in self.accountData.get('accounts',{})
         #         if 'properties' in x.keys() and 'team' in x['properties'].get('subscriptionType')]
         self.groupAccounts=[]
@@ -590,7 +1217,16 @@ class SartopoSession():
                 else:
                     self.personalAccounts.append(account)
         # logging.info('The signed-in user is a member of these group accounts: '+str([x['properties']['title'] for x in self.groupAccounts]))
-        return self.accountData
+
+    def _refreshAccountData(self,refresh: bool=False):
+        """Internal method to get account data if it has not been fetched yet, or if requested, or if it is older than .accountDataTTL seconds.
+        Called from account-level methods such as .getMapList.
+
+        :param refresh: If True, get the latest changes regardless of age; defaults to False
+        :type refresh: bool, optional
+        """
+        if self.accountData is None or refresh or (self.accountDataTTL and time.time()-self.accountDataFetched>self.accountDataTTL):
+            self.getAccountData()
 
     # after getAccountData, all of the required data is available in self.accountData;
     #  getMapList is just a convenience function that returns a chronologically sorted
@@ -638,8 +1274,7 @@ class SartopoSession():
                    if type is 'bookmark', another key *permission* will exist, with corresponding value
         :rtype: list
         """        
-        if refresh or not self.accountData:
-            self.getAccountData()
+        self._refreshAccountData(refresh)
         mapLists=[]
         rval=[]
         if groupAccountTitle:
@@ -654,25 +1289,65 @@ class SartopoSession():
             else:
                 logging.warning('groupAccountIds was not a list; returning an empty list.')
                 return []
-            gid=groupAccountIds[0]
-            maps=[f for f in self.accountData['features']
-                    if 'properties' in f.keys()
-                    and f['properties'].get('class','')=='CollaborativeMap'
-                    and f['properties'].get('accountId','')==gid]
-            mapLists.append({'id':gid,'title':groupAccountTitle,'maps':maps})
+            mapLists.append(groupAccountIds[0])
         else: # personal maps; allow for the possibility of multiple personal accounts
             if len(self.personalAccounts)>1:
                 logging.info('The currently-signed-in user has more than one personal account; the return value will be a netsted list.')
-            for personalAccount in self.personalAccounts:
-                pid=personalAccount['id']
-                maps=[f for f in self.accountData['features']
-                        if 'properties' in f.keys()
-                        and f['properties'].get('class','')=='CollaborativeMap'
-                        and f['properties'].get('accountId','')==pid]
-                mapLists.append({'id':pid,'title':[x['properties']['title'] for x in self.accountData['accounts'] if x['id']==pid][0],'maps':maps})
-        for mapList in mapLists:
+            mapLists=[personalAccount['id'] for personalAccount in self.personalAccounts]
+        for accountId in mapLists:
+            theList=self._getAccountMapList(accountId,includeBookmarks)
+            if titlesOnly:
+                rval.append([x['title'] for x in theList])
+            else:
+                rval.append([dict(x) for x in theList]) # copies, so the caller can't modify the cached list
+        # if there's only one map list, return it as one list; otherwise return a nested list
+        if len(rval)==1:
+            rval=rval[0]
+        return rval
+
+    def _getAccountIndex(self) -> dict:
+        """Internal method to get indexes of .accountData, rebuilt in one pass whenever .accountDataVersion changes:\n
+          - *mapsByAccount* -> accountId --> list of CollaborativeMap features
+          - *bookmarksByAccount* -> accountId --> list of UserAccountMapRel rels
+          - *featuresById* -> lower-case id --> list of features
+
+        :return: dict of the indexes listed above
+        :rtype: dict
+        """
+        if self.accountIndex is None or self.accountIndexVersion!=self.accountDataVersion:
+            mapsByAccount={}
+            bookmarksByAccount={}
+            featuresById={}
+            for f in self.accountData.get('features',[]):
+                featuresById.setdefault(f.get('id','').lower(),[]).append(f)
+                fp=f.get('properties')
+                if fp is not None and fp.get('class','')=='CollaborativeMap':
+                    mapsByAccount.setdefault(fp.get('accountId',''),[]).append(f)
+            for rel in self.accountData.get('rels',[]):
+                rp=rel.get('properties')
+                if rp is not None and rp.get('class','')=='UserAccountMapRel':
+                    bookmarksByAccount.setdefault(rp.get('accountId',''),[]).append(rel)
+            self.accountIndex={'mapsByAccount':mapsByAccount,'bookmarksByAccount':bookmarksByAccount,'featuresById':featuresById}
+            self.accountIndexVersion=self.accountDataVersion
+            self.mapListCache={}
+        return self.accountIndex
+
+    def _getAccountMapList(self,accountId: str,includeBookmarks: bool=True) -> list:
+        """Internal method to get the chronologically sorted (most recent first) map list of one account, in the format returned by .getMapList.
+        The list is cached until .accountData changes; the caller must not modify it.
+
+        :param accountId: Account ID
+        :type accountId: str
+        :param includeBookmarks: If True, bookmarks will be included in the list; defaults to True
+        :type includeBookmarks: bool, optional
+        :rtype: list
+        """
+        index=self._getAccountIndex()
+        key=(accountId,includeBookmarks)
+        if key not in self.mapListCache:
             theList=[]
-            for map in mapList['maps']:
+            seen=set()
+            for map in index['mapsByAccount'].get(accountId,[]):
                 mp=map['properties']
                 md={
                     'id':map['id'],
@@ -680,14 +1355,12 @@ class SartopoSession():
                     'updated':mp['updated'],
                     'type':'map'
                 }
-                if md not in theList:
+                mk=(md['id'],md['title'],md['updated'],'map')
+                if mk not in seen:
+                    seen.add(mk)
                     theList.append(md)
             if includeBookmarks:
-                bookmarks=[rel for rel in self.accountData['rels']
-                        if 'properties' in rel.keys()
-                        and rel['properties'].get('class','')=='UserAccountMapRel'
-                        and rel['properties'].get('accountId','')==mapList['id']]
-                for bookmark in bookmarks:
+                for bookmark in index['bookmarksByAccount'].get(accountId,[]):
                     bp=bookmark['properties']
                     # testing on bookmarks from various QR codes shows that 'type'
                     #  corresponds to permission: 10=read, 16=update, 20=write
@@ -707,18 +1380,14 @@ class SartopoSession():
                         'type':'bookmark',
                         'permission':permission
                     }
-                    if bd not in theList:
+                    bk=(bd['id'],bd['title'],bd['updated'],'bookmark',permission)
+                    if bk not in seen:
+                        seen.add(bk)
                         theList.append(bd)
             # chronological sort by update timestamp
             theList.sort(key=lambda x: x['updated'],reverse=True)
-            if titlesOnly:
-                rval.append([x['title'] for x in theList])
-            else:
-                rval.append(theList)
-        # if there's only one map list, return it as one list; otherwise return a nested list
-        if len(rval)==1:
-            rval=rval[0]
-        return rval
+            self.mapListCache[key]=theList
+        return self.mapListCache[key]
 
     def getAllMapLists(self,includePersonal=False,includeBookmarks=True,refresh=False,titlesOnly=False) -> list:
         """Get a structured list of maps from all group accounts of which the current user is a member.  Optionally include the user's personal account(s).
@@ -738,8 +1407,7 @@ class SartopoSession():
                  *mapList* -> list of maps for this group account, in the same format as the return value from .getMapList
         :rtype: list
         """        
-        if refresh or not self.accountData:
-            self.getAccountData()
+        self._refreshAccountData(refresh)
         theList=[]
         if includePersonal:
             personalRval=self.getMapList(includeBookmarks=includeBookmarks,refresh=False,titlesOnly=titlesOnly)
@@ -766,13 +1434,12 @@ class SartopoSession():
         :return: Map title
         :rtype: str
         """        
-        if refresh or not self.accountData:
-            self.getAccountData()
+        self._refreshAccountData(refresh)
         mapID=mapID or self.mapID
         if not mapID:
             logging.warning('getMapTitle was called with no mapID specified, but, the current session has no open map.')
             return 'NONE'
-        titles=[x['properties']['title'] for x in self.accountData['features'] if x.get('id','').lower()==mapID.lower()]
+        titles=[x['properties']['title'] for x in self._getAccountIndex()['featuresById'].get(mapID.lower(),[])]
         if len(titles)>1:
             logging.warning('More than one map have the specified map ID '+str(mapID)+':'+str(titles))
             return ''
@@ -790,8 +1457,7 @@ class SartopoSession():
         :return: List of account titles
         :rtype: list
         """        
-        if refresh or not self.accountData:
-            self.getAccountData()
+        self._refreshAccountData(refresh)
         return [x['properties']['title'] for x in self.groupAccounts]
 
     def _doSync(self):
@@ -833,28 +1499,36 @@ class SartopoSession():
                 self.syncCallback()
             rjr=rj['result']
             rjrsf=rjr['state']['features']
-            
-            # 1 - if 'ids' exists, use it verbatim; cleanup happens later
-            idsBefore=None
-            if 'ids' in rjr.keys():
-                idsBefore=copy.deepcopy(self.mapData['ids'])
-                self.mapData['ids']=rjr['ids']
-                logging.info('  Updating "ids"')
-            
-            # 2 - update existing features as needed
-            if len(rjrsf)>0:
-                logging.info('  processing '+str(len(rjrsf))+' feature(s):'+str([x['id'] for x in rjrsf]))
-                # logging.info(json.dumps(rj,indent=3))
-                for f in rjrsf:
-                    rjrfid=f['id']
-                    prop=f['properties']
-                    title=str(prop.get('title',None))
-                    featureClass=str(prop['class'])
-                    processed=False
-                    for i in range(len(self.mapData['state']['features'])):
+
+            # the cache and its index are modified while holding cacheLock, so that getFeatures
+            #  calls from other threads see a consistent cache; callbacks are collected and called
+            #  after the lock is released, in the same order, so that a callback can safely wait
+            #  on another thread that is reading the cache
+            callbacks=[]
+            with self.cacheLock:
+                index=self._getFeatureIndex()
+
+                # 1 - if 'ids' exists, use it verbatim; cleanup happens later
+                idsBefore=None
+                if 'ids' in rjr.keys():
+                    idsBefore={c:list(ids) for (c,ids) in self.mapData['ids'].items()}
+                    self.mapData['ids']=rjr['ids']
+                    logging.info('  Updating "ids"')
+                idSets={} # class --> set of ids in self.mapData['ids'], built as needed
+
+                # 2 - update existing features as needed
+                if len(rjrsf)>0:
+                    logging.info('  processing '+str(len(rjrsf))+' feature(s):'+str([x['id'] for x in rjrsf]))
+                    # logging.info(json.dumps(rj,indent=3))
+                    for f in rjrsf:
+                        rjrfid=f['id']
+                        prop=f['properties']
+                        title=str(prop.get('title',None))
+                        featureClass=str(prop['class'])
                         # only modify existing cache data if id and class are both matches:
                         #  subset apptracks can have the same id as the finished apptrack shape
-                        if self.mapData['state']['features'][i]['id']==rjrfid and self.mapData['state']['features'][i]['properties']['class']==featureClass:
+                        cached=index.first(rjrfid,featureClass)
+                        if cached is not None:
                             # don't simply overwrite the entire feature entry:
                             #  - if only geometry was changed, indicated by properties['nop']=true,
                             #    then leave properties alone and just overwrite geometry;
@@ -864,24 +1538,25 @@ class SartopoSession():
                             #  - if f->prop->title exists, replace the entire prop dict
                             #  - if f->geometry exists, replace the entire geometry dict
                             if 'title' in prop.keys():
-                                if self.mapData['state']['features'][i]['properties']!=prop:
+                                if cached['properties']!=prop:
                                     logging.info('  Updating properties for '+featureClass+':'+title)
-                                    # logging.info('    old:'+json.dumps(self.mapData['state']['features'][i]['properties']))
+                                    # logging.info('    old:'+json.dumps(cached['properties']))
                                     # logging.info('    new:'+json.dumps(prop))
-                                    self.mapData['state']['features'][i]['properties']=prop
+                                    cached['properties']=prop
+                                    index.update(cached)
                                     if self.propertyUpdateCallback:
-                                        self.propertyUpdateCallback(f)
+                                        callbacks.append((self.propertyUpdateCallback,(f,)))
                                 else:
                                     logging.info('  response contained properties for '+featureClass+':'+title+' but they matched the cache, so no cache update or callback is performed')
                             if title=='None':
-                                title=self.mapData['state']['features'][i]['properties']['title']
+                                title=cached['properties']['title']
                             if 'geometry' in f.keys():
-                                if self.mapData['state']['features'][i]['geometry']!=f['geometry']:
+                                if cached['geometry']!=f['geometry']:
                                     logging.info('  Updating geometry for '+featureClass+':'+title)
                                     # if geometry.incremental exists and is true, append new coordinates to existing coordinates
                                     # otherwise, replace the entire geometry value
                                     fg=f['geometry']
-                                    mdsfg=self.mapData['state']['features'][i]['geometry']
+                                    mdsfg=cached['geometry']
                                     if fg.get('incremental',None):
                                         mdsfgc=mdsfg['coordinates']
                                         latestExistingTS=mdsfgc[-1][3]
@@ -896,48 +1571,56 @@ class SartopoSession():
                                                 break
                                         mdsfg['size']=len(mdsfgc)
                                     else:
-                                        self.mapData['state']['features'][i]['geometry']=f['geometry']
+                                        cached['geometry']=f['geometry']
+                                    self._cacheGeometryUpdated(cached)
                                     if self.geometryUpdateCallback:
-                                        self.geometryUpdateCallback(f)
+                                        callbacks.append((self.geometryUpdateCallback,(f,)))
                                 else:
                                     logging.info('  response contained geometry for '+featureClass+':'+title+' but it matched the cache, so no cache update or callback is performed')
-                            processed=True
-                            break
-                    # 2b - otherwise, create it - and add to ids so it doesn't get cleaned
-                    if not processed:
-                        # logging.info('Adding to cache:'+featureClass+':'+title)
-                        self.mapData['state']['features'].append(f)
-                        if f['id'] not in self.mapData['ids'][prop['class']]:
-                            self.mapData['ids'][prop['class']].append(f['id'])
-                        # logging.info('mapData immediate:\n'+json.dumps(self.mapData,indent=3))
-                        if self.newFeatureCallback:
-                            self.newFeatureCallback(f)
-
-            # 3 - cleanup - remove features from the cache whose ids are no longer in cached id list
-            #  (ids will be part of the response whenever feature(s) were added or deleted)
-            #  (finishing an apptrack moves the id from AppTracks to Shapes, so the id count is not affected)
-            #  (if the server does not remove the apptrack correctly after finishing, the same id will
-            #   be in AppTracks and in Shapes)
-            # beforeStr='mapData before cleanup:'+json.dumps(self.mapData,indent=3)
-            #  at this point in the code, the deleted feature has been removed from ids but is still part of state-features
-            # self.mapIDs=sum(self.mapData['ids'].values(),[])
-            # mapSFIDsBefore=[f['id'] for f in self.mapData['state']['features']]
-            # edit the cache directly: https://stackoverflow.com/a/1157174/3577105
-
-            if idsBefore:
-                deletedDict={}
-                deletedAnythingFlag=False
-                for c in idsBefore.keys():
-                    for id in idsBefore[c]:
-                        if id not in self.mapData['ids'][c]:
-                            self.mapData['state']['features'][:]=(f for f in self.mapData['state']['features'] if not(f['id']==id and f['properties']['class']==c))
-                            deletedDict.setdefault(c,[]).append(id)
-                            deletedAnythingFlag=True
-                            if self.deletedFeatureCallback:
-                                self.deletedFeatureCallback(id,c)
-                if deletedAnythingFlag:
-                    logging.info('deleted items have been removed from cache:\n'+json.dumps(deletedDict,indent=3))
-            
+                        # 2b - otherwise, create it - and add to ids so it doesn't get cleaned
+                        else:
+                            # logging.info('Adding to cache:'+featureClass+':'+title)
+                            self.mapData['state']['features'].append(f)
+                            self._cacheFeatureAdded(f)
+                            classIds=self.mapData['ids'].setdefault(prop['class'],[])
+                            if prop['class'] not in idSets:
+                                idSets[prop['class']]=set(classIds)
+                            if f['id'] not in idSets[prop['class']]:
+                                classIds.append(f['id'])
+                                idSets[prop['class']].add(f['id'])
+                            # logging.info('mapData immediate:\n'+json.dumps(self.mapData,indent=3))
+                            if self.newFeatureCallback:
+                                callbacks.append((self.newFeatureCallback,(f,)))
+
+                # 3 - cleanup - remove features from the cache whose ids are no longer in cached id list
+                #  (ids will be part of the response whenever feature(s) were added or deleted)
+                #  (finishing an apptrack moves the id from AppTracks to Shapes, so the id count is not affected)
+                #  (if the server does not remove the apptrack correctly after finishing, the same id will
+                #   be in AppTracks and in Shapes)
+                #  at this point in the code, the deleted feature has been removed from ids but is still part of state-features
+                #  edit the cache directly: https://stackoverflow.com/a/1157174/3577105
+                #  all deleted features are removed in one pass over the cache
+                if idsBefore:
+                    deletedDict={}
+                    deletedKeys=set()
+                    for c in idsBefore.keys():
+                        current=set(self.mapData['ids'].get(c,[]))
+                        for id in idsBefore[c]:
+                            if id not in current:
+                                deletedKeys.add((id,c))
+                                deletedDict.setdefault(c,[]).append(id)
+                                if self.deletedFeatureCallback:
+                                    callbacks.append((self.deletedFeatureCallback,(id,c)))
+                    if deletedKeys:
+                        features=self.mapData['state']['features']
+                        for f in features:
+                            if (f['id'],f['properties']['class']) in deletedKeys:
+                                self._cacheFeatureRemoved(f)
+                        features[:]=(f for f in features if (f['id'],f['properties']['class']) not in deletedKeys)
+                        logging.info('deleted items have been removed from cache:\n'+json.dumps(deletedDict,indent=3))
+
+            for (callback,args) in callbacks:
+                callback(*args)
 
             # l1=len(self.mapData['state']['features'])
             # logging.info('before:'+str(l1)+':'+str(self.mapData['state']['features']))
@@ -1043,6 +1726,10 @@ class SartopoSession():
         logging.info('SartopoSession instance deleted'+suffix+'.')
         if self.sync and self.lastSuccessfulSyncTimestamp>0:
             self._stop()
+        if getattr(self,'executor',None):
+            self.executor.shutdown(wait=False)
+        if getattr(self,'transport',None):
+            self.transport.close()
 
     def _start(self):
         """Internal method to start the sync thread. \n
@@ -1109,19 +1796,16 @@ class SartopoSession():
             time.sleep(self.syncInterval)
         while self.sync:
             if not self.syncPauseManual:
-                self.syncPauseMessageGiven=False
-                while self.syncPause:
-                    if not threading.main_thread().is_alive():
+                if self.syncPause:
+                    logging.info(self.mapID+': sync pause begins; sync will not happen until .syncPause is set to False (if it was set) and '+str(self.inFlightWrites)+' in-flight write request(s) complete')
+                    if self._waitForWrites(self.syncPauseTimeout):
+                        logging.info(self.mapID+': sync pause ends; resuming sync')
+                    elif threading.main_thread().is_alive():
+                        logging.warning(self.mapID+': sync pause timed out after '+str(self.syncPauseTimeout)+' seconds with '+str(self.inFlightWrites)+' write request(s) still in flight; syncing anyway')
+                    else:
                         logging.info('Main thread has ended; sync is stopping...')
-                        self.syncPause=False
                         self.sync=False
-                    if not self.syncPauseMessageGiven:
-                        logging.info(self.mapID+': sync pause begins; sync will not happen until sync pause ends')
-                        self.syncPauseMessageGiven=True
-                    time.sleep(1)
-                if self.syncPauseMessageGiven:
-                    logging.info(self.mapID+': sync pause ends; resuming sync')
-                    self.syncPauseMessageGiven=False
+                        break
                 syncWaited=0
                 while self.syncing and syncWaited<20: # wait for any current callbacks within _doSync() to complete, with timeout of 20 sec
                     logging.info(' [sync from _syncLoop is waiting for current sync processing to finish, up to '+str(20-syncWaited)+' more seconds...]')
@@ -1133,13 +1817,94 @@ class SartopoSession():
                 except Exception as e:
                     logging.exception('Exception during sync of map '+self.mapID+'; stopping sync:') # logging.exception logs details and traceback
                     # remove sync blockers, to let the thread shut down cleanly, avoiding a zombie loop when sync restart is attempted
-                    self.syncPause=False
                     self.syncing=False
                     self.syncThreadStarted=False
                     self.sync=False
             if self.sync: # don't bother with the sleep if sync is no longer True
                 time.sleep(self.syncInterval)
 
+    @property
+    def s(self) -> requests.Session:
+        """The requests session used by the default transport, e.g. for mounting adapters; None if the transport does not use requests.
+
+        Setting .s to a requests session replaces the transport with a RequestsTransport that uses that session (still recording
+        to the capture file, if any), for compatibility with code that assigned .s directly in earlier versions.
+
+        :rtype: requests.Session
+        """
+        return getattr(self.transport,'session',None)
+
+    @s.setter
+    def s(self,session: requests.Session):
+        transport=RequestsTransport(poolMaxsize=self.maxWorkers,session=session)
+        if isinstance(self.transport,RecordingTransport):
+            self.transport.transport=transport
+        else:
+            self.transport=transport
+
+    # in-flight write tracking: sync should not happen while any POST or DELETE request is in
+    #  flight, from any thread (main thread, worker threads, the thread pool, the edit flush
+    #  thread); a counter (rather than a single flag) is needed so that the first request to
+    #  finish does not end the pause while other requests are still in flight.  The counter is
+    #  always decremented in a 'finally' clause, so that no error path can leave sync paused;
+    #  the sync thread waits with a timeout (syncPauseTimeout) regardless.
+
+    @property
+    def syncPause(self) -> bool:
+        """True while sync is held off: while .syncPause has been set to True by the caller, or while one or more write (POST or DELETE)
+        requests are in flight.  The sync thread waits for this to become False before each sync.\n
+        Setting .syncPause to True holds off sync until it is set to False again, as in earlier versions.  The wait for in-flight
+        writes, however, ends after .syncPauseTimeout seconds.  Unlike earlier versions, GET requests do not pause sync.
+
+        :rtype: bool
+        """
+        return self.syncPauseRequested or self.inFlightWrites>0
+
+    @syncPause.setter
+    def syncPause(self,value: bool):
+        with self.inFlightCondition:
+            self.syncPauseRequested=bool(value)
+            self.inFlightCondition.notify_all()
+
+    def _beginWrite(self):
+        """Internal method to count a write request as in flight; called from ._sendRequest.
+        """
+        with self.inFlightCondition:
+            self.inFlightWrites+=1
+
+    def _endWrite(self):
+        """Internal method to count a write request as complete, and wake the sync thread if no more writes are in flight; called from ._sendRequest.
+        """
+        with self.inFlightCondition:
+            self.inFlightWrites=max(0,self.inFlightWrites-1)
+            if self.inFlightWrites==0:
+                self.inFlightCondition.notify_all()
+
+    def _waitForWrites(self,timeout: float) -> bool:
+        """Internal method to wait until .syncPause is False: until no write requests are in flight, and .syncPause has not been set to True.\n
+        Returns early (with False) if the main thread has ended.
+
+        :param timeout: Maximum time to wait for in-flight writes, in seconds; there is no limit on the wait while .syncPause is set to True,
+            and the timeout starts again when it is set to False
+        :type timeout: float
+        :return: True if .syncPause is False; False if the wait for in-flight writes timed out, or if the main thread has ended
+        :rtype: bool
+        """
+        deadline=time.time()+timeout
+        with self.inFlightCondition:
+            while self.syncPauseRequested or self.inFlightWrites>0:
+                if not threading.main_thread().is_alive():
+                    return False
+                if self.syncPauseRequested:
+                    deadline=time.time()+timeout
+                    self.inFlightCondition.wait(1)
+                    continue
+                remaining=deadline-time.time()
+                if remaining<=0:
+                    return False
+                self.inFlightCondition.wait(min(remaining,1))
+        return True
+
     # return the token needed for signed request
     #  (to be used as they value for the 'signature' key of request params dict)
     def _getToken(self,data: str) -> str:
@@ -1157,7 +1922,7 @@ class SartopoSession():
         # logging.info("hashed data:"+str(token))
         return token
 
-    def _validatePoints(self,geom: list,modify: bool=False):
+    def _validatePoints(self,geom: list,modify: bool=False,vectorize: bool=True):
         """Internal method to find any points from the specified geometry that are 'obviously' lon-lat-swapped.  \n
         Normally only called from _sendRequest.
 
@@ -1182,11 +1947,15 @@ class SartopoSession():
         - otherwise: do not modify any points; note, this includes the case where there are obviously-valid points but no obviously-swapped points
 
         Log messages will be generated as needed, regardless of the value of *modify*.
+
+        Lists of points that do not need to be modified are not copied; if no points are modified, the geom argument itself is returned.
         
         :param geom: point, list of points, or list of lists of points
         :type geom: list
         :param modify: True to modify the points list before returning if needed as above; False to always return the unmodified list; defaults to False
         :type modify: bool
+        :param vectorize: True to classify points with numpy (see ._findSwappedPoints); False to use a python loop; the results are the same; defaults to True
+        :type vectorize: bool
         :return: A modified or unmodified copy of the geom argument value, based on *modify*
         """
         # note: if self.validatePoints is False, this method is never called
@@ -1206,22 +1975,14 @@ class SartopoSession():
         # logging.info('validatePoints called:level'+str(level)+':'+str(geom))
         newLOLOP=[]
         rval=geom
+        modified=False
 
         # validate each list of points
         # note: a problem with this algorithm is that it will check and possibly modify each list of points
         #  independent from any other lists of points in the same LOLOP.  This case would probably never
         #  happen anyway, and if it does slip through the cracks, the results should be obvious.
         for LOP in LOLOP:
-            obvSwappedPoint=False
-            obvValidPoint=False
-            newPoints=LOP
-            # don't use _twoify, since each point may have more than two elements, in which case we need to preserve any elements after the first two
-            for point in LOP:
-                [lon,lat]=point[0:2]
-                if abs(lat)>90:
-                    obvSwappedPoint=point
-                elif 90<=abs(lon)<=180: # abs(lat)<=90 is implicit since the 'if' clause did not match
-                    obvValidPoint=point
+            (obvSwappedPoint,obvValidPoint)=self._findSwappedPoints(LOP,vectorize=vectorize)
             if obvSwappedPoint:
                 if obvValidPoint:
                     logging.error('POINT LIST VALIDATION: at least one obviously valid point '+str(obvValidPoint)+' and at least one obviously swapped point '+str(obvSwappedPoint)+' were found in the same point list; not sure whether to swap the lat/long sequence; this feature may fail to generate')
@@ -1234,20 +1995,16 @@ class SartopoSession():
                     logging.warn('POINT LIST VALIDATION: at least one obviously swapped point '+str(obvSwappedPoint)+' was found, and no obviously valid points were found')
                     if modify:
                         logging.warn('   and the modify switch is True, so the first two elements of every point are being swapped')
-                        newPoints=[]
-                        for point in LOP:
-                            newPoint=[point[1],point[0]]
-                            if len(point)>2:
-                                newPoint+=point[2:]
-                            newPoints.append(newPoint)
-                        # logging.info('NEWPOINTS:'+str(newPoints))
-                        LOP=newPoints
+                        # don't use _twoify, since each point may have more than two elements, in which case we need to preserve any elements after the first two
+                        LOP=[[point[1],point[0],*point[2:]] for point in LOP]
+                        # logging.info('NEWPOINTS:'+str(LOP))
+                        modified=True
                     else:
                         logging.warn('   but the modify switch is False, so no points will be modified; you may see unexpected map results')
             if modify:
                 newLOLOP.append(LOP)
         # logging.info('newLOLOP:'+str(newLOLOP))
-        if modify: # now unpack newLOLOP - always a List of Lists of Points
+        if modify and modified: # now unpack newLOLOP - always a List of Lists of Points
             if level==3: # level 3 needs no unpacking
                 rval=newLOLOP
             if level==2: # level 2: unpack one level
@@ -1257,7 +2014,259 @@ class SartopoSession():
             # logging.info('POINTS just before return from _validatePoints:'+str(rval))
         return rval
 
-    def _sendRequest(self,type: str,apiUrlEnd: str,j: dict,id: str='',returnJson: str='',timeout: int=0,domainAndPort: str=''):
+    def _findSwappedPoints(self,points: list,vectorize: bool=True):
+        """Internal method to classify the points of one list of points, for ._validatePoints.\n
+        With vectorize=True, the longitudes and latitudes are classified as numpy arrays; any list that numpy can't
+        represent as two plain numeric arrays (e.g. non-numeric values, or points with fewer than two elements) is
+        classified by the python loop instead, so that the results, and any exceptions for malformed points, are the same.
+
+        :param points: List of points
+        :type points: list
+        :param vectorize: True to use numpy; False to use a python loop; defaults to True
+        :type vectorize: bool
+        :return: Tuple of (last obviously-swapped point, last obviously-valid point); each is False if there is no such point;
+            see ._validatePoints for the definitions
+        :rtype: tuple
+        """
+        if vectorize:
+            (lons,lats)=self._xyArrays(points)
+            if lats is not None:
+                absLon=numpy.abs(lons)
+                swapped=numpy.abs(lats)>90
+                valid=~swapped&(absLon>=90)&(absLon<=180)
+                swappedIdx=numpy.flatnonzero(swapped)
+                validIdx=numpy.flatnonzero(valid)
+                return (points[swappedIdx[-1]] if len(swappedIdx) else False,points[validIdx[-1]] if len(validIdx) else False)
+        obvSwappedPoint=False
+        obvValidPoint=False
+        for point in points:
+            [lon,lat]=point[0:2]
+            if abs(lat)>90:
+                obvSwappedPoint=point
+            elif 90<=abs(lon)<=180: # abs(lat)<=90 is implicit since the 'if' clause did not match
+                obvValidPoint=point
+        return (obvSwappedPoint,obvValidPoint)
+
+    def _xyArrays(self,points: list):
+        """Internal method to get the first two elements of each point in a list of points as two numpy arrays, for the vectorized point list methods.
+
+        :param points: List of points
+        :type points: list
+        :return: Tuple of (x array, y array), or (None,None) if the points can't be represented as plain numeric arrays,
+            e.g. if any point has fewer than two elements or any non-numeric first or second element; callers should then use a python loop
+        :rtype: tuple
+        """
+        try:
+            xs=numpy.array([point[0] for point in points])
+            ys=numpy.array([point[1] for point in points])
+        except Exception:
+            return (None,None)
+        if xs.ndim!=1 or ys.ndim!=1 or xs.dtype.kind not in 'biuf' or ys.dtype.kind not in 'biuf':
+            return (None,None)
+        return (xs,ys)
+
+    def _reduceGeometry(self,geometry: dict) -> dict:
+        """Internal method to reduce the size of a geometry before it is sent, based on .simplifyTolerance and .coordinatePrecision.  \n
+        Called from ._buildRequest as requests are sent (the add methods then cache the feature returned by the server), and from ._applyEdit
+        before edited geometry is merged into the cache, so that the cache holds the same geometry as the server.
+
+        LineString, MultiLineString, Polygon, and MultiPolygon geometries are simplified (see ._simplifyPoints and ._simplifyRings);
+        then the longitude and latitude of every point are rounded (see ._quantizeCoords).  The vertex and byte counts before and after
+        are added to .payloadStats (see .getPayloadStats).  If the geometry has a 'size' key (as sent by .addAppTrack), it is set to the new number of points.
+
+        :param geometry: Geometry data object, with 'type' and 'coordinates' keys; not modified
+        :type geometry: dict
+        :return: Reduced copy of the geometry, or the geometry argument itself if nothing was changed
+        :rtype: dict
+        """
+        gtype=geometry.get('type')
+        coords=geometry['coordinates']
+        try:
+            if self.simplifyTolerance:
+                if gtype=='LineString':
+                    coords=self._simplifyPoints(coords,self.simplifyTolerance)
+                elif gtype=='MultiLineString':
+                    coords=[self._simplifyPoints(part,self.simplifyTolerance) for part in coords]
+                elif gtype=='Polygon':
+                    coords=self._simplifyRings(coords,self.simplifyTolerance)
+                elif gtype=='MultiPolygon':
+                    coords=[self._simplifyRings(part,self.simplifyTolerance) for part in coords]
+            if self.coordinatePrecision is not None:
+                coords=self._quantizeCoords(coords,self.coordinatePrecision)
+        except Exception as e:
+            logging.warning('_reduceGeometry: '+str(gtype)+' geometry could not be reduced and will be sent unmodified: '+str(e))
+            return geometry
+        if coords is geometry['coordinates']:
+            return geometry
+        rval=dict(geometry,coordinates=coords)
+        if 'size' in rval:
+            rval['size']=self._countPoints(coords)
+        verticesBefore=self._countPoints(geometry['coordinates'])
+        verticesAfter=self._countPoints(coords)
+        bytesBefore=len(json.dumps(geometry))
+        bytesAfter=len(json.dumps(rval))
+        with self.payloadStatsLock:
+            self.payloadStats['requests']+=1
+            self.payloadStats['verticesBefore']+=verticesBefore
+            self.payloadStats['verticesAfter']+=verticesAfter
+            self.payloadStats['bytesBefore']+=bytesBefore
+            self.payloadStats['bytesAfter']+=bytesAfter
+        logging.info('_reduceGeometry: '+str(gtype)+' reduced from '+str(verticesBefore)+' to '+str(verticesAfter)+' vertices, '+str(bytesBefore)+' to '+str(bytesAfter)+' bytes')
+        return rval
+
+    def _simplifyPoints(self,points: list,tolerance: float,ring: bool=False) -> list:
+        """Internal method to simplify a list of points, for ._reduceGeometry.\n
+        The points are projected to meters (see ._toLocalMeters), and simplified by shapely (Douglas-Peucker, preserving topology)
+        with the specified tolerance.  Simplification only removes points, so the remaining points are taken from the original list,
+        including any elements after the first two (e.g. elevation and time).
+
+        :param points: List of points
+        :type points: list
+        :param tolerance: Tolerance in meters
+        :type tolerance: float
+        :param ring: If True, the points are a polygon ring, which may or may not be closed; defaults to False
+        :type ring: bool, optional
+        :return: Simplified list of points, or the points argument itself if no points were removed
+        :rtype: list
+        """
+        if len(points)<(4 if ring else 3):
+            return points
+        (mx,my)=self._toLocalMeters(*self._xyArrays(points))
+        if mx is None:
+            return points
+        if ring:
+            geom=shapely.simplify(Polygon(numpy.column_stack((mx,my))),tolerance,preserve_topology=True)
+            if not isinstance(geom,Polygon) or geom.is_empty:
+                return points
+            keep=self._matchCoords(mx,my,numpy.asarray(geom.exterior.coords))
+        else:
+            geom=shapely.simplify(LineString(numpy.column_stack((mx,my))),tolerance,preserve_topology=True)
+            keep=self._matchCoords(mx,my,numpy.asarray(geom.coords))
+        if keep is None or len(keep)==len(points):
+            return points
+        return [points[i] for i in keep]
+
+    def _simplifyRings(self,rings: list,tolerance: float) -> list:
+        """Internal method to simplify the rings of one polygon, for ._reduceGeometry.\n
+        The outer ring and any holes are simplified together, so that they don't cross each other; if simplification would remove
+        a hole, or if any ring can't be simplified, the rings are returned unmodified.
+
+        :param rings: List of rings (lists of points); the first is the outer ring
+        :type rings: list
+        :param tolerance: Tolerance in meters
+        :type tolerance: float
+        :return: Simplified list of rings, or the rings argument itself if no points were removed
+        :rtype: list
+        """
+        if len(rings)==1:
+            newRing=self._simplifyPoints(rings[0],tolerance,ring=True)
+            return rings if newRing is rings[0] else [newRing]
+        # project all rings together, so that they share one projection
+        xys=[self._xyArrays(ring) for ring in rings]
+        if any(xs is None or len(xs)<4 for (xs,ys) in xys):
+            return rings
+        (mx,my)=self._toLocalMeters(numpy.concatenate([xs for (xs,ys) in xys]),numpy.concatenate([ys for (xs,ys) in xys]))
+        splits=numpy.cumsum([len(xs) for (xs,ys) in xys])[:-1]
+        mxs=numpy.split(mx,splits)
+        mys=numpy.split(my,splits)
+        geom=shapely.simplify(Polygon(numpy.column_stack((mxs[0],mys[0])),[numpy.column_stack((x,y)) for (x,y) in zip(mxs[1:],mys[1:])]),tolerance,preserve_topology=True)
+        if not isinstance(geom,Polygon) or geom.is_empty or len(geom.interiors)!=len(rings)-1:
+            return rings
+        rval=[]
+        for (ring,x,y,newRing) in zip(rings,mxs,mys,[geom.exterior]+list(geom.interiors)):
+            keep=self._matchCoords(x,y,numpy.asarray(newRing.coords))
+            if keep is None:
+                return rings
+            rval.append(ring if len(keep)==len(ring) else [ring[i] for i in keep])
+        if all(a is b for (a,b) in zip(rval,rings)):
+            return rings
+        return rval
+
+    def _matchCoords(self,xs,ys,coords):
+        """Internal method to find the indices of the simplified coordinates in the original coordinates, for ._simplifyPoints.\n
+        Each simplified coordinate is matched to the next equal original coordinate, so that repeated coordinates are matched in sequence.
+        A final coordinate that closes a ring is ignored if the original ring was not closed.
+
+        :param xs: Original x coordinates
+        :param ys: Original y coordinates
+        :param coords: Simplified coordinates, as an array of [x,y] rows
+        :return: List of indices into the original coordinates, or None if any simplified coordinate was not found
+        :rtype: list
+        """
+        keep=[]
+        i=0
+        n=len(xs)
+        for (x,y) in coords.tolist():
+            while i<n and (xs[i]!=x or ys[i]!=y):
+                i+=1
+            if i==n:
+                break
+            keep.append(i)
+            i+=1
+        if len(keep)<len(coords)-1 or (len(keep)==len(coords)-1 and not (coords[-1]==coords[0]).all()):
+            return None
+        return keep
+
+    def _toLocalMeters(self,lons,lats):
+        """Internal method to project longitudes and latitudes to meters, in the same local projection as the metric geometry operations (see ._getLocalProjection).
+
+        :param lons: Longitudes, as a numpy array; or None
+        :param lats: Latitudes, as a numpy array; or None
+        :return: Tuple of (x array, y array), or (None,None) if lons or lats is None
+        :rtype: tuple
+        """
+        if lons is None or lats is None:
+            return (None,None)
+        proj=self._getLocalProjection((lons.min(),lats.min(),lons.max(),lats.max()))
+        m=proj._toMeters(numpy.column_stack((lons,lats)))
+        return (m[:,0],m[:,1])
+
+    def _quantizeCoords(self,coords: list,precision: int) -> list:
+        """Internal method to round the longitude and latitude of every point in a point, list of points, or list of lists of points, for ._reduceGeometry.
+
+        :param coords: Point, list of points, or list of lists of points (etc.)
+        :type coords: list
+        :param precision: Number of decimal places
+        :type precision: int
+        :return: Copy of coords, with the first two elements of each point rounded
+        :rtype: list
+        """
+        if not coords:
+            return coords
+        if type(coords[0]) in [list,tuple]:
+            return [self._quantizeCoords(c,precision) for c in coords]
+        return [round(coords[0],precision),round(coords[1],precision),*coords[2:]]
+
+    def _countPoints(self,coords: list) -> int:
+        """Internal method to count the points in a point, list of points, or list of lists of points (etc.).
+
+        :param coords: Point, list of points, or list of lists of points (etc.)
+        :type coords: list
+        :return: Number of points
+        :rtype: int
+        """
+        if not coords:
+            return 0
+        if type(coords[0]) in [list,tuple]:
+            if type(coords[0][0]) in [list,tuple]:
+                return sum(self._countPoints(c) for c in coords)
+            return len(coords)
+        return 1
+
+    def getPayloadStats(self) -> dict:
+        """Get statistics of the geometry size reduction done as requests are sent (see the simplifyTolerance and coordinatePrecision constructor arguments).
+
+        :return: Dict with keys 'requests' (number of requests whose geometry was reduced), 'verticesBefore', 'verticesAfter',
+            'bytesBefore', and 'bytesAfter' (totals for those requests; bytes are the length of the geometry json), and 'byteReduction'
+            (fraction of the geometry bytes that were not sent)
+        :rtype: dict
+        """
+        with self.payloadStatsLock:
+            rval=dict(self.payloadStats)
+        rval['byteReduction']=1-rval['bytesAfter']/rval['bytesBefore'] if rval['bytesBefore'] else 0
+        return rval
+
+    def _sendRequest(self,type: str,apiUrlEnd: str,j: dict,id: str='',returnJson: str='',timeout: int=0,domainAndPort: str='',reduceGeometry: bool=True):
         """Send HTTP request to the server.
 
         :param type: HTTP request action verb; currently, the only acceptable values are 'GET', 'POST', or 'DELETE'
@@ -1278,14 +2287,62 @@ class SartopoSession():
         :type timeout: int, optional
         :param domainAndPort: Domain and port to send the request to; if not specified here, uses the value of .domainAndPort; defaults to ''
         :type domainAndPort: str, optional
+        :param reduceGeometry: If True, the geometry of a POST request is reduced as it is sent (see ._reduceGeometry); edit requests built by ._applyEdit
+            are sent with False, since their geometry was already reduced before it was merged into the cache; defaults to True
+        :type reduceGeometry: bool, optional
         :return: various, depending on request details: \n
           - False for any error or failure
           - Entire response json structure (dict) if returnJson is 'ALL'
           - ID only, if returnJson is 'ID'
           - map ID of newly created map, if apiUrlEnd contains '[NEW]'
         """        
+        if type not in ['post','delete'] or not id:
+            return self._sendRequestNow(type,apiUrlEnd,j,id=id,returnJson=returnJson,timeout=timeout,domainAndPort=domainAndPort,reduceGeometry=reduceGeometry)
+        # a write to one feature: any buffered edit of the same feature must be sent first (or, for a delete, dropped),
+        #  and no buffered edit of the feature can be sent until this request is complete; see _claimEditKey
+        key=(id,apiUrlEnd.lower()) # e.g. addMarker posts to 'marker', while editFeature posts to 'Marker'
+        pending=self._claimEditKey(key)
+        try:
+            if pending:
+                if type=='post':
+                    self._sendPendingEdit(pending)
+                else:
+                    logging.info('discarding buffered edit of deleted feature '+apiUrlEnd+' '+str(id))
+            return self._sendRequestNow(type,apiUrlEnd,j,id=id,returnJson=returnJson,timeout=timeout,domainAndPort=domainAndPort,reduceGeometry=reduceGeometry)
+        finally:
+            self._releaseEditKey(key)
+
+    def _sendRequestNow(self,type: str,apiUrlEnd: str,j: dict,id: str='',returnJson: str='',timeout: int=0,domainAndPort: str='',reduceGeometry: bool=True):
+        """Internal method to send a request, counting it as in flight if it is a write, without checking the write-behind edit buffer.
+        **This method should not be called directly.  It is called by ._sendRequest and ._sendPendingEdit; see ._sendRequest for arguments and return values.**
+        """
+        write=type in ['post','delete']
+        if write:
+            self._beginWrite()
+        try:
+            return self._doRequest(type,apiUrlEnd,j,id=id,returnJson=returnJson,timeout=timeout,domainAndPort=domainAndPort,reduceGeometry=reduceGeometry)
+        finally:
+            if write:
+                self._endWrite()
+
+    def _doRequest(self,type: str,apiUrlEnd: str,j: dict,id: str='',returnJson: str='',timeout: int=0,domainAndPort: str='',reduceGeometry: bool=True):
+        """Internal method that builds the HTTP request, sends it through the transport, and interprets the response.
+        **This method should not be called directly.  It is called by ._sendRequestNow; see ._sendRequest for arguments and return values.**
+        """
         # objgraph.show_growth()
         # logging.info('RAM:'+str(process.memory_info().rss/1024**2)+'MB')
+        req=self._buildRequest(type,apiUrlEnd,j,id=id,timeout=timeout,domainAndPort=domainAndPort,reduceGeometry=reduceGeometry)
+        if not req:
+            return False
+        r=self.transport.request(req['method'],req['url'],params=req['params'],data=req['data'],
+                timeout=req['timeout'],proxies=self.proxyDict,allowRedirects=req['allowRedirects'])
+        return self._interpretResponse(r,req,returnJson)
+
+    def _buildRequest(self,type: str,apiUrlEnd: str,j: dict,id: str='',timeout: int=0,domainAndPort: str='',reduceGeometry: bool=True):
+        """Internal method to build (and sign, if needed) the HTTP request for ._sendRequest, without sending it.
+
+        :return: dict with keys 'method', 'url', 'params' (for the query string), 'data' (for the form body), 'timeout', 'allowRedirects', 'internet', and 'newMap'; or False if the request is invalid
+        """
         # validate coordinates
         if self.validatePoints and j:
             jg=j.get('geometry')
@@ -1293,12 +2350,19 @@ class SartopoSession():
                 coords=jg.get('coordinates') # may be a triple-nested list to accommodate multipart geometries
                 if coords:
                     j['geometry']['coordinates']=self._validatePoints(coords,modify=self.validatePoints=='modify')
-        self.syncPause=True
+        # reduce the size of the geometry, if requested
+        if type=='post' and j and reduceGeometry and (self.simplifyTolerance or self.coordinatePrecision is not None):
+            jg=j.get('geometry')
+            if jg and jg.get('coordinates'):
+                j['geometry']=self._reduceGeometry(jg)
         timeout=timeout or self.syncTimeout
         newMap='[NEW]' in apiUrlEnd  # specific mapID that indicates a new map should be created
         if self.apiVersion<0:
             logging.error("sendRequest: sartopo session is invalid or is not associated with a map; request aborted: type="+str(type)+" apiUrlEnd="+str(apiUrlEnd))
             return False
+        if type not in ['post','get','delete']:
+            logging.error("sendRequest: Unrecognized request type:"+str(type))
+            return False
         mid=self.apiUrlMid
         if 'api/' in apiUrlEnd.lower():
             if apiUrlEnd[0]=='/':
@@ -1344,87 +2408,86 @@ class SartopoSession():
                 logging.error("There was an attempt to send an internet request, but 'id' and/or 'key' was not specified for this session.  The request will not be sent.")
                 return False
         url=prefix+domainAndPort+mid+apiUrlEnd
-        wrapInJsonKey=True
         if newMap:
             url=prefix+domainAndPort+'/api/v1/acct/'+accountId+'/CollaborativeMap' # works for CTD 4221 and up
         # if '/since/' not in url:
         #     logging.info("sending "+str(type)+" to "+url)
+        req={
+            'method':type.upper(),
+            'url':url,
+            'params':None,
+            'data':None,
+            'timeout':timeout,
+            'allowRedirects':True,
+            'internet':internet,
+            'newMap':newMap
+        }
         params={}
-        paramsPrint={}
         if type=="post":
-            if wrapInJsonKey:
-                params["json"]=json.dumps(j)
-            else:
-                params=j
+            params["json"]=json.dumps(j)
             if internet:
-                expires=int(time.time()*1000)+120000 # 2 minutes from current time, in milliseconds
-                data="POST "+mid+apiUrlEnd+"\n"+str(expires)+"\n"+json.dumps(j)
-                params["id"]=self.id
-                params["expires"]=expires
-                params["signature"]=self._getToken(data)
-                paramsPrint=copy.deepcopy(params)
-                paramsPrint['id']='.....'
-                paramsPrint['signature']='.....'
-            else:
-                paramsPrint=params
-            # logging.info("SENDING POST to '"+url+"':")
-            # logging.info(json.dumps(paramsPrint,indent=3))
-            # don't print the entire PDF generation request - upstream code can print a PDF data summary
-            if 'PDFLink' not in url:
-                logging.info(jsonForLog(paramsPrint))
+                self._signRequest(params,"POST "+mid+apiUrlEnd,json.dumps(j))
             # send the dict in the request body for POST requests, using the 'data' arg instead of 'params'
-            r=self.s.post(url,data=params,timeout=timeout,proxies=self.proxyDict,allow_redirects=False)
+            req['data']=params
+            req['allowRedirects']=False
         elif type=="get": # no need for json in GET; sending null JSON causes downstream error
-            # logging.info("SENDING GET to '"+url+"':")
             if internet:
-                expires=int(time.time()*1000)+120000 # 2 minutes from current time, in milliseconds
-                data="GET "+mid+apiUrlEnd+"\n"+str(expires)+"\n"  #last newline needed as placeholder for json
                 params["json"]=''   # no body, but is required
-                params["id"]=self.id
-                params["expires"]=expires
-                params["signature"]=self._getToken(data)
-                paramsPrint=copy.deepcopy(params)
-                paramsPrint['id']='.....'
-                paramsPrint['signature']='.....'
+                self._signRequest(params,"GET "+mid+apiUrlEnd,'')
                 # 'data' argument sends dict in body; 'params' sends dict in URL query string,
                 #   which is needed by signed GET requests such as api/v1/acct/....../since/0
                 #   and for all requests to maps with 'secret' permission; so, might as well just
                 #   sign all GET requests to the internet, rather than try to determine permission
-                r=self.s.get(url,params=params,timeout=timeout,proxies=self.proxyDict,allow_redirects=False)
-            else:
-                r=self.s.get(url,timeout=timeout,proxies=self.proxyDict)
-            logging.info("SENDING GET to '"+url+"'")
-            # logging.info(json.dumps(paramsPrint,indent=3))
-            # logging.info('Prepared request URL:')
-            # logging.info(r.request.url)
+                req['params']=params
+                req['allowRedirects']=False
         elif type=="delete":
             if internet:
-                expires=int(time.time()*1000)+120000 # 2 minutes from current time, in milliseconds
-                data="DELETE "+mid+apiUrlEnd+"\n"+str(expires)+"\n"  #last newline needed as placeholder for json
                 params["json"]=''   # no body, but is required
-                params["id"]=self.id
-                params["expires"]=expires
-                params["signature"]=self._getToken(data)
-                paramsPrint=copy.deepcopy(params)
+                self._signRequest(params,"DELETE "+mid+apiUrlEnd,'')
+            req['params']=params   ## use params for query vs data for body data
+        self._logRequest(req)
+        return req
+
+    def _signRequest(self,params: dict,methodAndPath: str,body: str):
+        """Internal method to add the 'id', 'expires', and 'signature' parameters of a signed request to the specified params dict.
+
+        The signed data is '<METHOD> <path>', the expiration time, and the request body (an empty string for GET and DELETE), separated by newlines.
+
+        :param params: Request parameters; modified in place
+        :type params: dict
+        :param methodAndPath: Request method (upper case), a space, and the request path (no domain)
+        :type methodAndPath: str
+        :param body: Request body json string, or an empty string
+        :type body: str
+        """
+        expires=int(time.time()*1000)+120000 # 2 minutes from current time, in milliseconds
+        data=methodAndPath+"\n"+str(expires)+"\n"+body  # for GET and DELETE, last newline is needed as placeholder for json
+        params["id"]=self.id
+        params["expires"]=expires
+        params["signature"]=self._getToken(data)
+
+    def _logRequest(self,req: dict):
+        """Internal method to log an outgoing request built by ._buildRequest, with credentials redacted.
+        """
+        if req['method']=='POST':
+            paramsPrint=req['data']
+            if req['internet']:
+                paramsPrint=copy.deepcopy(paramsPrint)
                 paramsPrint['id']='.....'
                 paramsPrint['signature']='.....'
-            else:
-                paramsPrint=params
-            logging.info("SENDING DELETE to '"+url+"'")
-            # logging.info(json.dumps(paramsPrint,indent=3))
-            # logging.info("Key:"+str(self.key))
-            r=self.s.delete(url,params=params,timeout=timeout,proxies=self.proxyDict)   ## use params for query vs data for body data
-            # logging.info("URL:"+str(url))
-            # logging.info("Ris:"+str(r))
+            # don't print the entire PDF generation request - upstream code can print a PDF data summary
+            if 'PDFLink' not in req['url']:
+                logging.info(jsonForLog(paramsPrint))
         else:
-            logging.error("sendRequest: Unrecognized request type:"+str(type))
-            self.syncPause=False
-            return False
+            logging.info("SENDING "+req['method']+" to '"+req['url']+"'")
 
+    def _interpretResponse(self,r,req: dict,returnJson: str=''):
+        """Internal method to interpret the response to a request built by ._buildRequest; see ._sendRequest for return values.
+        """
         if r.status_code!=200:
             logging.info("response code = "+str(r.status_code))
 
-        if newMap:
+        if req['newMap']:
             # for CTD 4221 and newer, and internet, a new map request should return 200, and the response data
             #  should contain the new map ID in response['result']['id']
             # for CTD 4214, a new map request should return 3xx response (redirect); if allow_redirects=False is
@@ -1434,7 +2497,6 @@ class SartopoSession():
                     rj=r.json()
                 except:
                     logging.error('New map request failed: response had do decodable json:'+str(r.status_code)+':'+r.text)
-                    self.syncPause=False
                     return False
                 else:
                     rjr=rj.get('result')
@@ -1443,15 +2505,12 @@ class SartopoSession():
                         newUrl=rjr['id']
                     if newUrl:
                         logging.info('New map URL:'+newUrl)
-                        self.syncPause=False
                         return newUrl
                     else:
                         logging.error('No new map URL was returned in the response json:'+str(r.status_code)+':'+json.dumps(rj))
-                        self.syncPause=False
                         return False
             else:
                 logging.error('New map request failed:'+str(r.status_code)+':'+r.text)
-                self.syncPause=False
                 return False
 
             # old redirect method worked with CTD 4214:
@@ -1486,7 +2545,6 @@ class SartopoSession():
                     rj=r.json()
                 except:
                     logging.error("sendRequest: response had no decodable json:"+str(r))
-                    self.syncPause=False
                     return False
                 else:
                     if 'status' in rj and rj['status'].lower()!='ok':
@@ -1495,7 +2553,6 @@ class SartopoSession():
                             msg+='; maybe the user does not have necessary permissions on this map'
                         msg+=':  '+str(rj)
                         logging.warning(msg)
-                        self.syncPause=False
                         return False
                     if returnJson=="ID":
                         id=None
@@ -1504,14 +2561,12 @@ class SartopoSession():
                         elif 'id' in rj:
                             id=rj['id']
                         elif not rj['result']['state']['features']:  # response if no new info
-                            self.syncPause=False
                             return 0
                         elif 'result' in rj and 'id' in rj['result']['state']['features'][0]:
                             id=rj['result']['state']['features'][0]['id']
                         else:
                             logging.info("sendRequest: No valid ID was returned from the request:")
                             logging.info(json.dumps(rj,indent=3))
-                        self.syncPause=False
                         return id
                     if returnJson=="ALL":
                         # since CTD 4221 returns 'title' as an empty string for all assignments,
@@ -1524,9 +2579,7 @@ class SartopoSession():
                             alist=[f for f in rj['result']['state']['features'] if 'properties' in f.keys() and 'class' in f['properties'].keys() and f['properties']['class'].lower()=='assignment']
                             for a in alist:
                                 a['properties']['title']=str(a['properties'].get('letter',''))+' '+str(a['properties'].get('number',''))
-                        self.syncPause=False
                         return rj
-        self.syncPause=False
 
     def addFolder(self,
             label="New Folder",
@@ -1559,8 +2612,7 @@ class SartopoSession():
             if rj:
                 rjr=rj['result']
                 id=rjr['id']
-                self.mapData['ids'].setdefault('Folder',[]).append(id)
-                self.mapData['state']['features'].append(rjr)
+                self._addToCache(rjr)
                 return id
             else:
                 return False
@@ -1643,8 +2695,7 @@ class SartopoSession():
             if rj:
                 rjr=rj['result']
                 id=rjr['id']
-                self.mapData['ids'].setdefault('Marker',[]).append(id)
-                self.mapData['state']['features'].append(rjr)
+                self._addToCache(rjr)
                 return id
             else:
                 return False
@@ -1718,8 +2769,7 @@ class SartopoSession():
             if rj:
                 rjr=rj['result']
                 id=rjr['id']
-                self.mapData['ids'].setdefault('Shape',[]).append(id)
-                self.mapData['state']['features'].append(rjr)
+                self._addToCache(rjr)
                 return id
             else:
                 return False
@@ -1797,8 +2847,7 @@ class SartopoSession():
             if rj:
                 rjr=rj['result']
                 id=rjr['id']
-                self.mapData['ids'].setdefault('Shape',[]).append(id)
-                self.mapData['state']['features'].append(rjr)
+                self._addToCache(rjr)
                 return id
             else:
                 return False
@@ -1859,8 +2908,7 @@ class SartopoSession():
             if rj:
                 rjr=rj['result']
                 id=rjr['id']
-                self.mapData['ids'].setdefault('OperationalPeriod',[]).append(id)
-                self.mapData['state']['features'].append(rjr)
+                self._addToCache(rjr)
                 return id
             else:
                 return False
@@ -2214,9 +3262,9 @@ class SartopoSession():
             return False
         self.delFeature(markerOrId,fClass="marker",timeout=timeout)
 
-    # delMarkers - calls asynchronous non-blocking delFeatures
+    # delMarkers - calls delFeatures, which sends a batch of concurrent requests
     def delMarkers(self,markersOrIds=[],timeout=0):
-        """Delete one or more markers on the current map, in a non-blocking asynchronous batch of delete requests.\n
+        """Delete one or more markers on the current map, in a batch of concurrent delete requests.\n
         The markers to delete can be specified by ID, or by passing the entire marker data objects; all markers to delete should be specified in the same manner.\n
         This convenience function calls .delFeatures.
 
@@ -2224,7 +3272,7 @@ class SartopoSession():
         :type markersOrIds: list, optional
         :param timeout: Request timeout in seconds; if specified as 0 here, uses the value of .syncTimeout; defaults to 0
         :type timeout: int, optional
-        :return: Return value from the delete request, or False if there was an error prior to the request
+        :return: Dict of return values from the delete requests, keyed by marker ID, or False if there was an error prior to the requests
         """        
         if not self.mapID or self.apiVersion<0:
             logging.error('delFeature request invalid: this sartopo session is not associated with a map.')
@@ -2239,7 +3287,7 @@ class SartopoSession():
         else:
             logging.error('invalid argument in call to delMarkers: '+str(markersOrIds))
             return False
-        self.delFeatures(featuresOrIdAndClassList=[{'id':id,'class':'Marker'} for id in ids],timeout=timeout)
+        return self.delFeatures(featuresOrIdAndClassList=[{'id':id,'class':'Marker'} for id in ids],timeout=timeout)
 
     def delFeature(self,featureOrId='',fClass='',timeout=0):
         """Delete the specified feature from the current map.
@@ -2275,13 +3323,16 @@ class SartopoSession():
         else:
             logging.error('invalid argument in call to delFeature: '+str(featureOrId))
             return False
+        self._discardPendingEdits(id)
         return self._sendRequest("delete",fClass,None,id=str(id),returnJson="ALL",timeout=timeout)
 
-    # delFeatures - asynchronously send a batch of non-blocking delFeature requests
+    # delFeatures - send a batch of delFeature requests in the session's thread pool, and wait for all of them
     #  featuresOrIdAndClassList - a list of dicts - entire features, or, two items per dict: 'id' and 'class'
     #  see discussion at https://github.com/ncssar/sartopo_python/issues/34
     def delFeatures(self,featuresOrIdAndClassList=[],timeout=0):
-        """Delete one or more features on the current map, in a non-blocking asynchronous batch of delete requests.\n
+        """Delete one or more features on the current map, in a batch of concurrent delete requests, and wait for all of the requests to complete.\n
+        The features are removed from the local cache immediately; any feature whose delete request fails is put back in the cache.\n
+        See .delFeaturesAsync for a non-blocking variant.
 
         :param featuresOrIdAndClassList: List of dicts specifying the features to delete; each dict is either a complete feature data object, or this simplified dict; defaults to [] \n
             - *id* -> the feature's ID
@@ -2289,8 +3340,23 @@ class SartopoSession():
         :type featuresOrIdAndClassList: list, optional
         :param timeout: Request timeout in seconds; if specified as 0 here, uses the value of .syncTimeout; defaults to 0
         :type timeout: int, optional
-        :return: Return value of the asynchronous delete loop initialization routine, or False if there was an error prior to the loop
+        :return: Dict of return values from the delete requests, keyed by feature ID, or False if there was an error prior to the requests
         """        
+        futures=self.delFeaturesAsync(featuresOrIdAndClassList,timeout=timeout)
+        if futures is False:
+            return False
+        return {id:f.result() for (id,f) in futures.items()}
+
+    def delFeaturesAsync(self,featuresOrIdAndClassList=[],timeout=0):
+        """Delete one or more features on the current map, in a non-blocking batch of concurrent delete requests.\n
+        The features are removed from the local cache immediately; any feature whose delete request fails is put back in the cache.
+
+        :param featuresOrIdAndClassList: List of dicts specifying the features to delete, in the same format as for .delFeatures; defaults to []
+        :type featuresOrIdAndClassList: list, optional
+        :param timeout: Request timeout in seconds; if specified as 0 here, uses the value of .syncTimeout; defaults to 0
+        :type timeout: int, optional
+        :return: Dict of concurrent.futures.Future objects, keyed by feature ID; each future's result is the return value from that feature's delete request; or False if there was an error prior to the requests
+        """
         if not self.mapID or self.apiVersion<0:
             logging.error('delFeature request invalid: this sartopo session is not associated with a map.')
             return False
@@ -2307,15 +3373,26 @@ class SartopoSession():
         else:
             logging.error('invalid argument in call to delFeatures: '+str(featuresOrIdAndClassList))
             return False
-        logging.info('Deleting '+str(len(idAndClassList))+' features in one asynchronous non-blocking batch of requests:')
-        loop=asyncio.get_event_loop()
-        future=asyncio.ensure_future(self._delAsync(idAndClassList,timeout=timeout))
-        loop.run_until_complete(future)
+        logging.info('Deleting '+str(len(idAndClassList))+' features in one non-blocking batch of requests:')
+        return self._delAsync(idAndClassList,timeout=timeout)
+
+    def _getExecutor(self) -> ThreadPoolExecutor:
+        """Internal method to get the session's long-lived request thread pool, creating it if needed.
+
+        :return: The session's thread pool, with .maxWorkers worker threads
+        :rtype: concurrent.futures.ThreadPoolExecutor
+        """
+        with self.executorLock:
+            if self.executor is None:
+                self.executor=ThreadPoolExecutor(max_workers=self.maxWorkers,thread_name_prefix='sartopoRequest')
+            return self.executor
 
-    # _delAsync - not meant to be called by the user - only called from delFeatures
-    async def _delAsync(self,idAndClassList: list=[],timeout: int=0):
-        """Internal method to delete several features asynchronously, in a sepearate thread pool.
-        **This method should not be called directly.  It is called by .delFeatures.**
+    # _delAsync - not meant to be called by the user - only called from delFeaturesAsync
+    def _delAsync(self,idAndClassList: list=[],timeout: int=0) -> dict:
+        """Internal method to delete several features concurrently, in the session's thread pool.
+        **This method should not be called directly.  It is called by .delFeaturesAsync.**
+
+        Each feature is removed from the cache before its request is submitted; if the request fails, the feature is put back.
 
         :param idAndClassList: list of dicts of features to delete; defaults to [] \n
             - *id* -> the feature's ID
@@ -2323,23 +3400,160 @@ class SartopoSession():
         :type idAndClassList: list, optional
         :param timeout: request timeout in seconds; if specified as 0 here, uses the value of .syncTimeout; defaults to 0
         :type timeout: int, optional
+        :return: Dict of concurrent.futures.Future objects, keyed by feature ID
+        :rtype: dict
         """        
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            loop=asyncio.get_event_loop()
-            tasks=[
-                loop.run_in_executor(
-                    executor,
-                    functools.partial(
-                        self._sendRequest,
-                        'delete',
-                        i['class'],
-                        None,
-                        id=str(i['id']),
-                        returnJson='ALL',
-                        timeout=timeout))
-                    for i in idAndClassList]
-            for response in await asyncio.gather(*tasks):
-                pass
+        executor=self._getExecutor()
+        futures={}
+        for i in idAndClassList:
+            id=str(i['id'])
+            fClass=i['class']
+            self._discardPendingEdits(id)
+            removed=self._removeFromCache(id,fClass)
+            future=executor.submit(self._sendRequest,'delete',fClass,None,id=id,returnJson='ALL',timeout=timeout)
+            future.add_done_callback(functools.partial(self._delDone,id,fClass,removed))
+            futures[id]=future
+        return futures
+
+    def _delDone(self,id: str,fClass: str,removed: list,future):
+        """Internal method called when a delete request submitted by ._delAsync is complete; puts the feature back in the cache if the request failed.
+
+        :param id: Feature ID
+        :type id: str
+        :param fClass: Feature class name
+        :type fClass: str
+        :param removed: List of features that were removed from the cache when the request was submitted
+        :type removed: list
+        :param future: The completed request
+        :type future: concurrent.futures.Future
+        """
+        if future.cancelled() or future.exception() or not future.result():
+            logging.warning('delete request failed for '+fClass+' '+id+'; putting it back in the cache')
+            for f in removed:
+                self._addToCache(f)
+                if self.newFeatureCallback:
+                    self.newFeatureCallback(f)
+
+    def _removeFromCache(self,id: str,fClass: str) -> list:
+        """Internal method to remove a feature from the cache (.mapData) without waiting for the next sync.
+
+        :param id: Feature ID
+        :type id: str
+        :param fClass: Feature class name
+        :type fClass: str
+        :return: List of removed feature data objects (normally just one)
+        :rtype: list
+        """
+        with self.cacheLock:
+            features=self.mapData['state']['features']
+            index=self._getFeatureIndex()
+            # the class name is compared case-insensitively, since delFeature and delFeatures accept e.g. 'marker'
+            removed=[f for f in index.get(index.byId,id) if f['properties']['class'].lower()==fClass.lower()]
+            if removed:
+                fClass=removed[0]['properties']['class']
+                features[:]=(f for f in features if not(f['id']==id and f['properties']['class']==fClass))
+                for f in removed:
+                    self._cacheFeatureRemoved(f)
+            classIds=self.mapData['ids'].get(fClass,[])
+            if id in classIds:
+                classIds.remove(id)
+        if removed and self.deletedFeatureCallback:
+            self.deletedFeatureCallback(id,fClass)
+        return removed
+
+    def _addToCache(self,feature: dict):
+        """Internal method to add a feature to the cache (.mapData) without waiting for the next sync.
+
+        :param feature: Feature data object
+        :type feature: dict
+        """
+        with self.cacheLock:
+            self.mapData['state']['features'].append(feature)
+            self._cacheFeatureAdded(feature)
+            classIds=self.mapData['ids'].setdefault(feature['properties']['class'],[])
+            if feature['id'] not in classIds:
+                classIds.append(feature['id'])
+
+    def _getFeatureIndex(self) -> _FeatureIndex:
+        """Internal method to get the secondary indexes of the cache (by id, class, title, first word of title, letter, and folderId).\n
+        The index is kept up to date by ._doSync, the add methods, ._addToCache, ._removeFromCache, and .editFeature; it is rebuilt here
+        if the cache list has been replaced, if the number of indexed features does not match the cache, or if .caseSensitiveComparisons has changed.
+        Call with .cacheLock held.
+
+        :rtype: _FeatureIndex
+        """
+        features=self.mapData['state']['features']
+        index=self.featureIndex
+        if index is None or index.features is not features or len(index.entries)!=len(features) or index.caseSensitive!=bool(self.caseSensitiveComparisons):
+            index=_FeatureIndex(features,bool(self.caseSensitiveComparisons))
+            self.featureIndex=index
+        return index
+
+    def _getSpatialIndex(self) -> _SpatialIndex:
+        """Internal method to get the spatial index of the cache, used by .getFeaturesInBounds, .getFeaturesNear, and .getFeaturesContaining.\n
+        The index is marked dirty by the same cache hooks that maintain ._getFeatureIndex, and is rebuilt lazily on the next query;
+        it is reset if the cache list has been replaced.  Call with .cacheLock held.
+
+        :rtype: _SpatialIndex
+        """
+        features=self.mapData['state']['features']
+        index=self.spatialIndex
+        if index is None or index.features is not features:
+            index=_SpatialIndex(features,self._getShapelyGeom)
+            self.spatialIndex=index
+        elif len(index.geoms)!=len(features):
+            index.invalidate()
+        return index
+
+    def _cacheFeatureAdded(self,feature: dict):
+        """Internal method to update the cache index after a feature is appended to the cache list.
+        """
+        with self.cacheLock:
+            index=self.featureIndex
+            if index and index.features is self.mapData['state']['features']:
+                index.add(feature)
+            if self.spatialIndex:
+                self.spatialIndex.invalidate()
+            for classifier in self.pointClassifiers.values():
+                classifier.invalidate(feature.get('id'))
+
+    def _cacheFeatureRemoved(self,feature: dict):
+        """Internal method to update the cache index after a feature is removed from the cache list.
+        """
+        with self.cacheLock:
+            index=self.featureIndex
+            if index and index.features is self.mapData['state']['features']:
+                index.remove(feature)
+            if self.spatialIndex:
+                self.spatialIndex.invalidate(feature)
+            self.measurementCache.pop(feature.get('id'),None)
+            for classifier in self.pointClassifiers.values():
+                classifier.invalidate(feature.get('id'))
+        self.geometryCache.invalidate(feature.get('id'))
+
+    def _cacheFeatureUpdated(self,feature: dict):
+        """Internal method to update the cache index after a cached feature's properties have changed.
+        """
+        with self.cacheLock:
+            index=self.featureIndex
+            if index and index.features is self.mapData['state']['features']:
+                index.update(feature)
+            for classifier in self.pointClassifiers.values(): # the class may have changed
+                classifier.invalidate(feature.get('id'))
+
+    def _cacheGeometryUpdated(self,feature: dict):
+        """Internal method to update the cached bounds, the spatial index, the geometry cache, and the measurement cache after a cached feature's geometry has changed.
+        """
+        with self.cacheLock:
+            index=self.featureIndex
+            if index:
+                index.bounds.pop(id(feature),None)
+            if self.spatialIndex:
+                self.spatialIndex.invalidate(feature)
+            self.measurementCache.pop(feature.get('id'),None)
+            for classifier in self.pointClassifiers.values():
+                classifier.invalidate(feature.get('id'))
+        self.geometryCache.invalidate(feature.get('id'))
 
     # getFeatures - attempts to get data from the local cache (self.madData); refreshes and tries again if necessary
     #   determining if a refresh is necessary:
@@ -2355,7 +3569,8 @@ class SartopoSession():
             allowMultiTitleMatch=False,
             # since=0,
             timeout=0,
-            forceRefresh=False):
+            forceRefresh=False,
+            folderId=None):
         """Get the complete feature data structure/s for one or more features from the local cache, after a refresh if needed. \n
         The features to get data for can be specified / filtered in various methods:\n
             - all features of a given class
@@ -2363,7 +3578,8 @@ class SartopoSession():
             - one feature with an exact ID
             - feature/s with specified title (can return mutliple features; see allowMultiTitleMatch)
             - assignment features specified by 'letter', regardless of 'number' (see letterOnly)
-            - all features / the entire cache, if none of featureClass, ID, or title are specified
+            - features in a specified folder (see folderId)
+            - all features / the entire cache, if none of featureClass, ID, title, or folderId are specified
 
         :param featureClass: Feature class name used for selection filtering; defaults to None \n
             - if neither ID nor title are specified, then all features of this class will be returned
@@ -2387,6 +3603,8 @@ class SartopoSession():
         :type timeout: int, optional
         :param forceRefresh: If True, a refresh will be performed before getting the map list, even if the cache has been refreshed within the standard sync interval; defaults to False
         :type forceRefresh: bool, optional
+        :param folderId: If specified, only features in the folder with this ID are candidates; can be combined with the other filters; defaults to None
+        :type folderId: str, optional
         :return: List of data structures (dicts) of feature/s matching the requested filtering; the list will be empty if there are no matches or if there was a failure prior to the cache request
         """                       
         
@@ -2410,56 +3628,22 @@ class SartopoSession():
         #  was longer than syncInterval ago, but will return without syncing otherwise
         
         # if not self.sync: 
-        if featureClass is None and title is None and id is None:
-            return self.mapData # if no feature class or title or id is specified, return the entire cache
+        if featureClass is None and title is None and id is None and folderId is None:
+            return self.mapData # if no feature class or title or id or folder is specified, return the entire cache
         else:
-            titleMatchCount=0
-            rval=[]
-            features=self.mapData['state']['features']
-            # logging.info('features:\n'+json.dumps(features,indent=3))
-            for feature in features:
-                prop=feature.get('properties',None)
-                if prop and isinstance(prop,dict):
-                    pk=prop.keys()
+            with self.cacheLock:
+                index=self._getFeatureIndex()
+                if index.irregular:
+                    r=self._scanFeatures(featureClass,title,id,featureClassExcludeList,letterOnly)
                 else:
-                    logging.error('getFeatures: "properties" does not exist or is not a dict:'+str(feature))
-                    return []
-                c=prop['class']
-                # logging.info('checking class='+c+'  id='+feature['id'])
-                if feature['id']==id:
-                    # logging.info(' id match:'+id)
-                    if featureClass:
-                        # logging.info('   featureClass specified:'+featureClass)
-                        if c.lower()==featureClass.lower():
-                            rval.append(feature)
-                            # logging.info('     match')
-                            break
-                        # else:
-                            # logging.info('     but class '+c+' did not match')
-                    else:
-                        rval.append(feature)
-                        break
-                if id is None and (c==featureClass or (featureClass is None and c not in featureClassExcludeList)):
-                    if title is None:
-                        rval.append(feature)
-                    if 'title' in pk:
-                        if letterOnly:
-                            s=prop['title'].split()
-                            # avoid exception when title exists but is blank
-                            if len(s)>0:
-                                if self._caseMatch(s[0],title): # since assignments title may include number (not desired for edits) 
-                                    titleMatchCount+=1
-                                    rval.append(feature)
-                        else:        
-                            if self._caseMatch(prop['title'].rstrip(),title): # since assignments without number could still have a space after letter
-                                titleMatchCount+=1
-                                rval.append(feature)
-                            elif 'letter' in pk: # if the title wasn't a match, try the letter if it exists
-                                if prop.get('letter','').rstrip()==title:
-                                    titleMatchCount+=1
-                                    rval.append(feature)
-                    else:
-                        logging.error('getFeatures: no title key exists:'+str(feature))
+                    r=self._lookupFeatures(index,featureClass,title,id,featureClassExcludeList,letterOnly,folderId)
+            if r is None:
+                return []
+            (rval,titleMatchCount)=r
+            if folderId is not None:
+                rval=[f for f in rval if f['properties'].get('folderId')==folderId]
+                if titleMatchCount:
+                    titleMatchCount=len(rval)
             if len(rval)==0:
                 # question: do we want to try a refresh and try one more time?
                 logging.info('getFeatures: No features match the specified criteria.')
@@ -2474,6 +3658,95 @@ class SartopoSession():
             else:
                 return rval
 
+    def _lookupFeatures(self,index: _FeatureIndex,featureClass,title,id,featureClassExcludeList,letterOnly,folderId):
+        """Internal method to find features for .getFeatures using the cache index; same results as ._scanFeatures, in the same order.
+        Call with .cacheLock held.
+
+        :return: (list of matching features,number of title matches)
+        :rtype: tuple
+        """
+        if id is not None:
+            for feature in index.get(index.byId,id):
+                if not featureClass or feature['properties']['class'].lower()==featureClass.lower():
+                    return ([feature],0)
+            return ([],0)
+        def candidate(feature):
+            c=feature['properties']['class']
+            return c==featureClass or (featureClass is None and c not in featureClassExcludeList)
+        if title is None:
+            if featureClass is not None:
+                return (index.get(index.byClass,featureClass),0)
+            return ([f for f in index.get(index.byFolderId,folderId) if candidate(f)],0)
+        if not isinstance(title,str):
+            matches=[]
+        elif letterOnly: # since assignments title may include number (not desired for edits)
+            matches=index.get(index.byFirstWord,index.normalize(title))
+        else:
+            # since assignments without number could still have a space after letter, titles are indexed after rstrip;
+            #  if the title wasn't a match, try the letter if it exists
+            matches=index.get(index.byTitle,index.normalize(title))
+            byLetter=index.get(index.byLetter,title)
+            if byLetter:
+                matches=index.merge(matches,byLetter)
+        matches=[f for f in matches if candidate(f)]
+        return (matches,len(matches))
+
+    def _scanFeatures(self,featureClass,title,id,featureClassExcludeList,letterOnly):
+        """Internal method to find features for .getFeatures by scanning the entire cache; used while the cache contains
+        features that can't be indexed (see _FeatureIndex).
+
+        :return: (list of matching features,number of title matches), or None if a cached feature has no properties
+        :rtype: tuple
+        """
+        titleMatchCount=0
+        rval=[]
+        features=self.mapData['state']['features']
+        # logging.info('features:\n'+json.dumps(features,indent=3))
+        for feature in features:
+            prop=feature.get('properties',None)
+            if prop and isinstance(prop,dict):
+                pk=prop.keys()
+            else:
+                logging.error('getFeatures: "properties" does not exist or is not a dict:'+str(feature))
+                return None
+            c=prop['class']
+            # logging.info('checking class='+c+'  id='+feature['id'])
+            if feature['id']==id:
+                # logging.info(' id match:'+id)
+                if featureClass:
+                    # logging.info('   featureClass specified:'+featureClass)
+                    if c.lower()==featureClass.lower():
+                        rval.append(feature)
+                        # logging.info('     match')
+                        break
+                    # else:
+                        # logging.info('     but class '+c+' did not match')
+                else:
+                    rval.append(feature)
+                    break
+            if id is None and (c==featureClass or (featureClass is None and c not in featureClassExcludeList)):
+                if title is None:
+                    rval.append(feature)
+                if 'title' in pk:
+                    if letterOnly:
+                        s=prop['title'].split()
+                        # avoid exception when title exists but is blank
+                        if len(s)>0:
+                            if self._caseMatch(s[0],title): # since assignments title may include number (not desired for edits) 
+                                titleMatchCount+=1
+                                rval.append(feature)
+                    else:        
+                        if self._caseMatch(prop['title'].rstrip(),title): # since assignments without number could still have a space after letter
+                            titleMatchCount+=1
+                            rval.append(feature)
+                        elif 'letter' in pk: # if the title wasn't a match, try the letter if it exists
+                            if prop.get('letter','').rstrip()==title:
+                                titleMatchCount+=1
+                                rval.append(feature)
+                else:
+                    logging.error('getFeatures: no title key exists:'+str(feature))
+        return (rval,titleMatchCount)
+
     # getFeature - same interface as getFeatures, expecting only one result;
     #   if the number of results is not exactly one, return with an error
     def getFeature(self,
@@ -2528,6 +3801,31 @@ class SartopoSession():
         else:
             logging.error('getFeature: return from getFeatures was not a list: '+str(r))
 
+    def _resolveFeature(self,arg,featureClass: str=None) -> tuple:
+        """Internal method to resolve a feature argument that can be an ID, a title, or an entire feature dict,
+        as accepted by .cut, .expand, .crop, .getBounds, and similar methods.\n
+        If arg is a string of length 36, it is taken as an ID; any other string is taken as a title.  Unless featureClass
+        is specified, a title search excludes folders and operational periods.
+
+        :param arg: ID, title, or entire feature dict
+        :param featureClass: Feature class to search; defaults to None
+        :type featureClass: str, optional
+        :return: Tuple of (feature dict, or False if no single feature matched; string to use for the feature in log messages)
+        :rtype: tuple
+        """
+        if isinstance(arg,str): # if string, find feature by name; if id, find feature by id
+            if len(arg)==36: # id
+                shape=self.getFeature(featureClass=featureClass,id=arg)
+            elif featureClass:
+                shape=self.getFeature(featureClass=featureClass,title=arg)
+            else:
+                shape=self.getFeature(title=arg,featureClassExcludeList=['Folder','OperationalPeriod'])
+            return (shape,arg)
+        argStr='NO TITLE'
+        if isinstance(arg,dict):
+            argStr=arg.get('title','NO TITLE')
+        return (arg,argStr)
+
     # editFeature(id=None,className=None,title=None,letter=None,properties=None,geometry=None)
     # edit any properties and/or geometry of specified map feature
 
@@ -2560,7 +3858,8 @@ class SartopoSession():
             letter=None,
             properties=None,
             geometry=None,
-            timeout=0):
+            timeout=0,
+            coalesce=None):
         """Edit properties and/or geometry of a specified feature.\n
         The feature to edit can be specified in various methods:\n
             - exact ID
@@ -2586,7 +3885,11 @@ class SartopoSession():
         :type geometry: dict, optional
         :param timeout: Request timeout in seconds; if specified as 0 here, uses the value of .syncTimeout; defaults to 0
         :type timeout: int, optional
-        :return: ID of the edited feature (should be the same as the 'id' argument), or False if there was a failure prior to the edit request
+        :param coalesce: If True, hold the edit in the write-behind buffer so that it can be merged with subsequent edits to the same feature (see .flushEdits); if False, send it immediately; if None, coalesce only if .editCoalesceWindow is greater than 0; defaults to None \n
+            - a buffered edit is sent before any later non-buffered write to the same feature, so it can't overwrite that write
+            - a buffered edit is sent after this method returns, so a failed request is only logged (or returned by .flushEdits)
+        :type coalesce: bool, optional
+        :return: ID of the edited feature (should be the same as the 'id' argument), or False if there was a failure prior to the edit request; if the edit was buffered, the ID is returned as soon as the edit is buffered
         """            
 
         # logging.info('editFeature called:'+str(properties))
@@ -2634,7 +3937,9 @@ class SartopoSession():
 
         else:
             logging.info(' id specified: '+str(id))
-            features=[f for f in self.mapData['state']['features'] if f['id']==id]
+            with self.cacheLock:
+                index=self._getFeatureIndex()
+                features=index.get(index.byId,id)
             # logging.info(json.dumps(self.mapData,indent=3))
             if len(features)==1:
                 feature=features[0]     ## matched feature
@@ -2659,6 +3964,31 @@ class SartopoSession():
         #   }
         # }
 
+        j=self._applyEdit(feature,className,properties,geometry)
+
+        if coalesce is None:
+            coalesce=self.editCoalesceWindow>0
+        if coalesce:
+            self._enqueueEdit(className,j,properties,geometry is not None,timeout)
+            return feature['id']
+
+        return self._sendRequest('post',className,j,id=feature['id'],returnJson='ID',timeout=timeout,reduceGeometry=False)
+
+    def _applyEdit(self,feature: dict,className: str,properties: dict=None,geometry: dict=None) -> dict:
+        """Internal method to merge edited properties and/or geometry into a cached feature, and build the edit request data, without sending it.
+        Called by .editFeature, and by .commitPlan (in the calling thread, so that the cache is not modified from worker threads).
+
+        :param feature: Cached feature data object; modified in place
+        :type feature: dict
+        :param className: Feature class name
+        :type className: str
+        :param properties: Dict of properties to edit; defaults to None
+        :type properties: dict, optional
+        :param geometry: Dict of geometry to edit; defaults to None
+        :type geometry: dict, optional
+        :return: Edit request data
+        :rtype: dict
+        """
         #56 - include all properties in the edit request, even if no properties are being edited
         # propToWrite=None
         propToWrite=feature['properties']
@@ -2670,33 +4000,206 @@ class SartopoSession():
             # write the correct title for assignments, since sartopo does not internally recalcualte it
             if className.lower()=='assignment':
                 propToWrite['title']=(propToWrite['letter']+' '+propToWrite['number']).strip()
+            self._cacheFeatureUpdated(feature)
 
         geomToWrite=None
         if geometry is not None:
             if isinstance(geometry,dict) and 'coordinates' in geometry.keys():
                 geometry['size']=len(geometry['coordinates'])
+                # reduce the geometry before it is merged, rather than as the request is sent, so that the cache holds
+                #  the same geometry as the server; the merged geometry is reduced, since the edit may not include the type
+                if geometry['coordinates'] and (self.simplifyTolerance or self.coordinatePrecision is not None):
+                    geometry=self._reduceGeometry(dict(feature['geometry'],**geometry))
             # logging.info('geometry specified (size was recalculated if needed):\n'+json.dumps(geometry))
             geomToWrite=feature['geometry']
             for key in geometry.keys():
                 geomToWrite[key]=geometry[key]
+            self._cacheGeometryUpdated(feature)
         
         j={'type':'Feature','id':feature['id']}
         if propToWrite is not None:
             j['properties']=propToWrite
         if geomToWrite is not None:
             j['geometry']=geomToWrite
+        return j
+
+    # write-behind edit buffer: a vehicle-following marker, or an assignment whose status
+    #  and number are changed in quick succession, would otherwise generate one full
+    #  editFeature request (with all properties, per #56) for every change.  Buffered edits
+    #  are keyed by (id,class); a new edit to the same key replaces the buffered request data,
+    #  keeping any previously-buffered property or geometry changes that it does not override.
+    #  One flush thread (started as needed, ended when the buffer is empty) sends each
+    #  buffered edit when no new edit to the same key has arrived for editCoalesceWindow
+    #  seconds, or when the edit has been held for editCoalesceMaxLatency seconds.
+    #  Ordering: only one write request per key is in flight at a time (see _claimEditKey),
+    #  whether it is sent by the flush thread, by flushEdits, or by _sendRequest; and
+    #  _sendRequest sends (or, for a delete, drops) a buffered edit before any other write
+    #  to the same feature, so an older buffered edit can never overwrite a newer write.
+
+    def _enqueueEdit(self,className: str,j: dict,properties: dict,hasGeometry: bool,timeout: int=0):
+        """Internal method to add an edit request to the write-behind buffer, merging it with any buffered edit of the same feature.
+        **This method should not be called directly.  It is called by .editFeature.**
+
+        :param className: Feature class name
+        :type className: str
+        :param j: Complete edit request data, as built by .editFeature
+        :type j: dict
+        :param properties: Properties that were explicitly specified in the call to .editFeature, if any
+        :type properties: dict
+        :param hasGeometry: True if geometry was explicitly specified in the call to .editFeature
+        :type hasGeometry: bool
+        :param timeout: Request timeout in seconds, used when the buffered edit is eventually sent; defaults to 0
+        :type timeout: int, optional
+        """
+        # shallow copies, so that sync replacing the cached dicts cannot change what gets sent
+        j=dict(j)
+        if 'properties' in j:
+            j['properties']=dict(j['properties'])
+        if 'geometry' in j:
+            j['geometry']=dict(j['geometry'])
+        key=(j['id'],className.lower())
+        now=time.time()
+        with self.pendingEditsLock:
+            pending=self.pendingEdits.get(key)
+            if pending:
+                pj=pending['j']
+                # properties: start from the buffered properties, then apply the new changes
+                if 'properties' in pj:
+                    if properties:
+                        mergedProp=pj['properties']
+                        mergedProp.update(properties)
+                        if className.lower()=='assignment':
+                            mergedProp['title']=(mergedProp.get('letter','')+' '+mergedProp.get('number','')).strip()
+                        j['properties']=mergedProp
+                    else:
+                        j['properties']=pj['properties']
+                # geometry: use the new geometry if specified, otherwise keep the buffered geometry
+                if not hasGeometry and 'geometry' in pj:
+                    j['geometry']=pj['geometry']
+                pending['j']=j
+                pending['lastTime']=now
+                pending['timeout']=timeout or pending['timeout']
+                pending['count']+=1
+            else:
+                self.pendingEdits[key]={'className':className,'j':j,'firstTime':now,'lastTime':now,'timeout':timeout,'count':1}
+            self.pendingEditsCondition.notify_all()
+            if not self.editFlushThreadStarted:
+                self.editFlushThreadStarted=True
+                threading.Thread(target=self._editFlushLoop,name='editFlush').start()
+
+    def _editFlushLoop(self):
+        """Internal method that sends buffered edits as they become due, in a blocking loop. \n
+        This is called in a new thread by ._enqueueEdit; the thread ends when the write-behind buffer is empty.  **Calling this method directly could cause sync problems.**
+        """
+        while True:
+            now=time.time()
+            flushAll=not threading.main_thread().is_alive()
+            window=self.editCoalesceWindow
+            maxLatency=self.editCoalesceMaxLatency
+            with self.pendingEditsCondition:
+                if not self.pendingEdits:
+                    self.editFlushThreadStarted=False
+                    return
+                # keys with a write in flight are left for the next pass
+                dueKeys=[k for k,e in self.pendingEdits.items()
+                        if k not in self.sendingEdits and (flushAll or now-e['lastTime']>=window or now-e['firstTime']>=maxLatency)]
+                if not dueKeys:
+                    # wait until the next edit is due, or until a write in flight is released or a new edit is
+                    #  buffered (see ._releaseEditKey and ._enqueueEdit); wake at least once a second to check flushAll
+                    nextDue=min([min(e['lastTime']+window,e['firstTime']+maxLatency) for k,e in self.pendingEdits.items() if k not in self.sendingEdits],default=now+1)
+                    self.pendingEditsCondition.wait(min(nextDue-now,1))
+                    continue
+                dueEdits=[(k,self.pendingEdits.pop(k)) for k in dueKeys]
+                self.sendingEdits.update(dict.fromkeys(dueKeys))
+            for (k,e) in dueEdits:
+                try:
+                    self._sendPendingEdit(e)
+                finally:
+                    self._releaseEditKey(k)
+
+    def _claimEditKey(self,key: tuple):
+        """Internal method to start a write request to one feature: wait until no other write request to the same feature is in flight,
+        then mark the feature as having a write in flight, and take its buffered edit (if any) out of the write-behind buffer.
+        Every call must be followed by a call to ._releaseEditKey.
+
+        :param key: (id,lowercase class name) of the feature
+        :type key: tuple
+        :return: The buffered edit entry that the caller must send (or drop) before its own request; or None if there is no buffered edit
+        :rtype: dict
+        """
+        with self.pendingEditsCondition:
+            while key in self.sendingEdits:
+                self.pendingEditsCondition.wait()
+            self.sendingEdits[key]=None
+            return self.pendingEdits.pop(key,None)
 
-        return self._sendRequest('post',className,j,id=feature['id'],returnJson='ID',timeout=timeout)
+    def _releaseEditKey(self,key: tuple):
+        """Internal method to end a write request to one feature that was started by ._claimEditKey.
 
-    # moveMarker - convenience function - calls editFeature
-    #   specify either id or title
-    def moveMarker(self,newCoords,id=None,title=None):
-        """Move an existing marker.\n
-        The marker to move can be specified either with ID or by title.\n
-        This convenience function calls .editFeature.
+        :param key: (id,lowercase class name) of the feature
+        :type key: tuple
+        """
+        with self.pendingEditsCondition:
+            self.sendingEdits.pop(key,None)
+            self.pendingEditsCondition.notify_all()
 
-        :param newCoords: List of [lon,lat] that the marker should be moved to
-        :type newCoords: list
+    def _sendPendingEdit(self,pending: dict):
+        """Internal method to send one buffered edit.
+
+        :param pending: Buffered edit entry, from .pendingEdits
+        :type pending: dict
+        :return: Return value from the edit request
+        """
+        if pending['count']>1:
+            logging.info('sending '+str(pending['count'])+' coalesced edits of '+pending['className']+' '+pending['j']['id']+' as one request')
+        try:
+            rval=self._sendRequestNow('post',pending['className'],pending['j'],id=pending['j']['id'],returnJson='ID',timeout=pending['timeout'],reduceGeometry=False)
+        except Exception as e:
+            logging.error('buffered edit of '+pending['className']+' '+pending['j']['id']+' could not be sent: '+str(e))
+            return False
+        if not rval:
+            logging.error('buffered edit of '+pending['className']+' '+pending['j']['id']+' failed')
+        return rval
+
+    def flushEdits(self) -> dict:
+        """Immediately send all edits that are being held in the write-behind buffer, and wait for any that are already being sent.\n
+        Edits are only buffered if editCoalesceWindow was specified when the session was created, or if .editFeature was called with coalesce=True.
+        This is the only way to see the results of buffered edits; otherwise, failures are only logged.
+
+        :return: Dict of return values from the edit requests that were sent by this call (False for a failed request), keyed by feature ID
+        :rtype: dict
+        """
+        with self.pendingEditsLock:
+            keys=list(self.pendingEdits.keys())+[k for k in self.sendingEdits.keys() if k not in self.pendingEdits]
+        rval={}
+        for key in keys:
+            pending=self._claimEditKey(key)
+            try:
+                if pending:
+                    rval[pending['j']['id']]=self._sendPendingEdit(pending)
+            finally:
+                self._releaseEditKey(key)
+        return rval
+
+    def _discardPendingEdits(self,id: str):
+        """Internal method to drop any buffered edits of the specified feature; called when the feature is deleted.
+
+        :param id: Feature ID
+        :type id: str
+        """
+        with self.pendingEditsLock:
+            for key in [k for k in self.pendingEdits.keys() if k[0]==id]:
+                del self.pendingEdits[key]
+
+    # moveMarker - convenience function - calls editFeature
+    #   specify either id or title
+    def moveMarker(self,newCoords,id=None,title=None):
+        """Move an existing marker.\n
+        The marker to move can be specified either with ID or by title.\n
+        This convenience function calls .editFeature.
+
+        :param newCoords: List of [lon,lat] that the marker should be moved to
+        :type newCoords: list
         :param id: ID of the marker to move; defaults to None
         :type id: str, optional
         :param title: Title of the marker to move; defaults to None
@@ -2736,14 +4239,27 @@ class SartopoSession():
         # ls=LineString(points)
         # logging.info('is_valid:'+str(ls.is_valid))
         # logging.info('is_simple:'+str(ls.is_simple))
+        # each point is compared to the previous input point (not the previous output point)
+        if self.geometryLogging!='detail':
+            (xs,ys)=self._xyArrays(points)
+            if xs is not None and len(xs):
+                keep=numpy.flatnonzero((numpy.abs(numpy.diff(xs))>0.0005)|(numpy.abs(numpy.diff(ys))>0.0005))+1
+                out=[points[0]]+[points[i] for i in keep.tolist()]
+                if self.geometryLogging and len(out)!=len(points):
+                    logging.info('_removeDuplicatePoints: '+str(len(points))+' points --> '+str(len(out))+' points')
+                return out
         out=[points[0]]
         for i in range(1,len(points)):
             dx=points[i][0]-points[i-1][0]
             dy=points[i][1]-points[i-1][1]
-            logging.info('   '+str(i)+' : dx='+str(dx)+' dy='+str(dy))
+            if self.geometryLogging=='detail':
+                logging.info('   '+str(i)+' : dx='+str(dx)+' dy='+str(dy))
             if abs(dx)>0.0005 or abs(dy)>0.0005:
                 out.append(points[i])
-        logging.info('\n     '+str(len(points))+' points: '+str(points)+'\n --> '+str(len(out))+' points: '+str(out))
+        if self.geometryLogging=='detail':
+            logging.info('\n     '+str(len(points))+' points: '+str(points)+'\n --> '+str(len(out))+' points: '+str(out))
+        elif self.geometryLogging and len(out)!=len(points):
+            logging.info('_removeDuplicatePoints: '+str(len(points))+' points --> '+str(len(out))+' points')
         return out
 
     # _getUsedSuffixList - get a list of integers of all used suffixes for the
@@ -2814,16 +4330,43 @@ class SartopoSession():
         # ls=LineString(points)
         # logging.info('is_valid:'+str(ls.is_valid))
         # logging.info('is_simple:'+str(ls.is_simple))
+        if len(points)>3 and self.geometryLogging!='detail':
+            # vectorized: compare each point to the two previous input points in one pass, then replay only the
+            #  resulting appends and pops; lists that numpy can't compare the same way as python does (mixed
+            #  list and tuple points, NaN, or non-numeric values) use the loop below
+            (xs,ys)=self._xyArrays(points)
+            if xs is not None and len(set(map(type,points)))==1 and not (numpy.isnan(xs).any() or numpy.isnan(ys).any()):
+                same1=(xs[2:]==xs[1:-1])&(ys[2:]==ys[1:-1]) # same as the previous point: skip
+                same2=(xs[2:]==xs[:-2])&(ys[2:]==ys[:-2]) # same as the point before that: spur
+                pops=numpy.flatnonzero(~same1&same2)
+                appends=numpy.flatnonzero(~same1&~same2)
+                if not len(pops):
+                    out=points[0:2]+[points[i] for i in (appends+2).tolist()]
+                else:
+                    out=points[0:2]
+                    for i in numpy.flatnonzero(~same1).tolist():
+                        if same2[i]:
+                            out.pop() # delete last vertex
+                        else:
+                            out.append(points[i+2])
+                    if self.geometryLogging:
+                        logging.info('_removeSpurs: '+str(len(pops))+' spur(s) removed; '+str(len(points))+' points --> '+str(len(out))+' points')
+                return out
         if len(points)>3:
             out=points[0:2]
+            spurs=0
             for i in range(2,len(points)):
                 if points[i][0:2]!=points[i-1][0:2]: # skip this point if it is the same as the previous point
                     if points[i][0:2]!=points[i-2][0:2]:
                         out.append(points[i])
                     else:
-                        logging.info('spur removed at '+str(points[i-1]))
+                        if self.geometryLogging=='detail':
+                            logging.info('spur removed at '+str(points[i-1]))
+                        spurs+=1
                         out.pop() # delete last vertex
                     # logging.info('\n --> '+str(len(out))+' points: '+str(out))
+            if spurs and self.geometryLogging=='summary':
+                logging.info('_removeSpurs: '+str(spurs)+' spur(s) removed; '+str(len(points))+' points --> '+str(len(out))+' points')
         else:
             # logging.info('\n      feature has less than three points; no spur removal attempted.')
             out=points
@@ -2839,34 +4382,49 @@ class SartopoSession():
     #   - slice a line, using a line
     #  the arguments (target, cutter) can be name (string), id (string), or feature (json)
 
-    def cut(self,target,cutter,deleteCutter=True,useResultNameSuffix=True):
+    def cut(self,target,cutter,deleteCutter=True,useResultNameSuffix=True,parallel=False):
         """Cut a 'target' geometry using a 'cutter' geometry:
             - remove a notch from a polygon target, using a polygon cutter
             - slice a polygon target, using a polygon cutter or a line cutter
             - slice a line target, using a polygon cutter or a line cutter
 
+        The changes are planned by .planCut, then sent by .commitPlan.
+
         :param target: ID, title, or entire feature dict of the target feature
         :param cutter: ID, title, or entire feature dict of the cutter feature
         :param deleteCutter: If True, delete the cutter feature after the cut operation; defaults to True
         :type deleteCutter: bool, optional
         :param useResultNameSuffix: If True, any new features resulting from the cut operation will have their titles suffixed; defaults to True
         :type useResultNameSuffix: bool, optional
+        :param parallel: If True, send the target edit and any new features as one batch of concurrent requests (see .commitPlan);
+            if False, send them one at a time, in sequence; defaults to False
+        :type parallel: bool, optional
         :return: List of resulting feature IDs, or False if a failure occured prior to the cut operation
         """        
+        plan=self.planCut(target,cutter,deleteCutter=deleteCutter,useResultNameSuffix=useResultNameSuffix)
+        if not plan:
+            return False
+        return self.commitPlan(plan,parallel=parallel) # resulting feature IDs
+
+    def planCut(self,target,cutter,deleteCutter=True,useResultNameSuffix=True):
+        """Plan a cut operation (see .cut) without changing anything: compute the resulting geometry, and the target edit,
+        new features, and deletions needed to apply it.  The plan can be inspected (e.g. as a dry run) and then sent with .commitPlan.\n
+        Suffixed titles of new features are allocated when the plan is made, so a plan should be committed before
+        another plan for features with the same base title is made.
+
+        :param target: ID, title, or entire feature dict of the target feature
+        :param cutter: ID, title, or entire feature dict of the cutter feature
+        :param deleteCutter: If True, the plan includes deleting the cutter feature; defaults to True
+        :type deleteCutter: bool, optional
+        :param useResultNameSuffix: If True, any new features resulting from the cut operation will have their titles suffixed; defaults to True
+        :type useResultNameSuffix: bool, optional
+        :return: Plan dict (see .commitPlan), or False if a failure occured prior to the cut operation
+        :rtype: dict
+        """
         if not self.mapID or self.apiVersion<0:
             logging.error('cut request invalid: this sartopo session is not associated with a map.')
             return False
-        if isinstance(target,str): # if string, find feature by name; if id, find feature by id
-            targetStr=target
-            if len(target)==36: # id
-                targetShape=self.getFeature(id=target)
-            else:
-                targetShape=self.getFeature(title=target,featureClassExcludeList=['Folder','OperationalPeriod'])
-        else:
-            targetShape=target
-            targetStr='NO TITLE'
-            if isinstance(targetShape,dict):
-                targetStr=targetShape.get('title','NO TITLE')
+        (targetShape,targetStr)=self._resolveFeature(target)
         if not targetShape:
             logging.warning('Target shape '+targetStr+' not found; operation aborted.')
             return False
@@ -2874,29 +4432,15 @@ class SartopoSession():
         tg=targetShape['geometry']
         targetType=tg['type']
         if targetType=='Polygon':
-            tgc=tg['coordinates'][0]
-            tgc=self._removeSpurs(tgc)
-            targetGeom=Polygon(tgc) # Shapely object
+            targetGeom=self._getCachedGeom(targetShape,'spurs',lambda: Polygon(self._removeSpurs(tg['coordinates'][0]))) # Shapely object
         elif targetType=='LineString':
-            tgc=tg['coordinates']
-            tgc=self._removeSpurs(tgc)
-            targetGeom=LineString(tgc) # Shapely object
+            targetGeom=self._getCachedGeom(targetShape,'spurs',lambda: LineString(self._removeSpurs(tg['coordinates']))) # Shapely object
         else:
             logging.error('cut: unhandled target '+targetStr+' geometry type: '+targetType)
             return False
         logging.info('targetGeom:'+str(targetGeom))
 
-        if isinstance(cutter,str): # if string, find feature by name; if id, find feature by id
-            cutterStr=cutter
-            if len(cutter)==36: # id
-                cutterShape=self.getFeature(id=cutter)
-            else:
-                cutterShape=self.getFeature(title=cutter,featureClassExcludeList=['Folder','OperationalPeriod'])
-        else:
-            cutterShape=cutter
-            cutterStr='NO TITLE'
-            if isinstance(cutterShape,dict):
-                cutterStr=cutterShape.get('title','NO TITLE')
+        (cutterShape,cutterStr)=self._resolveFeature(cutter)
         if not cutterShape:
             logging.warning('Cutter shape '+cutterStr+' not found; operation aborted.')
             return False
@@ -2906,13 +4450,9 @@ class SartopoSession():
         cg=cutterShape['geometry']
         cutterType=cg['type']
         if cutterType=='Polygon':
-            cgc=cg['coordinates'][0]
-            cgc=self._removeSpurs(cgc)
-            cutterGeom=Polygon(cgc) # Shapely object
+            cutterGeom=self._getCachedGeom(cutterShape,'spurs',lambda: Polygon(self._removeSpurs(cg['coordinates'][0])),prepared=True) # Shapely object
         elif cutterType=='LineString':
-            cgc=cg['coordinates']
-            cgc=self._removeSpurs(cgc)
-            cutterGeom=LineString(cgc) # Shapely object
+            cutterGeom=self._getCachedGeom(cutterShape,'spurs',lambda: LineString(self._removeSpurs(cg['coordinates'])),prepared=True) # Shapely object
         else:
             logging.error('cut: unhandled cutter geometry type: '+cutterType)
             return False
@@ -2930,204 +4470,183 @@ class SartopoSession():
             result=targetGeom-cutterGeom
         logging.info('cut result:'+str(result))
 
-        # preserve target properties when adding new features
-        tp=targetShape['properties']
-        tc=tp['class'] # Shape or Assignment
-        tfid=tp.get('folderId',None)
+        plan=self._newPlan('cut')
+        if not self._planResult(plan,targetShape,result,useResultNameSuffix):
+            return False
+        if deleteCutter:
+            plan['deletes'].append({'id':cutterShape['id'],'class':cutterShape['properties']['class'],'title':cutterShape['properties'].get('title')})
+        return plan
+
+    def cutMany(self,targets: list,cutters: list,deleteCutters=True,useResultNameSuffix=True,parallel=False):
+        """Cut several 'target' geometries using several 'cutter' geometries, in one pass; see .cut.\n
+        The cutters are combined once, with shapely's unary_union, and each target is cut by the combined cutter,
+        so that only the final geometry of each target is sent, rather than the result of each cut in turn.
+        Polygon targets are first cut by the union of all polygon cutters, then sliced by the union of all line cutters;
+        line targets are cut by the union of all cutters.  Targets that do not intersect any cutter are skipped.
+        All of the results are planned first, with suffixed result titles allocated across all of the targets;
+        the edits and new features are then sent (see .commitPlan).
+
+        :param targets: List of IDs, titles, or entire feature dicts of the target features
+        :type targets: list
+        :param cutters: List of IDs, titles, or entire feature dicts of the cutter features
+        :type cutters: list
+        :param deleteCutters: If True, delete the cutter features after the cut operations, if all of the target edits succeeded; defaults to True
+        :type deleteCutters: bool, optional
+        :param useResultNameSuffix: If True, any new features resulting from the cut operations will have their titles suffixed; defaults to True
+        :type useResultNameSuffix: bool, optional
+        :param parallel: If True, send all of the edits and new features as one batch of concurrent requests (see .commitPlan);
+            if False, send them one at a time, in sequence; defaults to False
+        :type parallel: bool, optional
+        :return: Dict keyed by target feature ID; each value is the same as the return value of .cut for that target
+            (False if the target does not intersect any cutter); targets that are not found are logged and left out;
+            or False if a failure occurred prior to the cut operations
+        :rtype: dict
+        """
+        if not self.mapID or self.apiVersion<0:
+            logging.error('cutMany request invalid: this sartopo session is not associated with a map.')
+            return False
 
-        # collect resulting feature ids to return as the return value
-        rids=[]
+        polygonCutters=[]
+        lineCutters=[]
+        cutterShapes=[]
+        for cutter in cutters:
+            (cutterShape,cutterStr)=self._resolveFeature(cutter)
+            if not cutterShape:
+                logging.warning('cutMany: cutter shape '+cutterStr+' not found; operation aborted.')
+                return False
+            cg=cutterShape['geometry']
+            cutterType=cg['type']
+            if cutterType=='Polygon':
+                polygonCutters.append(self._getCachedGeom(cutterShape,'spurs',lambda: Polygon(self._removeSpurs(cg['coordinates'][0])),prepared=True)) # Shapely object
+            elif cutterType=='LineString':
+                lineCutters.append(self._getCachedGeom(cutterShape,'spurs',lambda: LineString(self._removeSpurs(cg['coordinates'])),prepared=True)) # Shapely object
+            else:
+                logging.error('cutMany: unhandled cutter '+cutterStr+' geometry type: '+cutterType)
+                return False
+            cutterShapes.append(cutterShape)
+        if not cutterShapes:
+            logging.warning('cutMany: no cutters specified; operation aborted.')
+            return False
 
-        # use the unsuffixed name as the base (everything before colon-followed-by-integer)
-        #  so that a cut of a:2 would produce a:3 rather than a:2:1
-        if tc=='Assignment':
-            base=tp['letter']
-        else:
-            base=tp['title']
-        # accomodate base names that include colon
-        baseParse=base.split(':')
-        if len(baseParse)>1 and baseParse[-1].isnumeric():
-            base=':'.join(baseParse[:-1])
-        usedSuffixList=self._getUsedSuffixList(base)
+        # combine the cutters once
+        polygonCutter=unary_union(polygonCutters) if polygonCutters else None
+        lineCutter=unary_union(lineCutters) if lineCutters else None
+        allCutters=unary_union([g for g in [polygonCutter,lineCutter] if g is not None])
+        shapely.prepare(allCutters)
+        logging.info('cutMany: '+str(len(polygonCutters))+' polygon cutters and '+str(len(lineCutters))+' line cutters combined')
+
+        targetShapes=[]
+        for target in targets:
+            (targetShape,targetStr)=self._resolveFeature(target)
+            if not targetShape:
+                logging.warning('cutMany: target shape '+targetStr+' not found; skipped.')
+                continue
+            targetShapes.append(targetShape)
+        logging.info('cutMany: '+str(len(targetShapes))+' targets')
+
+        # compute and plan all of the cut results
+        rval={}
+        usedSuffixes={}
+        plans=[]
+        for targetShape in targetShapes:
+            tid=targetShape['id']
+            tg=targetShape['geometry']
+            targetType=tg['type']
+            if targetType=='Polygon':
+                targetGeom=self._getCachedGeom(targetShape,'spurs',lambda: Polygon(self._removeSpurs(tg['coordinates'][0]))) # Shapely object
+            elif targetType=='LineString':
+                targetGeom=self._getCachedGeom(targetShape,'spurs',lambda: LineString(self._removeSpurs(tg['coordinates']))) # Shapely object
+            else:
+                logging.error('cutMany: unhandled target '+str(tid)+' geometry type: '+targetType)
+                rval[tid]=False
+                continue
+            if not allCutters.intersects(targetGeom):
+                logging.info('cutMany: '+str(targetShape['properties'].get('title'))+' does not intersect any cutter; no operation performed')
+                rval[tid]=False
+                continue
+            #  shapely.ops.split only works if the second geometry completely splits the first;
+            #   instead, use the simple boolean object.difference (same as overloaded '-' operator)
+            if targetType=='Polygon':
+                result=targetGeom
+                if polygonCutter is not None:
+                    result=result-polygonCutter
+                if lineCutter is not None and not result.is_empty:
+                    pieces=[p for g in getattr(result,'geoms',[result]) for p in split(g,lineCutter).geoms]
+                    result=MultiPolygon(pieces) if len(pieces)>1 else pieces[0]
+            else:
+                result=targetGeom-allCutters
+            logging.info('cutMany result:'+str(result))
+            plan=self._newPlan('cut')
+            if self._planResult(plan,targetShape,result,useResultNameSuffix,usedSuffixes=usedSuffixes):
+                plans.append((tid,plan))
+            else:
+                rval[tid]=False
 
-        # logging.info('cut result class:'+str(result.__class__.__name__))
+        # send all of the edits and additions
+        allEdited=True
+        for ((tid,plan),rids) in zip(plans,self._commitPlans([plan for (tid,plan) in plans],parallel=parallel)):
+            rval[tid]=rids
+            allEdited=allEdited and bool(rids[0])
 
-        if isinstance(result,GeometryCollection): # polygons, linestrings, or both
-            try:
-                result=MultiPolygon(result)
-            except:
-                try:
-                    result=MultiLineString(result)
-                except:
-                    logging.error('cut: resulting GeometryCollection could not be converted to MultiPolygon or MultiLineString.  Operation aborted.')
-                    return False
-        if isinstance(result,Polygon):
-            rids.append(self.editFeature(id=targetShape['id'],geometry={'coordinates':[list(result.exterior.coords)]}))
-            if rids==[]:
-                logging.warning('cut: target shape not found; operation aborted.')
-                return False
-        elif isinstance(result,MultiPolygon):
-            ##### EDIT FEATURE is used to update the original feature information (geometry)
-            resultGeoms=result.geoms
-            rids.append(self.editFeature(id=targetShape['id'],geometry={'coordinates':[list(resultGeoms[0].exterior.coords)]}))
-            if rids==[]:
-                logging.warning('cut: target shape not found; operation aborted.')
-                return False
-            for r in list(resultGeoms)[1:]:
-                if tc=='Shape':
-                    title=tp['title']
-                    if useResultNameSuffix:
-                        suffix=self._getNextAvailableSuffix(usedSuffixList)
-                        title=base+':'+str(suffix)
-                        usedSuffixList.append(suffix)
-                    rids.append(self.addPolygon(list(r.exterior.coords),
-                        title=title,
-                        stroke=tp.get('stroke',None),
-                        fill=tp.get('fill',None),
-                        strokeOpacity=tp.get('stroke-opacity',None),
-                        strokeWidth=tp.get('stroke-width',None),
-                        fillOpacity=tp.get('fill-opacity',None),
-                        description=tp.get('description',None),
-                        folderId=tfid))
-                elif tc=='Assignment':
-                    letter=tp['letter']
-                    if useResultNameSuffix:
-                        suffix=self._getNextAvailableSuffix(usedSuffixList)
-                        letter=base+':'+str(suffix)
-                        usedSuffixList.append(suffix)
-                    rids.append(self.addAreaAssignment(list(r.exterior.coords),
-                        number=tp['number'],
-                        letter=letter,
-                        opId=tp.get('operationalPeriodId',''),
-                        folderId=tp.get('folderId',None), # empty string will create an unnamed folder!
-                        resourceType=tp.get('resourceType',''),
-                        teamSize=tp.get('teamSize',0),
-                        priority=tp.get('priority',''),
-                        responsivePOD=tp.get('responsivePOD',''),
-                        unresponsivePOD=tp.get('unresponsivePOD',''),
-                        cluePOD=tp.get('cluePOD',''),
-                        description=tp.get('description',''),
-                        previousEfforts=tp.get('previousEfforts',''),
-                        transportation=tp.get('transportation',''),
-                        timeAllocated=tp.get('timeAllocated',0),
-                        primaryFrequency=tp.get('primaryFrequency',''),
-                        secondaryFrequency=tp.get('secondaryFrequency',''),
-                        preparedBy=tp.get('preparedBy',''),
-                        status=tp.get('status','')))
-                else:
-                    logging.warning('cut: target feature class was neither Shape nor Assigment; operation aborted.')
-                    return False
-        elif isinstance(result,LineString):
-            rids.append(self.editFeature(id=targetShape['id'],geometry={'coordinates':list(result.coords)}))
-            if rids==[]:
-                logging.warning('cut: target shape not found; operation aborted.')
-                return False
-        elif isinstance(result,MultiLineString):
-            resultGeoms=result.geoms
-            rids.append(self.editFeature(id=targetShape['id'],geometry={'coordinates':list(resultGeoms[0].coords)}))
-            if rids==[]:
-                logging.warning('cut: target shape not found; operation aborted.')
-                return False
-            for r in [g for g in resultGeoms][1:]:
-                if tc=='Shape':
-                    title=tp['title']
-                    if useResultNameSuffix:
-                        suffix=self._getNextAvailableSuffix(usedSuffixList)
-                        title+=':'+str(suffix)
-                        usedSuffixList.append(suffix)
-                    rids.append(self.addLine(list(r.coords),
-                        title=title,
-                        color=tp.get('stroke',None),
-                        opacity=tp.get('stroke-opacity',None),
-                        width=tp.get('stroke-width',None),
-                        pattern=tp.get('pattern',None),
-                        description=tp.get('description',None),
-                        folderId=tfid))
-                elif tc=='Assignment':
-                    letter=tp['letter']
-                    if useResultNameSuffix:
-                        suffix=self._getNextAvailableSuffix(usedSuffixList)
-                        letter+=':'+str(suffix)
-                        usedSuffixList.append(suffix)
-                    rids.append(self.addLineAssignment(list(r.coords),
-                        number=tp['number'],
-                        letter=letter,
-                        opId=tp.get('operationalPeriodId',''),
-                        folderId=tp.get('folderId',None), # empty string will create an unnamed folder!
-                        resourceType=tp.get('resourceType',''),
-                        teamSize=tp.get('teamSize',0),
-                        priority=tp.get('priority',''),
-                        responsivePOD=tp.get('responsivePOD',''),
-                        unresponsivePOD=tp.get('unresponsivePOD',''),
-                        cluePOD=tp.get('cluePOD',''),
-                        description=tp.get('description',''),
-                        previousEfforts=tp.get('previousEfforts',''),
-                        transportation=tp.get('transportation',''),
-                        timeAllocated=tp.get('timeAllocated',0),
-                        primaryFrequency=tp.get('primaryFrequency',''),
-                        secondaryFrequency=tp.get('secondaryFrequency',''),
-                        preparedBy=tp.get('preparedBy',''),
-                        status=tp.get('status','')))
-                else:
-                    logging.error('cut: target feature class was neither Shape nor Assigment; operation aborted.')
-                    return False
-        if deleteCutter:
-            self.delFeature(cutterShape['id'],fClass=cutterShape['properties']['class'])
+        if deleteCutters and plans:
+            if allEdited:
+                self.delFeatures(cutterShapes)
+            else:
+                logging.warning('cutMany: at least one target edit failed; cutters were not deleted')
 
-        return rids # resulting feature IDs
+        return rval
 
     # expand - expand target polygon to include the area of p2 polygon
 
-    def expand(self,target,p2,deleteP2=True):
+    def expand(self,target,p2,deleteP2=True,parallel=False):
         """Expand a 'target' polygon to include the area of the 'p2' polygon.\n
         This is basically a boolean 'OR' operation, using Shapely's '|' method.
+        The changes are planned by .planExpand, then sent by .commitPlan.
 
         :param target: ID, title, or entire feature dict of the target feature
         :param p2: ID, title, or entire feature dict of the p2 feature
         :param deleteP2: If True, delete the p2 feature after the expand operation; defaults to True
         :type deleteP2: bool, optional
+        :param parallel: If True, send the target edit from the session's thread pool, and only delete p2 if the edit succeeded (see .commitPlan); defaults to False
+        :type parallel: bool, optional
         :return: True if successful; False otherwise
         """        
+        plan=self.planExpand(target,p2,deleteP2=deleteP2)
+        if not plan:
+            return False
+        if not self.commitPlan(plan,parallel=parallel)[0]:
+            logging.warning('expand: target shape not found; operation aborted.')
+            return False
+        return True # success
+
+    def planExpand(self,target,p2,deleteP2=True):
+        """Plan an expand operation (see .expand) without changing anything; see .planCut.
+
+        :param target: ID, title, or entire feature dict of the target feature
+        :param p2: ID, title, or entire feature dict of the p2 feature
+        :param deleteP2: If True, the plan includes deleting the p2 feature; defaults to True
+        :type deleteP2: bool, optional
+        :return: Plan dict (see .commitPlan), or False if a failure occured prior to the expand operation
+        :rtype: dict
+        """
         if not self.mapID or self.apiVersion<0:
             logging.error('expand request invalid: this sartopo session is not associated with a map.')
             return False
-        if isinstance(target,str): # if string, find feature by name; if id, find feature by id
-            targetStr=target
-            if len(target)==36: # id
-                targetShape=self.getFeature(id=target)
-            else:
-                targetShape=self.getFeature(title=target,featureClassExcludeList=['Folder','OperationalPeriod'])
-        else:
-            targetShape=target
-            targetStr='NO TITLE'
-            if isinstance(targetShape,dict):
-                targetStr=targetShape.get('title','NO TITLE')
+        (targetShape,targetStr)=self._resolveFeature(target)
         if not targetShape:
             logging.warning('Target shape '+targetStr+' not found; operation aborted.')
             return False
         
         tg=targetShape['geometry']
-        tgc=tg['coordinates'][0]
-        tgc=self._removeSpurs(tgc)
         targetType=tg['type']
         if targetType=='Polygon':
-            targetGeom=Polygon(tgc) # Shapely object
+            targetGeom=self._getCachedGeom(targetShape,'spurs',lambda: Polygon(self._removeSpurs(tg['coordinates'][0]))) # Shapely object
         else:
             logging.warning('expand: target feature '+targetStr+' is not a polygon: '+targetType)
             return False
         logging.info('targetGeom:'+str(targetGeom))
 
-        if isinstance(p2,str): # if string, find feature by name; if id, find feature by id
-            p2Str=p2
-            if len(p2)==36: # id
-                p2Shape=self.getFeature(id=p2)
-            else:
-                p2Shape=self.getFeature(title=p2,featureClassExcludeList=['Folder','OperationalPeriod'])
-        else:
-            p2Shape=p2
-            p2Str='NO TITLE'
-            if isinstance(p2Shape,dict):
-                p2Str=p2Shape.get('title','NO TITLE')
+        (p2Shape,p2Str)=self._resolveFeature(p2)
         if not p2Shape:
             logging.warning('expand: second polygon '+p2Str+' not found; operation aborted.')
             return False
@@ -3135,11 +4654,9 @@ class SartopoSession():
         logging.info('expand: target='+targetStr+'  p2='+p2Str)
         
         cg=p2Shape['geometry']
-        cgc=cg['coordinates'][0]
-        cgc=self._removeSpurs(cgc)
         p2Type=cg['type']
         if p2Type=='Polygon':
-            p2Geom=Polygon(cgc) # Shapely object
+            p2Geom=self._getCachedGeom(p2Shape,'spurs',lambda: Polygon(self._removeSpurs(cg['coordinates'][0])),prepared=True) # Shapely object
         else:
             logging.warning('expand: p2 feature '+p2Str+' is not a polygon: '+p2Type)
             return False
@@ -3152,31 +4669,74 @@ class SartopoSession():
         result=targetGeom|p2Geom
         logging.info('expand result:'+str(result))
 
-        if not self.editFeature(id=targetShape['id'],geometry={'coordinates':[list(result.exterior.coords)]}):
-            logging.warning('expand: target shape not found; operation aborted.')
-            return False
-
+        plan=self._newPlan('expand')
+        plan['result']=result
+        plan['edits'].append({'id':targetShape['id'],'class':targetShape['properties']['class'],'title':targetShape['properties'].get('title'),
+                'geometry':{'coordinates':[list(result.exterior.coords)]}})
         if deleteP2:
-            self.delFeature(p2Shape['id'],fClass=p2Shape['properties']['class'])
-
-        return True # success
+            plan['deletes'].append({'id':p2Shape['id'],'class':p2Shape['properties']['class'],'title':p2Shape['properties'].get('title')})
+        return plan
 
-    def _buffer2(self,boundaryGeom,beyond: float):
+    def _buffer2(self,boundaryGeom,beyond: float,metric: bool=False):
         """Return a copy of the original polygon, increased in size by the specified value.\n
         This method does not modify the original geometry.\n
-        This method is used to oversize a Polygon; Shapely's LineString.buffer method should be used to oversize a line.
+        This method is used to oversize a Polygon; Shapely's LineString.buffer method (or ._bufferMeters) should be used to oversize a line.
 
         :param boundaryGeom: Boundary geometry to be oversized
         :type boundaryGeom: shapely.geometry.Polygon
-        :param beyond: Amount to oversize the boundary geometry (in degrees)
+        :param beyond: Amount to oversize the boundary geometry (in degrees, or in meters if metric is True)
         :type beyond: float
+        :param metric: If True, beyond is in meters, and the geometry is oversized in a local projection (see ._bufferMeters),
+            so that the distance is the same in every direction at any latitude; defaults to False
+        :type metric: bool, optional
         :return: Oversized geometry (the orignal geometry is not modified)
         :rtype: shapely.geometry.Polygon or .MultiPolygon
         """        
         a=boundaryGeom.buffer(0) # split bowties into separate polygons
         merged=unary_union(a)
+        if metric:
+            return self._bufferMeters(merged,beyond)
         return merged.buffer(beyond)
 
+    def _bufferMeters(self,geom,meters: float):
+        """Return a copy of any shapely geometry, buffered by a distance in meters.\n
+        The geometry is transformed to a local projection (see ._getLocalProjection), buffered there, and transformed back to lon/lat degrees.
+
+        :param geom: Geometry to buffer, in lon/lat degrees
+        :param meters: Buffer distance in meters
+        :type meters: float
+        :return: Buffered geometry, in lon/lat degrees
+        """
+        proj=self._getLocalProjection(geom.bounds)
+        return proj.toDegrees(proj.toMeters(geom).buffer(meters))
+
+    def _getLocalProjection(self,bounds):
+        """Internal method to get a local projection between lon/lat degrees and meters that is accurate within the specified bounds.\n
+        Projections are created as needed and kept for the life of the session.  A new projection is centered on the grid point
+        (see _LocalProjection.GRID_SPACING) nearest the center of the bounds, if it can cover them, so that nearby geometries share
+        one projection; otherwise it is centered on the bounds.  Only the bounds are used: the cache is not read and no request is sent.
+        Uses pyproj if it is installed; see _LocalProjection.
+
+        :param bounds: Bounding box [min X, min Y, max X, max Y] of the geometry to be projected
+        :return: _LocalProjection object
+        """
+        with self.localProjectionsLock:
+            for proj in self.localProjections.values():
+                if proj.covers(bounds):
+                    return proj
+        (x0,y0,x1,y1)=bounds
+        center=((x0+x1)/2,(y0+y1)/2)
+        grid=_LocalProjection.GRID_SPACING
+        gridCenter=(round(center[0]/grid)*grid,round(center[1]/grid)*grid)
+        if max(abs(x0-gridCenter[0]),abs(x1-gridCenter[0]),abs(y0-gridCenter[1]),abs(y1-gridCenter[1]))<=_LocalProjection.MAX_RADIUS:
+            center=gridCenter
+        center=(round(center[0],6),round(center[1],6))
+        with self.localProjectionsLock:
+            if center not in self.localProjections:
+                logging.info('new local projection centered at '+str(center)+('' if pyproj else ' (pyproj is not installed; using an equirectangular approximation)'))
+                self.localProjections[center]=_LocalProjection(*center)
+            return self.localProjections[center]
+
     # _intersection2(targetGeom,boundaryGeom)
     # we want a function that can take the place of shapely.ops.intersection
     #  when the target is a LineString and the boundary is a Polygon,
@@ -3204,56 +4764,63 @@ class SartopoSession():
         :type boundaryGeom: shapely.geometry.Polygon
         :return: Result of the intersection operation; could be one of various shapely.geometry classes
         """        
+        # the inside/outside test of every vertex, and the test of which segments touch the boundary,
+        #  are each done in one vectorized shapely call; only segments that touch the boundary
+        #  need an individual intersection
+        targetCoords=list(targetGeom.coords)
+        xy=shapely.get_coordinates(targetGeom)
+        inside=shapely.contains_xy(boundaryGeom,xy[:,0],xy[:,1]) # same as Point.within
+        a_in=inside[:-1]
+        b_in=inside[1:]
+        exterior=boundaryGeom.exterior
+        shapely.prepare(exterior)
+        segIdx=numpy.nonzero(~(a_in&b_in))[0] # all segments that are not entirely inside
+        crossings={} # segment index --> intersection of the segment with the boundary exterior
+        if len(segIdx):
+            segs=shapely.linestrings(numpy.stack([xy[segIdx],xy[segIdx+1]],axis=1))
+            # segments that cross in or out always need the crossing point; segments with both ends outside only if they touch the boundary
+            need=(a_in[segIdx]!=b_in[segIdx])|shapely.intersects(segs,exterior)
+            crossings=dict(zip(segIdx[need].tolist(),shapely.intersection(segs[need],exterior)))
+
         outLines=[]
-        targetCoords=targetGeom.coords
         nextInsidePointStartsNewLine=True
-        for i in range(len(targetCoords)-1):
-            ac=targetCoords[i]
-            bc=targetCoords[i+1]
-            ap=Point(ac)
-            bp=Point(bc)
-            a_in=ap.within(boundaryGeom)
-            b_in=bp.within(boundaryGeom)
-            if a_in and b_in:
+        i=0
+        for e in segIdx.tolist()+[len(targetCoords)-1]:
+            if e>i: # segments i through e-1 are entirely inside: append their first points
                 if nextInsidePointStartsNewLine:
                     outLines.append([])
                     nextInsidePointStartsNewLine=False
-                outLines[-1].append(ac)
-            elif a_in and not b_in:
-                abl=LineString([ap,bp])
-                mp=abl.intersection(boundaryGeom.exterior)
+                outLines[-1].extend(targetCoords[i:e])
+            if e==len(targetCoords)-1:
+                break
+            ac=targetCoords[e]
+            mp=crossings.get(e)
+            if a_in[e]: # A inside, B outside
                 if nextInsidePointStartsNewLine:
                     outLines.append([])
                     nextInsidePointStartsNewLine=False
                 outLines[-1].append(ac)
                 outLines[-1].append(list(mp.coords)[0])
                 nextInsidePointStartsNewLine=True
-            elif b_in and not a_in:
-                abl=LineString([ap,bp])
-                mp=abl.intersection(boundaryGeom.exterior)
-                nextInsidePointStartsNewLine=True
-                if nextInsidePointStartsNewLine:
-                    outLines.append([])
-                    nextInsidePointStartsNewLine=False
+            elif b_in[e]: # A outside, B inside
                 # the midpoint will be the first point of a new line
-                outLines[-1].append(list(mp.coords)[0])
+                outLines.append([list(mp.coords)[0]])
+                nextInsidePointStartsNewLine=False
             else: # neither endpoint is inside the boundary: save the portion within the boundary, if any
-                abl=LineString([ap,bp])
-                mp=abl.intersection(boundaryGeom.exterior)
                 # the result will be a single disjoint line segment inside the boundary,
                 #  with both vertices touching the boundary;
                 # the result is a multipoint, which has no .coords attribute
                 #  see https://stackoverflow.com/a/51060918
-                # (or LineString Empty if none of the segment is inside the boundary)
-                if mp.geom_type=='MultiPoint' and not mp.is_empty:
+                # (or None if the segment does not touch the boundary)
+                if mp is not None and mp.geom_type=='MultiPoint' and not mp.is_empty:
                     mpcoords=[(p.x,p.y) for p in list(mp.geoms)]
                     nextInsidePointStartsNewLine=True
                     outLines.append(mpcoords)
+            i=e+1
 
         # don't forget to check the last vertex!
         fc=targetCoords[-1]
-        fp=Point(fc)
-        f_in=fp.within(boundaryGeom)
+        f_in=inside[-1]
         if f_in:
             outLines[-1].append(fc)
 
@@ -3286,41 +4853,103 @@ class SartopoSession():
         if not self.mapID or self.apiVersion<0:
             logging.error('getBounds request invalid: this sartopo session is not associated with a map.')
             return False
-        rval=[9e12,9e12,-9e12,-9e12]
+        boundsList=[]
         for obj in objectList:
-            if isinstance(obj,str): # if string, find feature by name; if id, find feature by id
-                objStr=obj
-                if len(obj)==36: # id
-                    objShape=self.getFeature(id=obj)
-                else:
-                    objShape=self.getFeature(title=obj,featureClassExcludeList=['Folder','OperationalPeriod'])
-            else:
-                objShape=obj
-                objStr='NO TITLE'
-                if isinstance(objShape,dict):
-                    objStr=objShape.get('title','NO TITLE')
+            (objShape,objStr)=self._resolveFeature(obj)
             if not objShape:
                 logging.warning('Object shape '+objStr+' not found; operation aborted.')
                 return False
-            og=objShape['geometry']
-            objType=og['type']
+            bbox=self._getFeatureBounds(objShape)
             # logging.info('geometry:'+json.dumps(og,indent=3))
-            if objType=='Polygon':
-                ogc=og['coordinates'][0]
-                ogc=self._removeSpurs(ogc)
-                objGeom=Polygon(self._twoify(ogc)) # Shapely object
-            elif objType=='LineString':
-                ogc=og['coordinates']
-                ogc=self._removeSpurs(ogc)
-                objGeom=LineString(self._twoify(ogc)) # Shapely object
-            elif objType=='Point':
-                ogc=og['coordinates'][0:2]
-                objGeom=Point(self._twoify(ogc)) # Shapely object
-            else:
-                logging.warning('crop: feature '+objStr+' is not a polygon or line or point: '+objType)
+            if bbox is None:
+                logging.warning('crop: feature '+objStr+' is not a polygon or line or point: '+objShape['geometry']['type'])
                 return False
-            bbox=objGeom.bounds
-            rval=[min(bbox[0],rval[0]),min(bbox[1],rval[1]),max(bbox[2],rval[2]),max(bbox[3],rval[3])]
+            boundsList.append(bbox)
+        return self._padBounds(self._combineBounds(boundsList),padDeg,padPct)
+
+    def getMapExtent(self,classes: list=None,padDeg=0.0001,padPct=None):
+        """Get the bounding box of all cached features of the specified classes, optionally oversized by padDeg or padPct.\n
+        The bounding box of each feature is computed the same way as .getBounds, and is kept in the cache until the feature's geometry changes,
+        so repeated calls are cheap.  Features whose geometry is not a polygon, line, or point, or whose geometry is invalid, are skipped.
+
+        :param classes: List of feature class names to include, e.g. ['Assignment']; defaults to None, which includes all classes
+        :type classes: list, optional
+        :param padDeg: Amount to expand the bounding box, in degrees; defaults to 0.0001; only relevant if padPct is not specified
+        :type padDeg: float, optional
+        :param padPct: Amount to expand the bounding box, in percent (integer), or as a fraction (from 0 to 1); defaults to None; see .getBounds
+        :type padPct: float, optional
+        :return: Bounding box in the same format as .getBounds: [min X, min Y, max X, max Y]; None if there are no such features; or False if the session is not associated with a map
+        """
+        if not self.mapID or self.apiVersion<0:
+            logging.error('getMapExtent request invalid: this sartopo session is not associated with a map.')
+            return False
+        self._refresh()
+        boundsList=[]
+        with self.cacheLock:
+            index=self._getFeatureIndex()
+            if classes is None:
+                features=list(index.features)
+            else:
+                features=index.merge(*[index.get(index.byClass,c) for c in classes])
+            for f in features:
+                if not isinstance(f.get('geometry'),dict):
+                    continue
+                try:
+                    bbox=self._getFeatureBounds(f)
+                except Exception as e:
+                    logging.warning('getMapExtent: geometry of '+str(f.get('id'))+' could not be used: '+str(e))
+                    continue
+                if bbox is not None:
+                    boundsList.append(bbox)
+        if not boundsList:
+            return None
+        return self._padBounds(self._combineBounds(boundsList),padDeg,padPct)
+
+    def _getFeatureBounds(self,feature: dict):
+        """Internal method to get the bounding box of one feature, as used by .getBounds.\n
+        For features in the cache, the result is kept in the cache index until the feature's geometry changes.
+
+        :param feature: Feature data object
+        :type feature: dict
+        :return: Tuple (min X, min Y, max X, max Y), or None if the geometry type is not polygon, line, or point
+        :rtype: tuple
+        """
+        with self.cacheLock:
+            index=self._getFeatureIndex()
+            if index.contains(feature):
+                bbox=index.bounds.get(id(feature))
+                if bbox is None:
+                    geom=self._getShapelyGeom(feature)
+                    if geom is None:
+                        return None
+                    bbox=geom.bounds
+                    index.bounds[id(feature)]=bbox
+                return bbox
+        geom=self._getCachedGeom(feature,'shape',lambda: self._getShapelyGeom(feature))
+        return None if geom is None else geom.bounds
+
+    def _combineBounds(self,boundsList: list) -> list:
+        """Internal method to get the combined extent of a list of bounding boxes, in one vectorized reduction.
+
+        :param boundsList: List of bounding boxes, each in the format [min X, min Y, max X, max Y]
+        :type boundsList: list
+        :return: Combined bounding box, in the same format
+        :rtype: list
+        """
+        if not boundsList:
+            return [9e12,9e12,-9e12,-9e12]
+        a=numpy.array(boundsList,dtype=float)
+        (mins,maxs)=(a[:,0:2].min(axis=0),a[:,2:4].max(axis=0))
+        return [float(mins[0]),float(mins[1]),float(maxs[0]),float(maxs[1])]
+
+    def _padBounds(self,rval: list,padDeg=0.0001,padPct=None) -> list:
+        """Internal method to oversize a bounding box by padDeg or padPct; see .getBounds.
+
+        :param rval: Bounding box in the format [min X, min Y, max X, max Y]
+        :type rval: list
+        :return: Oversized bounding box, in the same format
+        :rtype: list
+        """
         if padPct is None: # don't use 'if not padPct' which evaluates True for padPct=0
             pad=padDeg
         else:
@@ -3330,6 +4959,513 @@ class SartopoSession():
         rval=[rval[0]-pad,rval[1]-pad,rval[2]+pad,rval[3]+pad]
         return rval
 
+    def _getShapelyGeom(self,feature: dict):
+        """Internal method to make a shapely geometry from a feature's geometry, the same way the geometry operations do:
+        polygons use the outer ring only, and spurs are removed from polygons and lines.
+
+        :param feature: Feature data object
+        :type feature: dict
+        :return: Shapely Polygon, LineString, or Point; or None if the geometry type is not one of those
+        """
+        og=feature['geometry']
+        objType=og['type']
+        if objType=='Polygon':
+            ogc=og['coordinates'][0]
+            ogc=self._removeSpurs(ogc)
+            return Polygon(self._twoify(ogc)) # Shapely object
+        elif objType=='LineString':
+            ogc=og['coordinates']
+            ogc=self._removeSpurs(ogc)
+            return LineString(self._twoify(ogc)) # Shapely object
+        elif objType=='Point':
+            ogc=og['coordinates'][0:2]
+            return Point(self._twoify(ogc)) # Shapely object
+        return None
+
+    def _getCachedGeom(self,feature: dict,variant: str,build,prepared: bool=False):
+        """Internal method to get a shapely geometry for a feature from the geometry cache, building it if needed.\n
+        Geometries are cached by feature id, class, geometry fingerprint, and variant, and are discarded when the
+        feature's geometry is changed by ._doSync or .editFeature; the least recently used geometry is discarded
+        when the cache is full (see the geometryCacheSize constructor argument).
+
+        :param feature: Feature data object
+        :type feature: dict
+        :param variant: Name of the way the geometry is built from the feature coordinates, e.g. 'spurs' for spurs removed;
+            any parameters of the build (e.g. a buffer distance) must be part of the name
+        :type variant: str
+        :param build: Function with no arguments that returns the shapely geometry
+        :param prepared: If True, the geometry is prepared (see shapely.prepare) to speed up repeated predicates; defaults to False
+        :type prepared: bool, optional
+        :return: Shapely geometry, which must not be modified; or None if build returned None
+        """
+        return self.geometryCache.get(feature,variant,build,prepared=prepared)
+
+    def getGeometryCacheStats(self) -> dict:
+        """Get statistics of the geometry cache used by the geometry operations.
+
+        :return: Dict with keys 'size' (number of cached geometries), 'maxsize', 'hits', 'misses', 'hitRate' (fraction of lookups that were hits),
+            'evictions' (geometries discarded to make room), and 'invalidations' (geometries discarded because the feature changed)
+        :rtype: dict
+        """
+        return self.geometryCache.stats()
+
+    def _spatialQuery(self,geom,featureClass,featureClassExcludeList,predicate: str=None,distance: float=None) -> list:
+        """Internal method to query the spatial index, after a refresh if needed, with the same class filtering as .getFeatures.
+
+        :return: List of (feature,shapely geometry) tuples, in cache order
+        :rtype: list
+        """
+        self._refresh()
+        with self.cacheLock:
+            hits=self._getSpatialIndex().query(geom,predicate=predicate,distance=distance)
+        return [(f,g) for (f,g) in hits
+                if f['properties']['class']==featureClass or (featureClass is None and f['properties']['class'] not in featureClassExcludeList)]
+
+    def getFeaturesInBounds(self,bounds: list,featureClass: str=None,featureClassExcludeList: list=[]) -> list:
+        """Get all cached features whose geometry intersects a bounding box.
+
+        :param bounds: Bounding box [min X, min Y, max X, max Y], i.e. [west lon, south lat, east lon, north lat], in the same format as the return value of .getBounds
+        :type bounds: list
+        :param featureClass: If specified, only features of this class are returned; defaults to None
+        :type featureClass: str, optional
+        :param featureClassExcludeList: List of feature classes to exclude; not relevant if featureClass is specified; defaults to []
+        :type featureClassExcludeList: list, optional
+        :return: List of features, in the same order as .getFeatures
+        :rtype: list
+        """
+        if not self.mapID or self.apiVersion<0:
+            logging.error('getFeaturesInBounds request invalid: this sartopo session is not associated with a map.')
+            return []
+        return [f for (f,g) in self._spatialQuery(box(*bounds),featureClass,featureClassExcludeList,predicate='intersects')]
+
+    def getFeaturesNear(self,point: list,radius: float,featureClass: str=None,featureClassExcludeList: list=[]) -> list:
+        """Get all cached features within a distance of a point, nearest first.
+
+        :param point: [lon,lat] of the point, or a shapely Point
+        :type point: list
+        :param radius: Maximum distance, in degrees; the distance to a line or polygon is to its nearest edge (zero if the point is inside the polygon)
+        :type radius: float
+        :param featureClass: If specified, only features of this class are returned; defaults to None
+        :type featureClass: str, optional
+        :param featureClassExcludeList: List of feature classes to exclude; not relevant if featureClass is specified; defaults to []
+        :type featureClassExcludeList: list, optional
+        :return: List of features, sorted by distance from the point
+        :rtype: list
+        """
+        if not self.mapID or self.apiVersion<0:
+            logging.error('getFeaturesNear request invalid: this sartopo session is not associated with a map.')
+            return []
+        pt=point if isinstance(point,Point) else Point(point[0:2])
+        hits=self._spatialQuery(pt,featureClass,featureClassExcludeList,distance=radius)
+        return [f for (f,g) in sorted(hits,key=lambda h: h[1].distance(pt))]
+
+    def getFeaturesContaining(self,point: list,featureClass: str=None,featureClassExcludeList: list=[]) -> list:
+        """Get all cached features whose geometry contains a point, e.g. the assignments that contain a clue marker.
+
+        :param point: [lon,lat] of the point, or a shapely Point
+        :type point: list
+        :param featureClass: If specified, only features of this class are returned; defaults to None
+        :type featureClass: str, optional
+        :param featureClassExcludeList: List of feature classes to exclude; not relevant if featureClass is specified; defaults to []
+        :type featureClassExcludeList: list, optional
+        :return: List of features, in the same order as .getFeatures
+        :rtype: list
+        """
+        if not self.mapID or self.apiVersion<0:
+            logging.error('getFeaturesContaining request invalid: this sartopo session is not associated with a map.')
+            return []
+        pt=point if isinstance(point,Point) else Point(point[0:2])
+        return [f for (f,g) in self._spatialQuery(pt,featureClass,featureClassExcludeList,predicate='within')]
+
+    def classifyPoints(self,pointClasses: list=['Marker'],polygonClasses: list=['Assignment','Shape']) -> dict:
+        """Find the polygons that contain each point feature, e.g. the assignments that contain each clue marker.\n
+        All points are classified against all polygons in one spatial join, rather than one query per point.  The classification
+        is kept, and later calls (with the same classes) only reclassify the points and polygons that have been added, removed,
+        or changed since, by ._doSync or by this session.  Polygon containment is the same as .getFeaturesContaining: only the
+        outer ring is used, and a point on the edge of a polygon is not contained by it.
+
+        :param pointClasses: Classes of the point features to classify; only features with Point geometry are used; defaults to ['Marker']
+        :type pointClasses: list, optional
+        :param polygonClasses: Classes of the polygon features; only features with Polygon geometry are used; defaults to ['Assignment','Shape']
+        :type polygonClasses: list, optional
+        :return: Dict keyed by point feature ID; each value is a list of IDs of the polygon features that contain the point
+            (empty if none), in the same order as .getFeatures; or False if the session is not associated with a map
+        :rtype: dict
+        """
+        if not self.mapID or self.apiVersion<0:
+            logging.error('classifyPoints request invalid: this sartopo session is not associated with a map.')
+            return False
+        self._refresh()
+        key=(tuple(sorted(pointClasses)),tuple(sorted(polygonClasses)))
+        with self.cacheLock:
+            classifier=self.pointClassifiers.get(key)
+            if classifier is None:
+                classifier=_PointClassifier(pointClasses,polygonClasses)
+                self.pointClassifiers[key]=classifier
+            index=self._getFeatureIndex()
+            classifier.update(self.mapData['state']['features'],index,lambda f: self._getCachedGeom(f,'shape',lambda: self._getShapelyGeom(f)))
+            # polygon ids in cache order
+            seq={}
+            for polygonId in classifier.polygons:
+                entries=[index.entries[id(f)][0] for f in index.get(index.byId,polygonId)]
+                seq[polygonId]=min(entries) if entries else 0
+            return {pointId:sorted(polygons,key=seq.get) for (pointId,polygons) in classifier.byPoint.items()}
+
+    def analyzeCoverage(self,
+            operationalPeriod=None,
+            folder=None,
+            boundary=None,
+            minArea: float=1.0) -> dict:
+        """Find where area assignments overlap each other, the union of their coverage, and the parts of a search boundary
+        that are not covered by any assignment, e.g. when planning an operational period.\n
+        Candidate overlapping pairs are found with a spatial index (STRtree) rather than by testing every pair, and all
+        intersections are computed in one vectorized call.  Assignment polygons are built the same way as for .cut (the
+        outer ring, with spurs removed), and are shared with the geometry cache.  Areas are geodesic, as in .getMeasurements.
+        LineString assignments are ignored.
+
+        :param operationalPeriod: Only analyze the assignments of this operational period: ID, title, or entire feature dict; defaults to None
+        :type operationalPeriod: str or dict, optional
+        :param folder: Only analyze the assignments in this folder: ID, title, or entire feature dict; defaults to None \n
+            - if neither operationalPeriod nor folder are specified, all area assignments on the map are analyzed
+        :type folder: str or dict, optional
+        :param boundary: Polygon feature (ID, title, or entire feature dict) to find uncovered gaps in, e.g. the search area boundary; defaults to None
+        :type boundary: str or dict, optional
+        :param minArea: Overlaps and gaps smaller than this many square meters (e.g. slivers between adjacent hand-drawn assignments) are not reported; defaults to 1.0
+        :type minArea: float, optional
+        :return: Dict with these keys, or False if there was a failure: \n
+            - *assignments* -> list of IDs of the analyzed assignments
+            - *overlaps* -> list of dicts, one per overlapping pair of assignments: 'ids' (list of the two assignment IDs),
+              'geometry' (shapely Polygon or MultiPolygon of the overlap), and 'area' (square meters)
+            - *coverage* -> shapely geometry of the union of all of the assignments, or None if there are no assignments
+            - *coverageArea* -> area of the coverage, in square meters
+            - *gaps* -> list of dicts, one per uncovered part of the boundary, largest first: 'geometry' (shapely Polygon) and 'area' (square meters);
+              empty if boundary is not specified
+            - *gapArea* -> total area of the gaps, in square meters; None if boundary is not specified
+            - *boundaryArea* -> area of the boundary, in square meters; None if boundary is not specified
+            - *coveredFraction* -> fraction of the boundary area that is covered by assignments; None if boundary is not specified
+        :rtype: dict
+        """
+        if not self.mapID or self.apiVersion<0:
+            logging.error('analyzeCoverage request invalid: this sartopo session is not associated with a map.')
+            return False
+        assignments=self.getFeatures(featureClass='Assignment')
+        for (arg,featureClass,key) in [(operationalPeriod,'OperationalPeriod','operationalPeriodId'),(folder,'Folder','folderId')]:
+            if arg is None:
+                continue
+            (argShape,argStr)=self._resolveFeature(arg,featureClass=featureClass)
+            if not argShape:
+                logging.warning('analyzeCoverage: '+featureClass+' '+argStr+' not found; operation aborted.')
+                return False
+            assignments=[a for a in assignments if a['properties'].get(key)==argShape['id']]
+        if boundary is not None:
+            (boundaryShape,boundaryStr)=self._resolveFeature(boundary)
+            if not boundaryShape:
+                logging.warning('analyzeCoverage: boundary shape '+boundaryStr+' not found; operation aborted.')
+                return False
+            bg=boundaryShape['geometry']
+            if bg['type']!='Polygon':
+                logging.warning('analyzeCoverage: boundary feature '+boundaryStr+' is not a polygon: '+bg['type'])
+                return False
+            boundaryGeom=self._validPolygon(self._getCachedGeom(boundaryShape,'spurs',lambda: Polygon(self._removeSpurs(bg['coordinates'][0])))) # Shapely object
+
+        ids=[]
+        geoms=[]
+        for a in assignments:
+            ag=a['geometry']
+            if ag['type']!='Polygon':
+                continue
+            g=self._validPolygon(self._getCachedGeom(a,'spurs',lambda: Polygon(self._removeSpurs(ag['coordinates'][0])))) # Shapely object
+            if g is None or g.is_empty:
+                logging.warning('analyzeCoverage: assignment '+str(a['id'])+' has no area; skipped.')
+                continue
+            ids.append(a['id'])
+            geoms.append(g)
+        logging.info('analyzeCoverage: '+str(len(ids))+' assignments'+('  boundary='+boundaryStr if boundary is not None else ''))
+
+        # overlapping pairs: candidates from the spatial index, then all intersections at once
+        overlaps=[]
+        if len(geoms)>1:
+            geomArray=numpy.array(geoms,dtype=object)
+            (a,b)=STRtree(geoms).query(geoms,predicate='intersects')
+            keep=a<b
+            (a,b)=(a[keep],b[keep])
+            order=numpy.lexsort((b,a))
+            (a,b)=(a[order],b[order])
+            for (i,j,g) in zip(a,b,shapely.intersection(geomArray[a],geomArray[b])):
+                g=self._polygonalPart(g)
+                if g is not None:
+                    overlaps.append({'ids':[ids[i],ids[j]],'geometry':g})
+        coverage=unary_union(geoms) if geoms else None
+        gaps=[]
+        covered=None
+        if boundary is not None:
+            if coverage is None:
+                uncovered=boundaryGeom
+            else:
+                uncovered=boundaryGeom.difference(coverage)
+                covered=self._polygonalPart(boundaryGeom.intersection(coverage))
+            uncovered=self._polygonalPart(uncovered)
+            if uncovered is not None:
+                gaps=[{'geometry':g} for g in shapely.get_parts(uncovered)]
+
+        # all areas in one measurement pass
+        measured=[o['geometry'] for o in overlaps]+[g['geometry'] for g in gaps]+[coverage]
+        if boundary is not None:
+            measured+=[boundaryGeom,covered]
+        areas=[m['area'] if m else 0.0 for m in self._measureGeometries([shapely.geometry.mapping(g) if g is not None else {} for g in measured])]
+        for (d,area) in zip(overlaps+gaps,areas):
+            d['area']=area
+        rval={
+            'assignments':ids,
+            'overlaps':[o for o in overlaps if o['area']>=minArea],
+            'coverage':coverage,
+            'coverageArea':areas[len(overlaps)+len(gaps)],
+            'gaps':sorted([g for g in gaps if g['area']>=minArea],key=lambda g: -g['area']),
+            'gapArea':None,
+            'boundaryArea':None,
+            'coveredFraction':None}
+        if boundary is not None:
+            (boundaryArea,coveredArea)=areas[-2:]
+            rval['gapArea']=sum(g['area'] for g in rval['gaps'])
+            rval['boundaryArea']=boundaryArea
+            rval['coveredFraction']=coveredArea/boundaryArea if boundaryArea else None
+        return rval
+
+    def _polygonalPart(self,geom):
+        """Internal method to get only the polygons from the result of a shapely operation, which may also contain
+        lines and points where the operands touch.
+
+        :param geom: Shapely geometry
+        :return: Shapely Polygon or MultiPolygon; or None if there are no non-empty polygons
+        """
+        polygons=[g for g in shapely.get_parts(geom) if isinstance(g,Polygon) and not g.is_empty]
+        for g in shapely.get_parts(geom):
+            if isinstance(g,(MultiPolygon,GeometryCollection)):
+                polygons+=[p for p in shapely.get_parts(g) if isinstance(p,Polygon) and not p.is_empty]
+        if not polygons:
+            return None
+        return polygons[0] if len(polygons)==1 else MultiPolygon(polygons)
+
+    def _validPolygon(self,geom):
+        """Internal method to repair a self-intersecting polygon (e.g. a hand-drawn assignment whose edges cross),
+        so that it can be used in overlay operations.
+
+        :param geom: Shapely Polygon
+        :return: The same polygon if it is valid; otherwise, the polygonal part of shapely.make_valid, or None if there is none
+        """
+        if geom is None or geom.is_valid:
+            return geom
+        return self._polygonalPart(shapely.make_valid(geom))
+
+    def getMeasurements(self,features: list=None,featureClass: str=None) -> dict:
+        """Get the geodesic length, area, point count, and time span of several features, e.g. track lengths and search area sizes for a status display.\n
+        All of the features that are not already measured are measured together, in one vectorized pass over all of their points.
+        Measurements of cached features are kept until the feature's geometry changes (by ._doSync or .editFeature).
+        Distances are on the WGS84 ellipsoid if pyproj is installed; otherwise on a sphere of mean earth radius, which differs by up to about 0.5%.
+        Areas are on the WGS84 ellipsoid in either case (see ._measureGeometries).
+
+        :param features: List of IDs or entire feature dicts of the features to measure; defaults to None, which measures all cached features
+            (of featureClass, if specified)
+        :type features: list, optional
+        :param featureClass: If features is not specified, only measure cached features of this class, e.g. 'AppTrack'; defaults to None
+        :type featureClass: str, optional
+        :return: Dict keyed by feature ID; each value is a dict: \n
+            - *length* -> length in meters of a line, or perimeter of a polygon (all rings)
+            - *area* -> area in square meters of a polygon, excluding holes; 0 for other geometry types
+            - *points* -> number of points
+            - *startTime* -> earliest timestamp (the fourth element of each point, as recorded by the CalTopo app: integer milliseconds), or None if the points have no timestamps
+            - *endTime* -> latest timestamp, or None
+            - *duration* -> endTime minus startTime in seconds, or None \n
+            Features that have no geometry, or whose geometry can't be measured, are left out; or False if the session is not associated with a map
+        :rtype: dict
+        """
+        if not self.mapID or self.apiVersion<0:
+            logging.error('getMeasurements request invalid: this sartopo session is not associated with a map.')
+            return False
+        if features is None:
+            self._refresh()
+            with self.cacheLock:
+                index=self._getFeatureIndex()
+                if featureClass is None:
+                    features=list(index.features)
+                else:
+                    features=index.get(index.byClass,featureClass)
+        else:
+            features=[self.getFeature(id=f) if isinstance(f,str) else f for f in features]
+        rval={}
+        todo=[] # (feature,fingerprint)
+        with self.cacheLock:
+            for f in features:
+                g=f.get('geometry') if isinstance(f,dict) else None
+                if not isinstance(g,dict) or not g.get('coordinates'):
+                    continue
+                fp=_GeometryCache.fingerprint(g)
+                cached=self.measurementCache.get(f.get('id'))
+                if cached and cached[0]==fp:
+                    rval[f.get('id')]=cached[1]
+                else:
+                    todo.append((f,fp))
+        if todo:
+            measured=self._measureGeometries([f['geometry'] for (f,fp) in todo])
+            with self.cacheLock:
+                index=self._getFeatureIndex()
+                for ((f,fp),m) in zip(todo,measured):
+                    if m is None:
+                        logging.warning('getMeasurements: geometry of '+str(f.get('id'))+' could not be measured')
+                        continue
+                    rval[f.get('id')]=m
+                    if index.contains(f): # only cache features that are in the cache, since only those are invalidated
+                        self.measurementCache[f.get('id')]=(fp,m)
+        return rval
+
+    def _authalicSinLat(self,sinLat):
+        """Internal method to convert the sines of geodetic latitudes on the WGS84 ellipsoid to the sines of authalic latitudes, for ._measureGeometries.\n
+        The authalic sphere has the same area as the ellipsoid, and authalic latitude maps the ellipsoid onto it with equal area, so that
+        polygon areas on the ellipsoid can be computed with spherical formulas.
+
+        :param sinLat: Sines of geodetic latitudes, as a numpy array
+        :return: Tuple of (authalic radius in meters, sines of authalic latitudes as a numpy array)
+        :rtype: tuple
+        """
+        (a,f)=(6378137.0,1/298.257223563) # WGS84
+        e2=f*(2-f)
+        e=math.sqrt(e2)
+        q=lambda s: (1-e2)*(s/(1-e2*s*s)-numpy.log((1-e*s)/(1+e*s))/(2*e))
+        qp=q(1.0)
+        return (a*math.sqrt(qp/2),q(sinLat)/qp)
+
+    def _measureGeometries(self,geometries: list) -> list:
+        """Internal method to measure several geometries in one vectorized pass; see .getMeasurements.\n
+        The points of all of the lines and polygon rings are gathered into single lon, lat, and time arrays; segment lengths are computed
+        for all segments at once, and summed per line or ring, then per geometry.  Polygon ring areas are also computed for all rings at once,
+        with the spherical excess formula on the authalic sphere (see ._authalicSinLat), which matches the WGS84 geodesic area
+        to within 0.01% if the polygon's edges are up to about one degree long (the error grows with the square of the edge length).
+
+        :param geometries: List of geometry dicts (Point, LineString, MultiLineString, Polygon, or MultiPolygon)
+        :type geometries: list
+        :return: List of measurement dicts in the same sequence (see .getMeasurements); None for any geometry that can't be measured
+        :rtype: list
+        """
+        parts=[] # (geometry index, list of points, ring sign: 0 for lines, 1 for outer rings, -1 for holes)
+        rval=[None]*len(geometries)
+        for (i,g) in enumerate(geometries):
+            gtype=g.get('type')
+            c=g.get('coordinates')
+            n0=len(parts)
+            try:
+                if gtype=='Point':
+                    parts.append((i,[c],0))
+                elif gtype=='LineString':
+                    parts.append((i,c,0))
+                elif gtype=='MultiLineString':
+                    parts+=[(i,line,0) for line in c]
+                elif gtype=='Polygon':
+                    parts+=[(i,ring,1 if n==0 else -1) for (n,ring) in enumerate(c)]
+                elif gtype=='MultiPolygon':
+                    parts+=[(i,ring,1 if n==0 else -1) for polygon in c for (n,ring) in enumerate(polygon)]
+                else:
+                    continue
+                count=sum(len(p[1]) for p in parts[n0:])
+            except TypeError:
+                del parts[n0:]
+                continue
+            rval[i]={'length':0.0,'area':0.0,'points':count,'startTime':None,'endTime':None,'duration':None}
+
+        # gather all points; close any unclosed rings
+        lons=[]
+        lats=[]
+        times=[]
+        partIds=[]
+        partGeoms=[]
+        partSigns=[]
+        for (i,points,sign) in parts:
+            if not points:
+                continue
+            try:
+                a=numpy.asarray(points,dtype=float)
+                if a.ndim!=2 or a.shape[1]<2:
+                    raise ValueError
+                x=a[:,0]
+                y=a[:,1]
+                t=a[:,3] if a.shape[1]>3 else numpy.full(len(a),numpy.nan)
+            except (ValueError,TypeError): # ragged or non-numeric points
+                try:
+                    x=numpy.array([p[0] for p in points],dtype=float)
+                    y=numpy.array([p[1] for p in points],dtype=float)
+                except (ValueError,TypeError,IndexError):
+                    rval[i]=None
+                    continue
+                t=numpy.array([self._timeValue(p) for p in points],dtype=float)
+            if sign and (x[0]!=x[-1] or y[0]!=y[-1]):
+                (x,y,t)=(numpy.append(x,x[0]),numpy.append(y,y[0]),numpy.append(t,numpy.nan))
+            partIds.append(len(lons))
+            lons.append(x)
+            lats.append(y)
+            times.append(t)
+            partGeoms.append(i)
+            partSigns.append(sign)
+        if not lons:
+            return rval
+        partLens=numpy.array([len(x) for x in lons])
+        lon=numpy.concatenate(lons)
+        lat=numpy.concatenate(lats)
+        tim=numpy.concatenate(times)
+        partGeoms=numpy.array(partGeoms)
+        partSigns=numpy.array(partSigns)
+        nParts=len(partLens)
+        partOfPoint=numpy.repeat(numpy.arange(nParts),partLens)
+
+        # segment lengths for all consecutive point pairs, then discard the pairs that span two parts
+        if self.geod:
+            segLens=numpy.asarray(self.geod.line_lengths(lon,lat),dtype=float)
+        else:
+            (lonR,latR)=(numpy.radians(lon),numpy.radians(lat))
+            h=numpy.sin(numpy.diff(latR)/2)**2+numpy.cos(latR[:-1])*numpy.cos(latR[1:])*numpy.sin(numpy.diff(lonR)/2)**2
+            segLens=2*_LocalProjection.EARTH_RADIUS*numpy.arcsin(numpy.sqrt(numpy.clip(h,0,1)))
+        sameMask=partOfPoint[:-1]==partOfPoint[1:]
+        partLength=numpy.bincount(partOfPoint[:-1][sameMask],weights=segLens[sameMask],minlength=nParts)
+
+        # ring areas
+        partArea=numpy.zeros(nParts)
+        ringIdx=numpy.flatnonzero(partSigns!=0)
+        if len(ringIdx):
+            # spherical excess: area = R^2/2 * |sum((lon2-lon1)*(2+sin(lat1)+sin(lat2)))| over the ring edges,
+            #  with authalic latitudes and radius
+            (authalicRadius,sinLat)=self._authalicSinLat(numpy.sin(numpy.radians(lat)))
+            terms=numpy.diff(numpy.radians(lon))*(2+sinLat[:-1]+sinLat[1:])
+            sums=numpy.bincount(partOfPoint[:-1][sameMask],weights=terms[sameMask],minlength=nParts)
+            partArea[ringIdx]=numpy.abs(sums[ringIdx])*authalicRadius**2/2
+        partArea*=partSigns
+
+        # per geometry totals
+        nGeoms=len(geometries)
+        length=numpy.bincount(partGeoms,weights=partLength,minlength=nGeoms)
+        area=numpy.bincount(partGeoms,weights=partArea,minlength=nGeoms)
+        geomOfPoint=partGeoms[partOfPoint]
+        order=numpy.flatnonzero(numpy.diff(geomOfPoint,prepend=-1)) # points of each geometry are contiguous
+        with numpy.errstate(invalid='ignore'):
+            tmin=numpy.fmin.reduceat(tim,order)
+            tmax=numpy.fmax.reduceat(tim,order)
+        for (k,i) in enumerate(geomOfPoint[order]):
+            m=rval[i]
+            if m is None:
+                continue
+            m['length']=float(length[i])
+            m['area']=float(max(area[i],0.0))
+            if not numpy.isnan(tmin[k]):
+                m['startTime']=int(tmin[k]) if float(tmin[k]).is_integer() else float(tmin[k])
+                m['endTime']=int(tmax[k]) if float(tmax[k]).is_integer() else float(tmax[k])
+                m['duration']=(float(tmax[k])-float(tmin[k]))/1000
+        return rval
+
+    def _timeValue(self,point: list) -> float:
+        """Internal method to get the timestamp (fourth element) of a point as a float, or NaN if there is no numeric timestamp.
+        """
+        try:
+            return float(point[3])
+        except (IndexError,TypeError,ValueError):
+            return numpy.nan
+
     # _twoify - turn four-element-vertex-data into two-element-vertex-data so that
     #  the shapely functions can operate on it
     def _twoify(self,points: list) -> list:
@@ -3348,14 +5484,19 @@ class SartopoSession():
 
     # _fourify - try to use four-element-vertex data from original data; called by
     #  geometry operations during resulting shape creation / editing
-    def _fourify(self,points: list,origPoints: list) -> list:
+    def _fourify(self,points: list,origPoints: list,indexed: bool=True) -> list:
         """Internal method to make a list of four-element points from a list of possibly-two-element points, by comparison with an original list of four-element points.\n
-        Used internally to make sure geometry operation results are compliant with subsequent operations.
+        Used internally to make sure geometry operation results are compliant with subsequent operations.\n
+        Each point is replaced by the first original point with the same first two elements; a new first or last point that has
+        no match gets the timestamp of the original first or last point.
 
         :param points: List of possibly-two-element points to be copied into a list of four-element points
         :type points: list
         :param origPoints: List of four-element points that can be used to inform the copy operation as needed
         :type origPoints: list
+        :param indexed: True to look up each point in a dict of the original points, in linear time; False to scan the original points
+            for each point, in quadratic time; the results are the same; defaults to True
+        :type indexed: bool
         :return: List of four-element points
         """        
         # no use trying to fourify if the orig points list is not all four-element points
@@ -3369,13 +5510,32 @@ class SartopoSession():
             return points
         # logging.info('fourify: '+str(len(points))+' points: '+str(points[0:3])+' ... '+str(points[-3:]))
         # logging.info('orig: '+str(len(origPoints))+' points: '+str(origPoints[0:3])+' ... '+str(origPoints[-3:]))
+        # index the original points by their first two elements, keeping the first occurrence;
+        #  the key includes the point type, since a list slice never equals a tuple slice
+        origIndex=None
+        if indexed:
+            origIndex={}
+            try:
+                for op in origPoints:
+                    origIndex.setdefault((type(op[0:2]),)+tuple(op[0:2]),op)
+            except TypeError: # unhashable coordinate values; scan instead
+                origIndex=None
         for i in range(len(points)):
             found=False
-            for j in range(len(origPoints)):
-                if origPoints[j][0:2]==points[i][0:2]:
-                    points[i]=origPoints[j]
+            if origIndex is not None:
+                try:
+                    op=origIndex.get((type(points[i][0:2]),)+tuple(points[i][0:2]))
+                except TypeError: # unhashable, so it can't match any original point
+                    op=None
+                if op is not None:
+                    points[i]=op
                     found=True
-                    break
+            else:
+                for j in range(len(origPoints)):
+                    if origPoints[j][0:2]==points[i][0:2]:
+                        points[i]=origPoints[j]
+                        found=True
+                        break
             # generated endpoints (possibly first and/or last point after crop) won't have timestamps;
             #  for the new first point, use the timestamp from the original first point;
             #  for the new last point, use the timestamp from the original last point
@@ -3392,9 +5552,10 @@ class SartopoSession():
     # crop - remove portions of a line or polygon that are outside a boundary polygon;
     #          grow the specified boundary polygon by the specified distance before cropping
 
-    def crop(self,target,boundary,beyond=0.0001,deleteBoundary=False,useResultNameSuffix=False,drawSizedBoundary=False,noDraw=False):
+    def crop(self,target,boundary,beyond=0.0001,deleteBoundary=False,useResultNameSuffix=False,drawSizedBoundary=False,noDraw=False,beyondMeters=None,parallel=False):
         """Remove portions of a line or polygon that are outside a boundary polygon.
-        Optionally grow the boundary polygon by the specified distance before cropping.
+        Optionally grow the boundary polygon by the specified distance before cropping.\n
+        The changes are planned by .planCrop, then sent by .commitPlan.
 
         :param target: ID, title, or entire feature dict of the target feature
         :param boundary: ID, title, or entire feature dict of the boundary polygon
@@ -3408,250 +5569,585 @@ class SartopoSession():
         :type drawSizedBoundary: bool, optional
         :param noDraw: If True return the resulting coordinate list(s) instead of editing / adding map features; defaults to False
         :type noDraw: bool, optional
-        :return: Resulting feature IDs, or resulting coordinate list(s) (see noDraw), or False if a failure occurred prior to the crop operation
+        :param beyondMeters: Distance to oversize the boundary polygon in meters, in a local projection (see ._bufferMeters), so that it is the same
+            in every direction at any latitude; if specified, beyond is ignored; defaults to None
+        :type beyondMeters: float, optional
+        :param parallel: If True, send the target edit and any new features as one batch of concurrent requests (see .commitPlan);
+            if False, send them one at a time, in sequence; defaults to False
+        :type parallel: bool, optional
+        :return: Resulting feature IDs (not including the sized boundary, if drawn), or resulting coordinate list(s) (see noDraw), or False if a failure occurred prior to the crop operation
         """        
+        prep=self._prepareCrop(target,boundary,beyond,beyondMeters=beyondMeters)
+        if not prep:
+            return False
+        (targetShape,boundaryShape,boundaryGeom,result,tgc_orig)=prep
+        # the sized boundary is drawn even if it does not intersect the target, or if noDraw is specified
+        if result is None or noDraw:
+            if drawSizedBoundary:
+                c=self._planSizedBoundary(targetShape,boundaryGeom)
+                getattr(self,c['method'])(**c['args'])
+            if result is None:
+                return False
+            # if specified, only return the coordinate list(s) instead of editing / adding map features
+            return self._cropCoords(result)
+
+        plan=self._planCrop(prep,deleteBoundary,useResultNameSuffix,drawSizedBoundary)
+        if not plan:
+            return False
+        return self.commitPlan(plan,parallel=parallel) # resulting feature IDs
+
+    def planCrop(self,target,boundary,beyond=0.0001,deleteBoundary=False,useResultNameSuffix=False,drawSizedBoundary=False,beyondMeters=None):
+        """Plan a crop operation (see .crop) without changing anything; see .planCut.
+
+        :param target: ID, title, or entire feature dict of the target feature
+        :param boundary: ID, title, or entire feature dict of the boundary polygon
+        :param beyond: Distance to oversize the boundary polygon (in degrees) prior to the crop operation; defaults to 0.0001
+        :type beyond: float, optional
+        :param deleteBoundary: If True, the plan includes deleting the boundary polygon; defaults to False
+        :type deleteBoundary: bool, optional
+        :param useResultNameSuffix: If True, any new features resulting from the cut operation will have their titles suffixed; defaults to False
+        :type useResultNameSuffix: bool, optional
+        :param drawSizedBoundary: If True, the plan includes drawing the oversized boundary polygon as a feature (in the plan's 'extras'); defaults to False
+        :type drawSizedBoundary: bool, optional
+        :param beyondMeters: Distance to oversize the boundary polygon in meters, in a local projection (see ._bufferMeters), so that it is the same
+            in every direction at any latitude; if specified, beyond is ignored; defaults to None
+        :type beyondMeters: float, optional
+        :return: Plan dict (see .commitPlan), or False if a failure occurred prior to the crop operation
+        :rtype: dict
+        """
+        prep=self._prepareCrop(target,boundary,beyond,beyondMeters=beyondMeters)
+        if not prep:
+            return False
+        return self._planCrop(prep,deleteBoundary,useResultNameSuffix,drawSizedBoundary)
+
+    def _planCrop(self,prep: tuple,deleteBoundary: bool,useResultNameSuffix: bool,drawSizedBoundary: bool):
+        """Internal method to plan a crop operation from the return value of ._prepareCrop; see .planCrop.
+
+        :return: Plan dict (see .commitPlan), or False if the target and boundary do not intersect, or the result can't be applied
+        :rtype: dict
+        """
+        (targetShape,boundaryShape,boundaryGeom,result,tgc_orig)=prep
+        if result is None:
+            return False
+        plan=self._newPlan('crop')
+        if drawSizedBoundary:
+            plan['extras'].append(self._planSizedBoundary(targetShape,boundaryGeom))
+        if not self._planResult(plan,targetShape,result,useResultNameSuffix,tgc_orig=tgc_orig):
+            return False
+        if deleteBoundary:
+            plan['deletes'].append({'id':boundaryShape['id'],'class':boundaryShape['properties']['class'],'title':boundaryShape['properties'].get('title')})
+        return plan
+
+    def _prepareCrop(self,target,boundary,beyond: float,beyondMeters: float=None):
+        """Internal method to find the target and boundary features of a crop operation, and compute the result; see .crop.
+
+        :return: Tuple of (target feature, boundary feature, oversized boundary geometry, resulting geometry, original target coordinate list);
+            the resulting geometry is None if the target and boundary do not intersect; or False if a failure occurred prior to the crop operation
+        :rtype: tuple
+        """
         if not self.mapID or self.apiVersion<0:
             logging.error('crop request invalid: this sartopo session is not associated with a map.')
             return False
-        if isinstance(target,str): # if string, find feature by name; if id, find feature by id
-            targetStr=target
-            if len(target)==36: # id
-                targetShape=self.getFeature(id=target)
-            else:
-                targetShape=self.getFeature(title=target,featureClassExcludeList=['Folder','OperationalPeriod'])
-        else:
-            targetShape=target
-            targetStr='NO TITLE'
-            if isinstance(targetShape,dict):
-                targetStr=targetShape.get('title','NO TITLE')
+        (targetShape,targetStr)=self._resolveFeature(target)
         if not targetShape:
             logging.warning('Target shape '+targetStr+' not found; operation aborted.')
             return False
 
-        tg=targetShape['geometry']
-        tgc_orig=None
-        targetType=tg['type']
-        if targetType=='Polygon':
-            tgc=tg['coordinates'][0]
-            tgc=self._removeSpurs(tgc)
-            targetGeom=Polygon(tgc) # Shapely object
-        elif targetType=='LineString':
-            tgc_orig=tg['coordinates']
-            tgc=self._twoify(tgc_orig)
-            # logging.info('tgc before ('+str(len(tgc))+' points):'+str(tgc))
-            tgc=self._removeSpurs(tgc)
-            # logging.info('tgc after ('+str(len(tgc))+' points):'+str(tgc))
-            targetGeom=LineString(tgc)
-        else:
-            logging.warning('crop: target feature '+targetStr+' is not a polygon or line: '+targetType)
+        (targetGeom,tgc_orig)=self._getCropTargetGeom(targetShape)
+        if targetGeom is None:
+            logging.warning('crop: target feature '+targetStr+' is not a polygon or line: '+targetShape['geometry']['type'])
             return False
             
-        if isinstance(boundary,str): # if string, find feature by name; if id, find feature by id
-            boundaryStr=boundary
-            if len(boundary)==36: # id
-                boundaryShape=self.getFeature(id=boundary)
-            else:
-                boundaryShape=self.getFeature(title=boundary,featureClassExcludeList=['Folder','OperationalPeriod'])
-        else:
-            boundaryShape=boundary
-            boundaryStr='NO TITLE'
-            if isinstance(boundaryShape,dict):
-                boundaryStr=boundaryShape.get('title','NO TITLE')
+        (boundaryShape,boundaryStr)=self._resolveFeature(boundary)
         if not boundaryShape:
             logging.warning('crop: boundary shape '+boundaryStr+' not found; operation aborted.')
             return False
 
         logging.info('crop: target='+targetStr+'  boundary='+boundaryStr)
 
-        cg=boundaryShape['geometry']
-        boundaryType=cg['type']
-        if boundaryType=='Polygon':
-            cgc=cg['coordinates'][0]
-            boundaryGeom=self._buffer2(Polygon(cgc),beyond)
-        elif boundaryType=='LineString':
-            cgc=self._twoify(cg['coordinates'])
-            boundaryGeom=LineString(cgc).buffer(beyond)
-        else:
-            logging.warning('crop: boundary feature '+boundaryStr+' is not a polygon or line: '+boundaryType)
+        boundaryGeom=self._getCropBoundaryGeom(boundaryShape,beyond,beyondMeters=beyondMeters)
+        if boundaryGeom is None:
+            logging.warning('crop: boundary feature '+boundaryStr+' is not a polygon or line: '+boundaryShape['geometry']['type'])
             return False
         # logging.info('crop: boundaryGeom:'+str(boundaryGeom))
-        if drawSizedBoundary:
-            tp=targetShape['properties']
-            self.addPolygon(list(boundaryGeom.exterior.coords),
-                title='sizedCropBoundary',
-                stroke=tp.get('stroke',None),
-                fill=tp.get('fill',None),
-                strokeOpacity=tp.get('stroke-opacity',None),
-                strokeWidth=tp.get('stroke-width',None),
-                fillOpacity=tp.get('fill-opacity',None),
-                description=tp.get('description',None))
 
         if not boundaryGeom.intersects(targetGeom):
             logging.warning(targetShape['properties']['title']+','+boundaryShape['properties']['title']+': features do not intersect; no operation performed')
-            return False
+            return (targetShape,boundaryShape,boundaryGeom,None,tgc_orig)
 
-        # if target is a line, and boundary is a polygon, use _intersection2; see notes above
-        if isinstance(targetGeom,LineString) and isinstance(boundaryGeom,Polygon):
-            result=self._intersection2(targetGeom,boundaryGeom)
-        else:
-            result=targetGeom&boundaryGeom # could be MultiPolygon or MultiLinestring or GeometryCollection
+        result=self._cropGeom(targetGeom,boundaryGeom)
         # logging.info('crop targetGeom:'+str(targetGeom))
         # logging.info('crop boundaryGeom:'+str(boundaryGeom))
         # logging.info('crop result class:'+str(result.__class__.__name__))
         # logging.info('crop result:'+str(result))
+        return (targetShape,boundaryShape,boundaryGeom,result,tgc_orig)
 
-        # if specified, only return the coordinate list(s) instead of editing / adding map features
-        if noDraw:
-            # return a list of line segments with points as lists rather than tuples; a.k.a. a list of lists of lists
-            if isinstance(result,LineString):
-                return [list(map(list,result.coords))]
-            elif isinstance(result,MultiLineString):
-                return [list(map(list,ls.coords)) for ls in result]
-            else:
-                logging.error('Unexpected noDraw crop result type '+str(result.__class__.__name__))
-                return False
+    def _planSizedBoundary(self,targetShape: dict,boundaryGeom) -> dict:
+        """Internal method to plan drawing the oversized boundary of a crop operation, with the target's style (see crop(...,drawSizedBoundary=True)).
 
-        # preserve target properties when adding new features
+        :return: Planned new feature; see .commitPlan
+        :rtype: dict
+        """
         tp=targetShape['properties']
-        tc=tp['class'] # Shape or Assignment
-        tfid=tp.get('folderId',None)
+        return {'method':'addPolygon','title':'sizedCropBoundary','args':{
+            'points':list(boundaryGeom.exterior.coords),
+            'title':'sizedCropBoundary',
+            'stroke':tp.get('stroke',None),
+            'fill':tp.get('fill',None),
+            'strokeOpacity':tp.get('stroke-opacity',None),
+            'strokeWidth':tp.get('stroke-width',None),
+            'fillOpacity':tp.get('fill-opacity',None),
+            'description':tp.get('description',None)}}
+
+    def cropMany(self,targets: list,boundary,beyond=0.0001,deleteBoundary=False,useResultNameSuffix=False,noDraw=False,beyondMeters=None,parallel=False):
+        """Crop several lines and/or polygons with the same boundary polygon; see .crop.\n
+        The boundary is looked up, oversized, and prepared only once.  Targets whose bounding box does not intersect the bounding box
+        of the boundary are skipped without building their geometry.  All of the crop results are computed and planned first,
+        with suffixed result titles allocated across all of the targets so that they do not collide; the resulting edits and
+        new features are then sent (see .commitPlan), and this method waits for all of them.
+
+        :param targets: List of IDs, titles, or entire feature dicts of the target features
+        :type targets: list
+        :param boundary: ID, title, or entire feature dict of the boundary polygon
+        :param beyond: Distance to oversize the boundary polygon (in degrees) prior to the crop operation; defaults to 0.0001
+        :type beyond: float, optional
+        :param deleteBoundary: If True, the boundary polygon will be deleted after all of the crop operations; defaults to False
+        :type deleteBoundary: bool, optional
+        :param useResultNameSuffix: If True, any new features resulting from the crop operations will have their titles suffixed; defaults to False
+        :type useResultNameSuffix: bool, optional
+        :param noDraw: If True return the resulting coordinate list(s) instead of editing / adding map features; defaults to False
+        :type noDraw: bool, optional
+        :param beyondMeters: Distance to oversize the boundary polygon in meters, in a local projection (see ._bufferMeters), so that it is the same
+            in every direction at any latitude; if specified, beyond is ignored; defaults to None
+        :type beyondMeters: float, optional
+        :param parallel: If True, send all of the edits and new features as one batch of concurrent requests (see .commitPlan);
+            if False, send them one at a time, in sequence; defaults to False
+        :type parallel: bool, optional
+        :return: Dict keyed by target feature ID; each value is the same as the return value of .crop for that target
+            (False if the target does not intersect the boundary); targets that are not found are logged and left out;
+            or False if a failure occurred prior to the crop operations
+        :rtype: dict
+        """
+        if not self.mapID or self.apiVersion<0:
+            logging.error('cropMany request invalid: this sartopo session is not associated with a map.')
+            return False
+        (boundaryShape,boundaryStr)=self._resolveFeature(boundary)
+        if not boundaryShape:
+            logging.warning('cropMany: boundary shape '+boundaryStr+' not found; operation aborted.')
+            return False
+        boundaryGeom=self._getCropBoundaryGeom(boundaryShape,beyond,beyondMeters=beyondMeters)
+        if boundaryGeom is None:
+            logging.warning('cropMany: boundary feature '+boundaryStr+' is not a polygon or line: '+boundaryShape['geometry']['type'])
+            return False
 
-        # use the unsiffixed name as the base (everything before colon-followed-by-integer)
-        #  so that a cut of a:2 would produce a:3 rather than a:2:1
-        if tc=='Assignment':
-            base=tp['letter']
+        targetShapes=[]
+        for target in targets:
+            (targetShape,targetStr)=self._resolveFeature(target)
+            if not targetShape:
+                logging.warning('cropMany: target shape '+targetStr+' not found; skipped.')
+                continue
+            targetShapes.append(targetShape)
+        logging.info('cropMany: '+str(len(targetShapes))+' targets  boundary='+boundaryStr)
+
+        # compute all of the crop results
+        (bx0,by0,bx1,by1)=boundaryGeom.bounds
+        rval={}
+        crops=[] # (targetShape,result,tgc_orig)
+        for targetShape in targetShapes:
+            tid=targetShape['id']
+            tb=self._getCoordBounds(targetShape['geometry'])
+            if tb and (tb[0]>bx1 or tb[2]<bx0 or tb[1]>by1 or tb[3]<by0):
+                logging.info('cropMany: '+str(targetShape['properties'].get('title'))+' does not intersect the boundary; no operation performed')
+                rval[tid]=False
+                continue
+            (targetGeom,tgc_orig)=self._getCropTargetGeom(targetShape)
+            if targetGeom is None:
+                logging.warning('cropMany: target feature '+str(tid)+' is not a polygon or line: '+targetShape['geometry']['type'])
+                rval[tid]=False
+                continue
+            if not boundaryGeom.intersects(targetGeom):
+                logging.info('cropMany: '+str(targetShape['properties'].get('title'))+' does not intersect the boundary; no operation performed')
+                rval[tid]=False
+                continue
+            result=self._cropGeom(targetGeom,boundaryGeom)
+            if noDraw:
+                rval[tid]=self._cropCoords(result)
+            else:
+                crops.append((targetShape,result,tgc_orig))
+
+        # plan all of the edits and additions, allocating suffixes across all targets, then send them
+        if crops:
+            usedSuffixes={}
+            plans=[]
+            for (targetShape,result,tgc_orig) in crops:
+                plan=self._newPlan('crop')
+                if self._planResult(plan,targetShape,result,useResultNameSuffix,tgc_orig=tgc_orig,usedSuffixes=usedSuffixes):
+                    plans.append((targetShape['id'],plan))
+                else:
+                    rval[targetShape['id']]=False
+            for ((tid,plan),rids) in zip(plans,self._commitPlans([plan for (tid,plan) in plans],parallel=parallel)):
+                rval[tid]=rids
+
+        if deleteBoundary:
+            self.delFeature(boundaryShape['id'],fClass=boundaryShape['properties']['class'])
+
+        return rval
+
+    def _getCoordBounds(self,geometry: dict) -> list:
+        """Internal method to get the bounding box of a line or polygon (outer ring only) directly from its coordinates, without building a shapely geometry.
+
+        :param geometry: Feature geometry dict
+        :type geometry: dict
+        :return: Bounding box [min X, min Y, max X, max Y], or None if the geometry is not a line or polygon, or has no points
+        :rtype: list
+        """
+        c=geometry.get('coordinates')
+        if geometry.get('type')=='Polygon':
+            c=c[0] if c else None
+        elif geometry.get('type')!='LineString':
+            return None
+        if not c:
+            return None
+        xs=[p[0] for p in c]
+        ys=[p[1] for p in c]
+        return [min(xs),min(ys),max(xs),max(ys)]
+
+    def _getCropTargetGeom(self,targetShape: dict):
+        """Internal method to get the shapely geometry of a crop target.
+
+        :param targetShape: Target feature data object
+        :type targetShape: dict
+        :return: Tuple of (shapely geometry, original coordinate list); the original coordinate list is only
+            needed to restore elevation and timestamp of line vertices, and is None for polygons;
+            or (None,None) if the target is not a polygon or line
+        :rtype: tuple
+        """
+        tg=targetShape['geometry']
+        targetType=tg['type']
+        if targetType=='Polygon':
+            return (self._getCachedGeom(targetShape,'spurs',lambda: Polygon(self._removeSpurs(tg['coordinates'][0]))),None) # Shapely object
+        elif targetType=='LineString':
+            tgc_orig=tg['coordinates']
+            return (self._getCachedGeom(targetShape,'2d',lambda: LineString(self._removeSpurs(self._twoify(tgc_orig)))),tgc_orig)
+        return (None,None)
+
+    def _getCropBoundaryGeom(self,boundaryShape: dict,beyond: float,beyondMeters: float=None):
+        """Internal method to get the oversized, prepared shapely geometry of a crop boundary.\n
+        The result is cached per beyond value, so that cropping many targets with the same boundary only oversizes it once.
+
+        :param boundaryShape: Boundary feature data object
+        :type boundaryShape: dict
+        :param beyond: Distance to oversize the boundary (in degrees)
+        :type beyond: float
+        :param beyondMeters: Distance to oversize the boundary in meters; if specified, beyond is ignored; defaults to None
+        :type beyondMeters: float, optional
+        :return: Shapely geometry, or None if the boundary is not a polygon or line
+        """
+        cg=boundaryShape['geometry']
+        boundaryType=cg['type']
+        if beyondMeters is not None:
+            if boundaryType=='Polygon':
+                return self._getCachedGeom(boundaryShape,'bufferMeters:'+repr(beyondMeters),lambda: self._buffer2(Polygon(cg['coordinates'][0]),beyondMeters,metric=True),prepared=True)
+            elif boundaryType=='LineString':
+                return self._getCachedGeom(boundaryShape,'bufferMeters:'+repr(beyondMeters),lambda: self._bufferMeters(LineString(self._twoify(cg['coordinates'])),beyondMeters),prepared=True)
+            return None
+        if boundaryType=='Polygon':
+            return self._getCachedGeom(boundaryShape,'buffer:'+repr(beyond),lambda: self._buffer2(Polygon(cg['coordinates'][0]),beyond),prepared=True)
+        elif boundaryType=='LineString':
+            return self._getCachedGeom(boundaryShape,'buffer:'+repr(beyond),lambda: LineString(self._twoify(cg['coordinates'])).buffer(beyond),prepared=True)
+        return None
+
+    def _cropGeom(self,targetGeom,boundaryGeom):
+        """Internal method to crop a target geometry with a boundary geometry that it is known to intersect.
+
+        :param targetGeom: Target geometry
+        :param boundaryGeom: Oversized boundary geometry
+        :return: Resulting geometry; could be one of various shapely.geometry classes
+        """
+        # if target is a line, and boundary is a polygon, use _intersection2; see notes above
+        if isinstance(targetGeom,LineString) and isinstance(boundaryGeom,Polygon):
+            return self._intersection2(targetGeom,boundaryGeom)
+        return targetGeom&boundaryGeom # could be MultiPolygon or MultiLinestring or GeometryCollection
+
+    def _cropCoords(self,result):
+        """Internal method to convert a line crop result to coordinate lists, for crop(...,noDraw=True).
+
+        :param result: Resulting geometry from ._cropGeom
+        :return: List of line segments with points as lists rather than tuples, a.k.a. a list of lists of lists; or False if the result is not a line
+        """
+        if isinstance(result,LineString):
+            return [list(map(list,result.coords))]
+        elif isinstance(result,MultiLineString):
+            return [list(map(list,ls.coords)) for ls in result.geoms]
         else:
-            base=tp['title']
-        # accomodate base names that include colon
-        baseParse=base.split(':')
-        if len(baseParse)>1 and baseParse[-1].isnumeric():
-            base=':'.join(baseParse[:-1])
-        usedSuffixList=self._getUsedSuffixList(base)
+            logging.error('Unexpected noDraw crop result type '+str(result.__class__.__name__))
+            return False
+
+    def commitPlan(self,plan: dict,parallel: bool=False) -> list:
+        """Apply a plan made by .planCut, .planExpand, or .planCrop.\n
+        By default, the changes are sent one at a time, in sequence, from the calling thread, in the same order as .cut, .expand,
+        and .crop have always sent them: extras, target edit, new features, then deletions.\n
+        If parallel is True, the target edit and all new features are sent as one batch of concurrent requests in the session's thread pool,
+        so that e.g. cutting a polygon into twelve pieces takes about the time of one request rather than twelve.  The cached target
+        feature is still edited in the calling thread, before the batch is sent.  The planned deletions (the cutter, p2, or boundary
+        feature) are sent after the target edit is complete, and only if it succeeded.
+
+        Either way, the target edit is sent immediately, even if edits are being coalesced (see .editFeature).
+
+        A plan is a dict with these keys:\n
+            - *operation* -> 'cut', 'expand', or 'crop'
+            - *result* -> the resulting shapely geometry
+            - *edits* -> list of dicts, one per feature to edit, with keys 'id', 'class', 'title', and 'geometry' (see .editFeature)
+            - *creates* -> list of dicts, one per resulting feature to add, with keys 'method' (name of the .add... method), 'title' (or letter, for assignments), and 'args' (dict of arguments for the method)
+            - *extras* -> list of dicts, one per feature to add that is not part of the result (the sized crop boundary; see .crop), in the same format as *creates*
+            - *deletes* -> list of dicts, one per feature to delete, with keys 'id', 'class', and 'title'
+
+        :param plan: Plan dict
+        :type plan: dict
+        :param parallel: If True, send the edits and new features concurrently, as described above; defaults to False
+        :type parallel: bool, optional
+        :return: List of resulting feature IDs: the return values of the edits, then of the new feature additions, in the same sequence as in the plan
+            (extras are not included)
+        :rtype: list
+        """
+        return self._commitPlans([plan],parallel=parallel)[0]
+
+    def _commitPlans(self,plans: list,parallel: bool=False) -> list:
+        """Internal method to apply several plans; see .commitPlan.  If parallel is True, all of the edits and new features
+        of all of the plans are sent in one batch.
+
+        :param plans: List of plan dicts
+        :type plans: list
+        :param parallel: If True, send the edits and new features concurrently; defaults to False
+        :type parallel: bool, optional
+        :return: List of return values of .commitPlan, one per plan
+        :rtype: list
+        """
+        if not parallel:
+            rval=[]
+            for plan in plans:
+                for c in plan['extras']:
+                    getattr(self,c['method'])(**c['args'])
+                rids=[self.editFeature(id=e['id'],geometry=e['geometry'],coalesce=False) for e in plan['edits']]
+                rids+=[getattr(self,c['method'])(**c['args']) for c in plan['creates']]
+                for d in plan['deletes']:
+                    self.delFeature(d['id'],fClass=d['class'])
+                rval.append(rids)
+            return rval
+
+        executor=self._getExecutor()
+        submitted=[]
+        for plan in plans:
+            # the cache is only edited here, in the calling thread; the worker threads only send the requests
+            edits=[self._submitEdit(executor,e) for e in plan['edits']]
+            creates=[executor.submit(getattr(self,c['method']),**c['args']) for c in plan['extras']+plan['creates']]
+            submitted.append((plan,edits,creates))
+        rval=[]
+        deletes=[]
+        for (plan,edits,creates) in submitted:
+            rids=[]
+            for future in edits+creates:
+                try:
+                    rids.append(future.result())
+                except Exception as e:
+                    logging.error(plan['operation']+': exception while applying plan: '+str(e))
+                    rids.append(False)
+            del rids[len(edits):len(edits)+len(plan['extras'])] # extras are not resulting features
+            if plan['deletes']:
+                if all(rids[0:len(edits)]):
+                    deletes+=plan['deletes']
+                else:
+                    logging.warning(plan['operation']+': target edit failed; not deleting '+', '.join(str(d['title']) for d in plan['deletes']))
+            rval.append(rids)
+        if deletes:
+            self.delFeatures(deletes)
+        return rval
+
+    def _submitEdit(self,executor: ThreadPoolExecutor,edit: dict) -> Future:
+        """Internal method to apply one planned edit to the cached feature, in the calling thread, and submit its request to the thread pool.
 
-        # collect resulting feature ids to return as the return value
-        rids=[]
+        :param executor: The session's thread pool
+        :type executor: concurrent.futures.ThreadPoolExecutor
+        :param edit: Planned edit; see .commitPlan
+        :type edit: dict
+        :return: Future whose result is the return value of the edit request (the feature ID), or False if the feature is not in the cache
+        :rtype: concurrent.futures.Future
+        """
+        with self.cacheLock:
+            index=self._getFeatureIndex()
+            features=index.get(index.byId,edit['id'])
+            if len(features)==1:
+                feature=features[0]
+                className=feature['properties']['class']
+                j=self._applyEdit(feature,className,geometry=edit['geometry'])
+        if len(features)!=1:
+            logging.warning('edit of '+str(edit['title'])+' was not sent: feature '+str(edit['id'])+' is not in the cache')
+            future=Future()
+            future.set_result(False)
+            return future
+        return executor.submit(self._sendRequest,'post',className,j,id=feature['id'],returnJson='ID',reduceGeometry=False)
+
+    def _newPlan(self,operation: str) -> dict:
+        """Internal method to make an empty plan; see .commitPlan.
+
+        :param operation: 'cut', 'expand', or 'crop'
+        :type operation: str
+        :return: Plan dict
+        :rtype: dict
+        """
+        return {'operation':operation,'result':None,'edits':[],'creates':[],'extras':[],'deletes':[]}
+
+    def _planResult(self,plan: dict,targetShape: dict,result,useResultNameSuffix: bool,tgc_orig: list=None,usedSuffixes: dict=None) -> bool:
+        """Internal method to add the target edit and any new features for the result of a cut or crop to a plan.\n
+        The first part of the result replaces the target geometry; each additional part becomes a new feature, with the target's properties.
+
+        :param plan: Plan dict; modified in place
+        :type plan: dict
+        :param targetShape: Target feature data object
+        :type targetShape: dict
+        :param result: Resulting geometry
+        :param useResultNameSuffix: If True, any new features will have their titles suffixed
+        :type useResultNameSuffix: bool
+        :param tgc_orig: Original target coordinate list, from ._getCropTargetGeom, to restore elevation and timestamp of
+            the vertices of a single resulting line; defaults to None
+        :type tgc_orig: list, optional
+        :param usedSuffixes: Dict of used suffix lists (see ._getUsedSuffixList) keyed by base title, shared by plans that are made
+            before any of them are committed; defaults to None
+        :type usedSuffixes: dict, optional
+        :return: True if successful; False if the result can't be applied
+        :rtype: bool
+        """
+        op=plan['operation']
+        tp=targetShape['properties']
+        tc=tp['class'] # Shape or Assignment
 
-        if isinstance(result,GeometryCollection): # apparently this will only be the case for polygons
+        if isinstance(result,GeometryCollection): # polygons, linestrings, or both
             try:
                 result=MultiPolygon(result)
             except:
                 try:
                     result=MultiLineString(result)
                 except:
-                    logging.error('crop: resulting GeometryCollection could not be converted to MultiPolygon or MultiLineString.  Operation aborted.')
+                    logging.error(op+': resulting GeometryCollection could not be converted to MultiPolygon or MultiLineString.  Operation aborted.')
                     return False
+        plan['result']=result
+        # logging.info(op+' result class:'+str(result.__class__.__name__))
+
+        isPolygon=isinstance(result,(Polygon,MultiPolygon))
         if isinstance(result,Polygon):
-            rids.append(self.editFeature(id=targetShape['id'],geometry={'coordinates':[list(result.exterior.coords)]}))
-            if rids==[]:
-                logging.warning('crop: target shape not found; operation aborted.')
-                return False
+            parts=[list(result.exterior.coords)]
         elif isinstance(result,MultiPolygon):
-            resultGeoms=result.geoms
-            rids.append(self.editFeature(id=targetShape['id'],geometry={'coordinates':[list(resultGeoms[0].exterior.coords)]}))
-            if rids==[]:
-                logging.warning('crop: target shape not found; operation aborted.')
-                return False
-            for r in [g for g in resultGeoms][1:]:
-                if tc=='Shape':
-                    title=tp['title']
-                    if useResultNameSuffix:
-                        suffix=self._getNextAvailableSuffix(usedSuffixList)
-                        title=base+':'+str(suffix)
-                        usedSuffixList.append(suffix)
-                    rids.append(self.addPolygon(list(r.exterior.coords),
-                        title=title,
-                        stroke=tp.get('stroke',None),
-                        fill=tp.get('fill',None),
-                        strokeOpacity=tp.get('stroke-opacity',None),
-                        strokeWidth=tp.get('stroke-width',None),
-                        fillOpacity=tp.get('fill-opacity',None),
-                        description=tp.get('description',None),
-                        folderId=tfid))
-                elif tc=='Assignment':
-                    letter=tp['letter']
-                    if useResultNameSuffix:
-                        suffix=self._getNextAvailableSuffix(usedSuffixList)
-                        letter=base+':'+str(suffix)
-                        usedSuffixList.append(suffix)
-                    rids.append(self.addAreaAssignment(list(r.exterior.coords),
-                        number=tp['number'],
-                        letter=letter,
-                        opId=tp.get('operationalPeriodId',''),
-                        folderId=tp.get('folderId',None), # empty string will create an unnamed folder!
-                        resourceType=tp.get('resourceType',''),
-                        teamSize=tp.get('teamSize',0),
-                        priority=tp.get('priority',''),
-                        responsivePOD=tp.get('responsivePOD',''),
-                        unresponsivePOD=tp.get('unresponsivePOD',''),
-                        cluePOD=tp.get('cluePOD',''),
-                        description=tp.get('description',''),
-                        previousEfforts=tp.get('previousEfforts',''),
-                        transportation=tp.get('transportation',''),
-                        timeAllocated=tp.get('timeAllocated',0),
-                        primaryFrequency=tp.get('primaryFrequency',''),
-                        secondaryFrequency=tp.get('secondaryFrequency',''),
-                        preparedBy=tp.get('preparedBy',''),
-                        status=tp.get('status','')))
-                else:
-                    logging.warning('crop: target feature class was neither Shape nor Assigment')
+            parts=[list(g.exterior.coords) for g in result.geoms]
         elif isinstance(result,LineString):
-            # logging.info('adding shape to result list')
-            four=self._fourify(list(result.coords),tgc_orig)
-            # logging.info('four:'+str(four))
-            rids.append(self.editFeature(id=targetShape['id'],geometry={'coordinates':four}))
-            if rids==[]:
-                logging.warning('crop: target shape not found; operation aborted.')
-                return False
+            parts=[list(result.coords)]
+            if tgc_orig:
+                parts[0]=self._fourify(parts[0],tgc_orig)
         elif isinstance(result,MultiLineString):
-            resultGeoms=result.geoms
-            rids.append(self.editFeature(id=targetShape['id'],geometry={'coordinates':list(resultGeoms[0].coords)}))
-            if rids==[]:
-                logging.warning('crop: target shape not found; operation aborted.')
-                return False
-            for r in [g for g in resultGeoms][1:]:
-                if tc=='Shape':
-                    title=tp['title']
-                    if useResultNameSuffix:
-                        title=title+':'+str(suffix)
-                    rids.append(self.addLine(list(r.coords),
-                        title=title,
-                        color=tp.get('stroke',None),
-                        opacity=tp.get('stroke-opacity',None),
-                        width=tp.get('stroke-width',None),
-                        pattern=tp.get('pattern',None),
-                        description=tp.get('description',None),
-                        folderId=tfid))
-                elif tc=='Assignment':
-                    letter=tp['letter']
-                    if useResultNameSuffix:
-                        letter=letter+':'+str(suffix)
-                    rids.append(self.addLineAssignment(list(r.coords),
-                        number=tp['number'],
-                        letter=letter,
-                        opId=tp.get('operationalPeriodId',''),
-                        folderId=tp.get('folderId',None), # empty string will create an unnamed folder!
-                        resourceType=tp.get('resourceType',''),
-                        teamSize=tp.get('teamSize',0),
-                        priority=tp.get('priority',''),
-                        responsivePOD=tp.get('responsivePOD',''),
-                        unresponsivePOD=tp.get('unresponsivePOD',''),
-                        cluePOD=tp.get('cluePOD',''),
-                        description=tp.get('description',''),
-                        previousEfforts=tp.get('previousEfforts',''),
-                        transportation=tp.get('transportation',''),
-                        timeAllocated=tp.get('timeAllocated',0),
-                        primaryFrequency=tp.get('primaryFrequency',''),
-                        secondaryFrequency=tp.get('secondaryFrequency',''),
-                        preparedBy=tp.get('preparedBy',''),
-                        status=tp.get('status','')))
-                else:
-                    logging.warning('crop: target feature class was neither Shape nor Assigment')
-                    return False
+            parts=[list(g.coords) for g in result.geoms]
+        else:
+            logging.error(op+': unexpected result type '+str(result.__class__.__name__)+'; operation aborted.')
+            return False
+        if len(parts)>1 and tc not in ['Shape','Assignment']:
+            logging.warning(op+': target feature class was neither Shape nor Assigment; operation aborted.')
+            return False
 
-        if deleteBoundary:
-            self.delFeature(boundaryShape['id'],fClass=boundaryShape['properties']['class'])
+        plan['edits'].append({'id':targetShape['id'],'class':tc,'title':tp.get('title'),
+                'geometry':{'coordinates':[parts[0]] if isPolygon else parts[0]}})
+
+        # allocate suffixes once, for all of the new features
+        name=tp['letter'] if tc=='Assignment' else tp['title']
+        if len(parts)>1 and useResultNameSuffix:
+            # use the unsuffixed name as the base, so that a cut of a:2 would produce a:3 rather than a:2:1
+            base=self._getSuffixBase(tp)
+            if usedSuffixes is None:
+                usedSuffixes={}
+            if base not in usedSuffixes:
+                usedSuffixes[base]=self._getUsedSuffixList(base)
+            usedSuffixList=usedSuffixes[base]
+        for part in parts[1:]:
+            partName=name
+            if useResultNameSuffix:
+                suffix=self._getNextAvailableSuffix(usedSuffixList)
+                usedSuffixList.append(suffix)
+                partName=(base if isPolygon else name)+':'+str(suffix)
+            plan['creates'].append(self._planPart(tp,part,isPolygon,partName))
+        return True
 
-        return rids # resulting feature IDs
+    def _planPart(self,tp: dict,points: list,isPolygon: bool,name: str) -> dict:
+        """Internal method to plan a new feature for one additional part of the result of a cut or crop, with the target's properties.
+
+        :param tp: Target feature properties
+        :type tp: dict
+        :param points: List of points of the new line, or of the outer ring of the new polygon
+        :type points: list
+        :param isPolygon: True for a polygon; False for a line
+        :type isPolygon: bool
+        :param name: Title of the new feature, or letter, for assignments
+        :type name: str
+        :return: Planned new feature; see .commitPlan
+        :rtype: dict
+        """
+        tfid=tp.get('folderId',None)
+        if tp['class']=='Shape':
+            if isPolygon:
+                return {'method':'addPolygon','title':name,'args':{
+                    'points':points,
+                    'title':name,
+                    'stroke':tp.get('stroke',None),
+                    'fill':tp.get('fill',None),
+                    'strokeOpacity':tp.get('stroke-opacity',None),
+                    'strokeWidth':tp.get('stroke-width',None),
+                    'fillOpacity':tp.get('fill-opacity',None),
+                    'description':tp.get('description',None),
+                    'folderId':tfid}}
+            return {'method':'addLine','title':name,'args':{
+                'points':points,
+                'title':name,
+                'color':tp.get('stroke',None),
+                'opacity':tp.get('stroke-opacity',None),
+                'width':tp.get('stroke-width',None),
+                'pattern':tp.get('pattern',None),
+                'description':tp.get('description',None),
+                'folderId':tfid}}
+        return {'method':'addAreaAssignment' if isPolygon else 'addLineAssignment','title':name,'args':{
+            'points':points,
+            'number':tp['number'],
+            'letter':name,
+            'opId':tp.get('operationalPeriodId',''),
+            'folderId':tfid, # empty string will create an unnamed folder!
+            'resourceType':tp.get('resourceType',''),
+            'teamSize':tp.get('teamSize',0),
+            'priority':tp.get('priority',''),
+            'responsivePOD':tp.get('responsivePOD',''),
+            'unresponsivePOD':tp.get('unresponsivePOD',''),
+            'cluePOD':tp.get('cluePOD',''),
+            'description':tp.get('description',''),
+            'previousEfforts':tp.get('previousEfforts',''),
+            'transportation':tp.get('transportation',''),
+            'timeAllocated':tp.get('timeAllocated',0),
+            'primaryFrequency':tp.get('primaryFrequency',''),
+            'secondaryFrequency':tp.get('secondaryFrequency',''),
+            'preparedBy':tp.get('preparedBy',''),
+            'status':tp.get('status','')}}
+
+    def _getSuffixBase(self,tp: dict) -> str:
+        """Internal method to get the base name used for suffixed result titles, i.e. the title (or letter, for assignments)
+        without any colon-followed-by-integer suffix, so that a cut of a:2 would produce a:3 rather than a:2:1.
+
+        :param tp: Feature properties
+        :type tp: dict
+        :return: Base name
+        :rtype: str
+        """
+        if tp['class']=='Assignment':
+            base=tp['letter']
+        else:
+            base=tp['title']
+        # accomodate base names that include colon
+        baseParse=base.split(':')
+        if len(baseParse)>1 and baseParse[-1].isnumeric():
+            base=':'.join(baseParse[:-1])
+        return base
 
         
 def insertBeforeExt(fn,ins): 
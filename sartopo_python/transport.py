@@ -0,0 +1,140 @@
+# #############################################################################
+#
+#  transport.py - HTTP transports used by SartopoSession
+#
+#   developed for Nevada County Sheriff's Search and Rescue
+#
+#   SartopoSession builds (and, for caltopo.com / sartopo.com, signs) each
+#    request, then hands it to a transport object to be sent, then interprets
+#    the response.  The transport only moves bytes: it knows nothing about
+#    maps, features, or signatures.  This allows alternative HTTP clients to
+#    be plugged in without touching any feature logic, e.g. an HTTP/2-capable
+#    client, a unix-socket client for a co-located CalTopo Desktop, or an
+#    in-memory fake (see fake_server.py).
+#
+#  www.github.com/ncssar/sartopo_python
+#
+############################################################
+#
+#  A transport is any object with these methods:
+#
+#   request(method,url,params=None,data=None,timeout=None,proxies=None,allowRedirects=True)
+#     - method: 'GET', 'POST', or 'DELETE'
+#     - params: dict to send in the URL query string
+#     - data: dict to send as a form-encoded request body
+#     - returns a response object with .status_code, .text, .headers, .elapsed
+#        (datetime.timedelta), and .json(); requests.Response qualifies, and
+#        TransportResponse is provided for transports that don't use requests
+#
+#   reset() - discard any connection state (cookies, pooled connections)
+#
+#   close() - release all resources
+#
+#  Subclassing Transport provides reset and close.
+#
+#-----------------------------------------------------------------------------
+
+import json
+import datetime
+import requests
+
+
+class TransportResponse():
+    """Minimal response object, for transports that don't return a requests.Response.
+
+    :param status_code: HTTP status code
+    :type status_code: int
+    :param text: Response body text
+    :type text: str
+    :param headers: Response headers; defaults to None
+    :type headers: dict, optional
+    :param elapsed: Response time in seconds; defaults to 0
+    :type elapsed: float, optional
+    """
+    def __init__(self,status_code: int,text: str,headers: dict=None,elapsed: float=0):
+        self.status_code=status_code
+        self.text=text
+        self.headers=headers or {}
+        self.elapsed=datetime.timedelta(seconds=elapsed)
+
+    def json(self):
+        return json.loads(self.text)
+
+    def __repr__(self):
+        return '<TransportResponse ['+str(self.status_code)+']>'
+
+
+class Transport():
+    """Base class for SartopoSession transports; see the module header.
+    """
+    def request(self,method: str,url: str,params: dict=None,data: dict=None,timeout: float=None,proxies: dict=None,allowRedirects: bool=True):
+        raise NotImplementedError
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class RequestsTransport(Transport):
+    """Default transport, using a requests session.\n
+    Connections are kept alive and pooled per host, so that successive requests (and concurrent requests
+    from the session's thread pool) reuse connections rather than opening a new one each time.
+
+    :param poolMaxsize: Maximum number of pooled connections per host; should be at least the number of threads
+        that send requests concurrently; defaults to 10
+    :type poolMaxsize: int, optional
+    :param session: requests session to use, as is; defaults to None, which creates a new session with pooled connections
+    :type session: requests.Session, optional
+    """
+    def __init__(self,poolMaxsize: int=10,session: requests.Session=None):
+        self.poolMaxsize=poolMaxsize
+        self.session=session or self._newSession()
+
+    def _newSession(self) -> requests.Session:
+        s=requests.session()
+        for prefix in ['http://','https://']:
+            s.mount(prefix,requests.adapters.HTTPAdapter(pool_connections=4,pool_maxsize=self.poolMaxsize))
+        return s
+
+    def request(self,method: str,url: str,params: dict=None,data: dict=None,timeout: float=None,proxies: dict=None,allowRedirects: bool=True):
+        return self.session.request(method,url,params=params,data=data,timeout=timeout,proxies=proxies,allow_redirects=allowRedirects)
+
+    def reset(self):
+        """Start a new requests session, to get new session cookies.
+        Adapters mounted on the old session (e.g. by FakeCalTopoServer.mount) are not carried over.
+        """
+        self.session.close()
+        self.session=self._newSession()
+
+    def close(self):
+        self.session.close()
+
+
+class RecordingTransport(Transport):
+    """Transport that passes every request to another transport, and records each request/response pair
+    with a capture.CaptureWriter.  Used by SartopoSession when captureFile is specified.
+
+    :param transport: The transport that actually sends the requests
+    :param writer: capture.CaptureWriter object
+    """
+    def __init__(self,transport,writer):
+        self.transport=transport
+        self.writer=writer
+
+    def request(self,method: str,url: str,params: dict=None,data: dict=None,timeout: float=None,proxies: dict=None,allowRedirects: bool=True):
+        r=self.transport.request(method,url,params=params,data=data,timeout=timeout,proxies=proxies,allowRedirects=allowRedirects)
+        self.writer.record(method,url,data or params,r)
+        return r
+
+    def reset(self):
+        self.transport.reset()
+
+    def close(self):
+        self.writer.close()
+        self.transport.close()
+
+    def __getattr__(self,name):
+        # e.g. .session of a wrapped RequestsTransport
+        return getattr(self.transport,name)
@@ -18,6 +18,7 @@ setuptools.setup(
     download_url="https://github.com/ncssar/sartopo_python/archive/2.0.0.tar.gz",
     install_requires=[
         'Shapely>=2.0.2',
+        'numpy',
         'requests'
     ],
     classifiers=[
@@ -0,0 +1,888 @@
+# tests for sartopo_python, run against the in-process fake CalTopo server
+#  (see sartopo_python/fake_server.py), so that no network or live map is needed:
+#
+#     python -m pytest -q tests
+#
+#  The optimized code paths (feature index, vectorized point-list helpers, indexed
+#   _fourify, parallel plan commit) are checked against the plain code paths that
+#   they replace; everything else is checked for its behavior on the fake server.
+
+import base64
+import copy
+import gzip
+import logging
+import math
+import random
+import threading
+import time
+
+import pytest
+import requests
+import shapely
+
+from sartopo_python import SartopoSession
+import sartopo_python.sartopo_python as sartopoModule
+from sartopo_python.capture import ReplayAdapter,readCapture,replaySync
+from sartopo_python.fake_server import FakeCalTopoServer
+
+logging.disable(logging.CRITICAL)
+
+def newSession(srv,mapID,**kwargs):
+    return SartopoSession('localhost:8080',mapID,sync=False,transport=srv.transport(),**kwargs)
+
+def serverState(srv,mapID):
+    """Features on the fake server, without IDs, so that maps edited by different sessions can be compared."""
+    rval=[]
+    for f in srv.getMapFeatures(mapID):
+        p=f['properties']
+        c=f['geometry']['coordinates']
+        c=[[q[:2] for q in r] if isinstance(r[0],list) else r[:2] for r in c]
+        rval.append((p['class'],str(p.get('title')),str(p.get('letter')),repr(c)))
+    return sorted(rval)
+
+def run(f,*args,**kwargs):
+    """Return value or exception type of a call, so that the two code paths can be compared even for invalid input."""
+    try:
+        return ('ok',f(*args,**kwargs))
+    except Exception as e:
+        return ('err',type(e).__name__)
+
+#-----------------------------------------------------------------------------
+# feature lookups: index vs. scan
+#-----------------------------------------------------------------------------
+
+def test_getFeatures_index_matches_scan():
+    r=random.Random(5)
+    srv=FakeCalTopoServer(seed=1)
+    m=srv.addMap()
+    titles=['A','a','A ','AB 101','ab 102','Ab','Track','track ','M1','m1',' x','','Q 7','q']
+    classes=['Marker','Shape','Assignment','Folder','OperationalPeriod']
+    for i in range(300):
+        c=r.choice(classes)
+        p={'class':c,'title':r.choice(titles)}
+        if c=='Assignment':
+            p['letter']=r.choice(['A','AB','Q','q','AB ',''])
+            p['number']=r.choice(['','101'])
+        srv.addFeature(m,{'properties':p,'geometry':{'type':'Point','coordinates':[-120,39]}})
+    sts=newSession(srv,m)
+    ids=[f['id'] for f in sts.mapData['state']['features']]
+    for caseSensitive in [False,True]:
+        sts.caseSensitiveComparisons=caseSensitive
+        for trial in range(1000):
+            featureClass=r.choice([None,'Marker','Assignment','Shape','marker'])
+            title=r.choice([None,'A','a','AB','ab','A ','Track','TRACK','Q','q','x',''])
+            id=r.choice([None]*5+[r.choice(ids),'nope'])
+            exclude=r.choice([[],['Folder'],['Assignment','Shape']])
+            letterOnly=r.random()<0.3
+            if featureClass is None and title is None and id is None:
+                continue
+            with sts.cacheLock:
+                index=sts._getFeatureIndex()
+                a=sts._lookupFeatures(index,featureClass,title,id,exclude,letterOnly,None)
+            b=sts._scanFeatures(featureClass,title,id,exclude,letterOnly)
+            assert [x['id'] for x in a[0]]==[x['id'] for x in b[0]]
+            assert a[1]==b[1]
+
+def test_getFeatures_folderId():
+    srv=FakeCalTopoServer(seed=1)
+    m=srv.addMap()
+    for (c,t,folder) in [('Marker','a','F1'),('Marker','b','F2'),('Shape','a','F1'),('Marker','c',None),('Marker','d','F1')]:
+        p={'class':c,'title':t}
+        if folder:
+            p['folderId']=folder
+        srv.addFeature(m,{'properties':p,'geometry':{'type':'Point','coordinates':[-120,39]}})
+    sts=newSession(srv,m)
+    titles=lambda fs:sorted((f['properties']['class'],f['properties']['title']) for f in fs)
+    assert titles(sts.getFeatures(folderId='F1'))==[('Marker','a'),('Marker','d'),('Shape','a')]
+    assert titles(sts.getFeatures(folderId='F1',featureClass='Marker'))==[('Marker','a'),('Marker','d')]
+    assert titles(sts.getFeatures(folderId='F1',featureClassExcludeList=['Shape']))==[('Marker','a'),('Marker','d')]
+    assert titles(sts.getFeatures(folderId='F1',title='a',allowMultiTitleMatch=True))==[('Marker','a'),('Shape','a')]
+    assert sts.getFeatures(folderId='F2',title='a')==[]
+    assert sts.getFeatures(folderId='nope')==[]
+    # the folder index follows edits
+    b=sts.getFeatures(title='b')[0]
+    sts.editFeature(id=b['id'],className='Marker',properties={'folderId':'F1'})
+    assert titles(sts.getFeatures(folderId='F1',featureClass='Marker'))==[('Marker','a'),('Marker','b'),('Marker','d')]
+    assert sts.getFeatures(folderId='F2')==[]
+
+def test_sync_callbacks_run_after_whole_response_is_merged():
+    srv=FakeCalTopoServer(seed=1)
+    m=srv.addMap()
+    srv.addFeature(m,{'properties':{'class':'Marker','title':'old'},'geometry':{'type':'Point','coordinates':[-120,39]}})
+    seen=[]
+    def newFeature(f):
+        seen.append((f['properties']['title'],sorted(x['properties']['title'] for x in sts.getFeatures('Marker'))))
+    sts=newSession(srv,m)
+    sts.newFeatureCallback=newFeature
+    for t in ['new1','new2']:
+        srv.addFeature(m,{'properties':{'class':'Marker','title':t},'geometry':{'type':'Point','coordinates':[-120,39]}})
+    sts._refresh(forceImmediate=True)
+    assert seen==[('new1',['new1','new2','old']),('new2',['new1','new2','old'])]
+
+#-----------------------------------------------------------------------------
+# point-list helpers: vectorized / indexed vs. loop
+#-----------------------------------------------------------------------------
+
+@pytest.fixture
+def bareSession():
+    sts=SartopoSession.__new__(SartopoSession)
+    sts.mapID=None
+    sts.sync=False
+    sts.geometryLogging=False
+    return sts
+
+def test_validatePoints_vectorized_matches_loop(bareSession):
+    r=random.Random(3)
+    def point():
+        p=[r.choice([r.uniform(-180,180),r.uniform(-90,90),r.randint(-200,200),float('nan'),95,180,-180.0]),
+            r.choice([r.uniform(-90,90),r.uniform(-180,180),r.randint(-100,100),90,-91])]
+        if r.random()<0.5:
+            p+=[0,r.randint(0,10**13)]
+        if r.random()<0.02:
+            p=tuple(p)
+        if r.random()<0.01:
+            p=[str(p[0]),p[1]]
+        return p
+    def geom():
+        level=r.choice([1,2,3])
+        if level==1:
+            return point()
+        if level==2:
+            return [point() for i in range(r.randint(1,8))]
+        return [[point() for i in range(r.randint(1,8))] for j in range(r.randint(1,3))]
+    for i in range(3000):
+        g=geom()
+        modify=r.random()<0.7
+        a=run(bareSession._validatePoints,copy.deepcopy(g),modify=modify,vectorize=True)
+        b=run(bareSession._validatePoints,copy.deepcopy(g),modify=modify,vectorize=False)
+        assert repr(a)==repr(b)
+
+@pytest.mark.parametrize('name',['_removeSpurs','_removeDuplicatePoints'])
+def test_pointList_vectorized_matches_loop(bareSession,name):
+    # geometryLogging='detail' logs every point, so it always uses the loop
+    r=random.Random(11)
+    def points():
+        base=[[r.choice([0,1,2]),r.choice([0,1])] for i in range(5)]
+        out=[]
+        for i in range(r.randint(1,12)):
+            p=list(r.choice(base))
+            if r.random()<0.3:
+                p=[p[0]+r.choice([0,0.0001,0.001]),p[1]+0.0]
+            if r.random()<0.3:
+                p+=[0,r.randint(0,9)]
+            out.append(p)
+        k=r.random()
+        if k<0.03:
+            out[0]=tuple(out[0])
+        elif k<0.05:
+            out[-1]=[float('nan'),1]
+        elif k<0.07:
+            out=[tuple(p) for p in out]
+        return out
+    for i in range(5000):
+        p=points()
+        bareSession.geometryLogging=False
+        a=run(getattr(bareSession,name),copy.deepcopy(p))
+        bareSession.geometryLogging='detail'
+        b=run(getattr(bareSession,name),copy.deepcopy(p))
+        assert repr(a)==repr(b)
+
+def test_removeSpurs_known_answer(bareSession):
+    a,b,c,d,e,f=[[i,0] for i in range(6)]
+    assert bareSession._removeSpurs([a,b,c,d,c,e,f])==[a,b,c,e,f]
+
+def test_fourify_indexed_matches_scan(bareSession):
+    r=random.Random(5)
+    for i in range(5000):
+        orig=[[r.choice([0,1,2,3]),r.choice([0,1.0]),0,r.randint(0,99)] for j in range(r.randint(1,10))]
+        points=[list(p[0:2]) if r.random()<0.8 else [r.choice([0,5]),r.choice([0,1])] for p in (r.choice(orig) for j in range(r.randint(1,10)))]
+        if r.random()<0.1:
+            points=[tuple(p) for p in points]
+        a=run(bareSession._fourify,copy.deepcopy(points),copy.deepcopy(orig),indexed=True)
+        b=run(bareSession._fourify,copy.deepcopy(points),copy.deepcopy(orig),indexed=False)
+        assert repr(a)==repr(b)
+
+#-----------------------------------------------------------------------------
+# geometry operations: parallel commit vs. sequential commit
+#-----------------------------------------------------------------------------
+
+def comb(x0,y0,n,w=0.01,h=0.05):
+    """Polygon with n teeth pointing north."""
+    points=[[x0,y0]]
+    for i in range(n):
+        points+=[[x0+i*2*w,y0+h],[x0+i*2*w+w,y0+h],[x0+i*2*w+w,y0+0.01]]
+    return points+[[x0+(2*n-1)*w,y0],[x0,y0]]
+
+def geometryMap():
+    srv=FakeCalTopoServer(seed=1)
+    m=srv.addMap()
+    def add(properties,geomType,coords):
+        srv.addFeature(m,{'properties':properties,'geometry':{'type':geomType,'coordinates':coords}})
+    add({'class':'Shape','title':'comb'},'Polygon',[comb(-121,39,4)])
+    add({'class':'Assignment','title':'AA 5','letter':'AA','number':'5'},'Polygon',[comb(-121,39.1,3)])
+    add({'class':'Shape','title':'bar'},'Polygon',[[[-121.01,38.99],[-120,38.99],[-120,39.015],[-121.01,39.015],[-121.01,38.99]]])
+    add({'class':'Shape','title':'bar2'},'Polygon',[[[-121.01,39.09],[-120,39.09],[-120,39.115],[-121.01,39.115],[-121.01,39.09]]])
+    add({'class':'Shape','title':'knife'},'LineString',[[-121.05,39.03],[-120,39.03]])
+    add({'class':'Shape','title':'zig'},'LineString',[[-121.0+0.005*i,39.0+(0.06 if i%2 else 0)] for i in range(10)])
+    add({'class':'Shape','title':'blob'},'Polygon',[[[-121.0,39.04],[-120.5,39.04],[-120.5,39.2],[-121.0,39.2],[-121.0,39.04]]])
+    add({'class':'Shape','title':'far'},'Polygon',[[[-110,30],[-110,30.1],[-109.9,30],[-110,30]]])
+    return (srv,m)
+
+# (operation, target, other, kwargs, number of resulting features or False)
+GEOMETRY_OPERATIONS=[
+    ('cut','comb','bar',{},4),
+    ('cut','comb','bar',{'deleteCutter':False,'useResultNameSuffix':False},4),
+    ('cut','comb','knife',{},5),
+    ('cut','AA 5','bar2',{},3),
+    ('cut','zig','bar',{},5),
+    ('cut','comb','far',{},False),
+    ('expand','comb','blob',{},True),
+    ('expand','comb','blob',{'deleteP2':False},True),
+    ('crop','comb','bar',{},1),
+    ('crop','comb','bar',{'useResultNameSuffix':True,'deleteBoundary':True},1),
+    ('crop','zig','blob',{'drawSizedBoundary':True},5),
+    ('crop','comb','far',{'drawSizedBoundary':True},False),
+]
+
+@pytest.mark.parametrize('operation,target,other,kwargs,expected',GEOMETRY_OPERATIONS)
+def test_geometry_operation_parallel_matches_sequential(operation,target,other,kwargs,expected):
+    states=[]
+    for parallel in [False,True]:
+        (srv,m)=geometryMap()
+        sts=newSession(srv,m)
+        r=getattr(sts,operation)(target,other,parallel=parallel,**kwargs)
+        if isinstance(expected,bool):
+            assert bool(r)==expected
+        else:
+            assert len(r)==expected and all(r)
+        states.append(serverState(srv,m))
+    assert states[0]==states[1]
+
+def test_cut_results():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    before=serverState(srv,m)
+    plan=sts.planCut('comb','bar')
+    assert serverState(srv,m)==before # planning sends nothing
+    assert len(plan['edits'])==1 and len(plan['creates'])==3
+    sts.commitPlan(plan)
+    titles=sorted(f['properties']['title'] for f in srv.getMapFeatures(m))
+    assert titles==['AA 5','bar2','blob','comb','comb:1','comb:2','comb:3','far','knife','zig']
+
+def test_crop_sized_boundary_not_returned():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    rids=sts.crop('zig','blob',drawSizedBoundary=True)
+    sized=[f['id'] for f in srv.getMapFeatures(m) if f['properties']['title']=='sizedCropBoundary']
+    assert len(sized)==1 and sized[0] not in rids
+
+def test_crop_noDraw_multiline():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    before=serverState(srv,m)
+    segments=sts.crop('zig','bar',noDraw=True)
+    assert serverState(srv,m)==before
+    assert len(segments)==5 # the zigzag crosses out of the bar between each pair of its vertices
+    for segment in segments:
+        assert all(isinstance(p,list) and 38.99<=p[1]<=39.015+0.0001 for p in segment)
+
+def test_cutMany_matches_cut():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    sts.cut('comb','bar')
+    sts.cut('AA 5','bar2')
+    expected=serverState(srv,m)
+    for parallel in [False,True]:
+        (srv,m)=geometryMap()
+        sts=newSession(srv,m)
+        ids={t:sts.getFeatures(title=t)[0]['id'] for t in ['comb','AA 5','far']}
+        r=sts.cutMany(['comb','AA 5','far','nope'],['bar','bar2'],parallel=parallel)
+        assert sorted(r.keys())==sorted(ids.values())
+        assert len(r[ids['comb']])==4 and len(r[ids['AA 5']])==3 and r[ids['far']] is False
+        assert serverState(srv,m)==expected
+
+def test_cutMany_line_cutter_keeps_cutters():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    sts.cut('comb','knife',deleteCutter=False)
+    sts.cut('zig','knife',deleteCutter=False)
+    expected=serverState(srv,m)
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    r=sts.cutMany(['comb','zig'],['knife'],deleteCutters=False)
+    assert [len(v) for v in r.values()]==[5,10] # zig crosses knife 9 times
+    assert serverState(srv,m)==expected
+    assert sts.cutMany(['comb'],['nope']) is False
+    assert sts.cutMany(['comb'],[]) is False
+
+def test_cropMany_matches_crop():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    for target in ['comb','zig']:
+        sts.crop(target,'bar',useResultNameSuffix=True)
+    sts.delFeature(sts.getFeatures(title='bar')[0]['id'],fClass='Shape')
+    expected=serverState(srv,m)
+    for parallel in [False,True]:
+        (srv,m)=geometryMap()
+        sts=newSession(srv,m)
+        ids={t:sts.getFeatures(title=t)[0]['id'] for t in ['comb','zig','far','AA 5']}
+        r=sts.cropMany(['comb','zig','far','AA 5','nope'],'bar',useResultNameSuffix=True,deleteBoundary=True,parallel=parallel)
+        assert sorted(r.keys())==sorted(ids.values()) # targets that are not found are left out
+        assert len(r[ids['comb']])==1 and len(r[ids['zig']])==5
+        assert r[ids['far']] is False and r[ids['AA 5']] is False
+        assert serverState(srv,m)==expected
+        titles=sorted(f['properties']['title'] for f in srv.getMapFeatures(m))
+        assert titles.count('zig')==1 and len(set(t for t in titles if t.startswith('zig:')))==4
+
+def test_cropMany_noDraw():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    before=serverState(srv,m)
+    r=sts.cropMany(['comb','zig'],'bar',noDraw=True)
+    assert serverState(srv,m)==before
+    assert list(r.values())==[sts.crop('comb','bar',noDraw=True),sts.crop('zig','bar',noDraw=True)]
+    assert sts.cropMany(['comb'],'nope') is False
+
+@pytest.fixture(params=['pyproj','equirectangular'])
+def projection(request,monkeypatch):
+    if request.param=='equirectangular':
+        monkeypatch.setattr(sartopoModule,'pyproj',None)
+    return request.param
+
+def test_crop_beyondMeters(projection):
+    (srv,m)=geometryMap()
+    srv.addFeature(m,{'properties':{'class':'Shape','title':'ew'},'geometry':{'type':'LineString','coordinates':[[-121.05,39.0],[-119.9,39.0]]}})
+    sts=newSession(srv,m)
+    metersPerDegreeLat=111195
+    metersPerDegreeLon=metersPerDegreeLat*math.cos(math.radians(39))
+    # the boundary is oversized by the same distance east-west and north-south (to within 1%)
+    [segment]=sts.crop('ew','bar',noDraw=True,beyondMeters=500)
+    xs=[p[0] for p in segment]
+    assert abs((-121.01-min(xs))*metersPerDegreeLon-500)<5
+    assert abs((max(xs)+120)*metersPerDegreeLon-500)<5
+    segments=sts.crop('zig','bar',noDraw=True,beyondMeters=500)
+    assert abs((max(p[1] for s in segments for p in s)-39.015)*metersPerDegreeLat-500)<5
+    # same result when drawn, and from cropMany
+    ew=sts.getFeature(title='ew')['id']
+    sts.crop('ew','bar',beyondMeters=500)
+    assert [p[0:2] for p in serverFeature(srv,m,ew)['geometry']['coordinates']]==[p[0:2] for p in segment]
+    assert sts.cropMany(['zig'],'bar',noDraw=True,beyondMeters=500)=={sts.getFeature(title='zig')['id']:segments}
+
+def test_local_projection_uses_only_the_bounds(projection):
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    sts.getMapExtent=None # fails if called
+    srv.resetStats()
+    p1=sts._getLocalProjection((-121.0,39.0,-120.9,39.1))
+    assert (p1.lon0,p1.lat0)==(-121.0,39.0) # snapped to the grid
+    assert sts._getLocalProjection((-120.6,39.2,-120.5,39.3)) is p1 # nearby geometries share a projection
+    p2=sts._getLocalProjection((-110,30.1,-109.9,30.2))
+    assert p2 is not p1 and (p2.lon0,p2.lat0)==(-110.0,30.0)
+    p3=sts._getLocalProjection((-100.1,30,-97,31)) # too large for any grid point
+    assert (p3.lon0,p3.lat0)==(-98.55,30.5)
+    assert sum(srv.requestCounts.values())==0
+
+def test_getMeasurements(projection):
+    srv=FakeCalTopoServer(seed=1)
+    m=srv.addMap()
+    def add(title,geomType,coords):
+        return srv.addFeature(m,{'properties':{'class':'Shape','title':title},'geometry':{'type':geomType,'coordinates':coords}})['id']
+    square=add('square','Polygon',[[[0,0],[1,0],[1,1],[0,1],[0,0]],[[0.25,0.25],[0.75,0.25],[0.75,0.75],[0.25,0.75]]])
+    line=add('line','LineString',[[-120,39,1500,1000000],[-120,39.05,1500,1060000],[-120,39.1,1500,1120000]])
+    point=srv.addFeature(m,{'properties':{'class':'Marker','title':'p'},'geometry':{'type':'Point','coordinates':[-120,39]}})['id']
+    sts=newSession(srv,m)
+    ms=sts.getMeasurements()
+    # WGS84 geodesic area of the 1 degree square minus the hole, with or without pyproj
+    assert abs(ms[square]['area']-(12308778361.47-3077164136.65))<1e-4*ms[square]['area']
+    assert ms[square]['points']==9
+    ml=ms[line]
+    assert abs(ml['length']-11101.64)<(0.001 if projection=='pyproj' else 0.005)*11101.64
+    assert (ml['area'],ml['points'],ml['startTime'],ml['endTime'],ml['duration'])==(0,3,1000000,1120000,120)
+    assert ms[point]['length']==0 and ms[point]['duration'] is None
+    assert sts.getMeasurements(featureClass='Marker')=={point:ms[point]}
+    assert sts.getMeasurements([line])=={line:ml}
+    # measurements are kept until the geometry changes, locally or by sync
+    assert set(sts.measurementCache)=={square,line,point}
+    sts.editFeature(id=line,geometry={'coordinates':[[-120,39,1500,1000000],[-120,39.2,1500,1300000]]})
+    assert line not in sts.measurementCache
+    assert sts.getMeasurements([line])[line]['duration']==300
+    srv.editFeature(m,square,'Shape',geometry={'type':'Polygon','coordinates':[[[0,0],[1,0],[1,1],[0,1],[0,0]]]})
+    sts._refresh(forceImmediate=True)
+    assert abs(sts.getMeasurements([square])[square]['area']-12308778361.47)<1e-4*12308778361.47
+
+#-----------------------------------------------------------------------------
+# spatial queries
+#-----------------------------------------------------------------------------
+
+def titlesOf(features):
+    return [f['properties']['title'] for f in features]
+
+def test_spatial_queries():
+    (srv,m)=geometryMap()
+    srv.addFeature(m,{'properties':{'class':'Marker','title':'m1'},'geometry':{'type':'Point','coordinates':[-120.98,39.005]}})
+    srv.addFeature(m,{'properties':{'class':'Marker','title':'m2'},'geometry':{'type':'Point','coordinates':[-120.6,39.15]}})
+    sts=newSession(srv,m)
+    bounds=[-121.02,38.98,-120.9,39.02]
+    assert sorted(titlesOf(sts.getFeaturesInBounds(bounds)))==['bar','comb','m1','zig']
+    assert titlesOf(sts.getFeaturesInBounds(bounds,featureClass='Marker'))==['m1']
+    assert sorted(titlesOf(sts.getFeaturesInBounds(bounds,featureClassExcludeList=['Shape'])))==['m1']
+    # nearest first; the point is inside bar, and knife is 0.03 degrees north
+    assert titlesOf(sts.getFeaturesNear([-120.4,39.0],0.05))==['bar','knife']
+    assert titlesOf(sts.getFeaturesNear([-120.4,39.0],0.01))==['bar']
+    assert titlesOf(sts.getFeaturesContaining([-120.7,39.1]))==['bar2','blob']
+    assert titlesOf(sts.getFeaturesContaining([-120.7,39.1],featureClass='Marker'))==[]
+    assert titlesOf(sts.getFeaturesContaining([-110,35]))==[]
+
+def test_spatial_index_follows_changes():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    assert titlesOf(sts.getFeaturesContaining([-120.7,39.1]))==['bar2','blob']
+    # edit from this session
+    blob=sts.getFeatures(title='blob')[0]
+    sts.editFeature(id=blob['id'],geometry={'type':'Polygon','coordinates':[[[-110,35],[-109,35],[-109,36],[-110,35]]]})
+    assert titlesOf(sts.getFeaturesContaining([-120.7,39.1]))==['bar2']
+    assert titlesOf(sts.getFeaturesContaining([-109.1,35.5]))==['blob']
+    # add, edit and delete from another client, picked up by sync
+    srv.addFeature(m,{'properties':{'class':'Marker','title':'m1'},'geometry':{'type':'Point','coordinates':[-120.7,39.1]}})
+    bar2=[f for f in srv.getMapFeatures(m) if f['properties']['title']=='bar2'][0]
+    srv.deleteFeature(m,bar2['id'],'Shape')
+    sts._refresh(forceImmediate=True)
+    assert titlesOf(sts.getFeaturesNear([-120.7,39.1],0.001))==['m1']
+    m1=[f for f in srv.getMapFeatures(m) if f['properties']['title']=='m1'][0]
+    srv.editFeature(m,m1['id'],'Marker',geometry={'type':'Point','coordinates':[-100,40]})
+    sts._refresh(forceImmediate=True)
+    assert titlesOf(sts.getFeaturesNear([-120.7,39.1],0.001))==[]
+    assert titlesOf(sts.getFeaturesInBounds([-101,39,-99,41]))==['m1']
+
+def test_getMapExtent():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m)
+    titles=[f['properties']['title'] for f in sts.mapData['state']['features']]
+    assert sts.getMapExtent()==sts.getBounds(titles)
+    assert sts.getMapExtent(padDeg=0)==[-121.05,30,-109.9,39.2]
+    assert sts.getMapExtent(classes=['Assignment'],padPct=10)==sts.getBounds(['AA 5'],padPct=10)
+    assert sts.getMapExtent(classes=['Marker']) is None
+    # cached bounds are dropped when a geometry changes, locally or by sync
+    far=sts.getFeatures(title='far')[0]
+    sts.editFeature(id=far['id'],geometry={'type':'Polygon','coordinates':[[[-122,38],[-121.5,38],[-121.5,38.5],[-122,38]]]})
+    assert sts.getMapExtent(padDeg=0)==[-122,38,-120,39.2]
+    srv.editFeature(m,far['id'],'Shape',geometry={'type':'Polygon','coordinates':[[[-120,40],[-119,40],[-119,41],[-120,40]]]})
+    sts._refresh(forceImmediate=True)
+    assert sts.getMapExtent(padDeg=0)==[-121.05,38.99,-119,41]
+
+#-----------------------------------------------------------------------------
+# geometry size reduction
+#-----------------------------------------------------------------------------
+
+def noisyTrack(n,seed=1):
+    """GPS-like track: n points with elevation and time, about 1 meter apart, with about 1 meter of jitter."""
+    r=random.Random(seed)
+    return [[-120+i*0.00001+r.gauss(0,0.00001),39+i*0.000005+r.gauss(0,0.00001),1500.0,1000*i] for i in range(n)]
+
+def test_reduced_geometry_is_cached_as_sent():
+    srv=FakeCalTopoServer(seed=1)
+    m=srv.addMap()
+    sts=newSession(srv,m,simplifyTolerance=5,coordinatePrecision=6)
+    # new feature: the cache gets the feature returned by the server
+    lid=sts.addLine(noisyTrack(5000),title='track')
+    sent=serverFeature(srv,m,lid)['geometry']['coordinates']
+    assert 2<len(sent)<500
+    assert all(p[0]==round(p[0],6) and p[1]==round(p[1],6) and p[2]==1500.0 for p in sent)
+    assert sts.getFeature(id=lid)['geometry']['coordinates']==sent
+    stats=sts.getPayloadStats()
+    assert (stats['requests'],stats['verticesBefore'],stats['verticesAfter'])==(1,5000,len(sent))
+    assert 0.9<stats['byteReduction']<1
+    # edit: the geometry is reduced before it is merged into the cache, and only once
+    sts.editFeature(id=lid,geometry={'coordinates':noisyTrack(5000,seed=2)})
+    sent=serverFeature(srv,m,lid)['geometry']['coordinates']
+    assert 2<len(sent)<500
+    assert sts.getFeature(id=lid)['geometry']['coordinates']==sent
+    assert sts.getPayloadStats()['requests']==2
+    # buffered edit
+    sts.editFeature(id=lid,geometry={'coordinates':noisyTrack(5000,seed=3)},coalesce=True)
+    cached=sts.getFeature(id=lid)['geometry']['coordinates']
+    assert len(cached)<500
+    sts.flushEdits()
+    assert serverFeature(srv,m,lid)['geometry']['coordinates']==cached
+    assert sts.getPayloadStats()['requests']==3
+
+def test_reduced_geometry_operations_match_server():
+    (srv,m)=geometryMap()
+    sts=newSession(srv,m,coordinatePrecision=3)
+    sts.cut('comb','bar')
+    sts.crop('zig','blob')
+    for f in srv.getMapFeatures(m):
+        assert sts.getFeature(id=f['id'])['geometry']['coordinates']==f['geometry']['coordinates']
+    assert sts.getPayloadStats()['requests']>0
+
+def test_no_reduction_by_default():
+    srv=FakeCalTopoServer(seed=1)
+    m=srv.addMap()
+    sts=newSession(srv,m)
+    track=noisyTrack(100)
+    lid=sts.addLine(track)
+    assert serverFeature(srv,m,lid)['geometry']['coordinates']==track
+    assert sts.getPayloadStats()=={'requests':0,'verticesBefore':0,'verticesAfter':0,'bytesBefore':0,'bytesAfter':0,'byteReduction':0}
+
+def addMarkers(srv,m,markers):
+    return {t:srv.addFeature(m,{'properties':{'class':'Marker','title':t},'geometry':{'type':'Point','coordinates':c}})['id'] for (t,c) in markers.items()}
+
+def classification(sts):
+    """classifyPoints result, by title."""
+    title=lambda id: sts.getFeature(id=id)['properties']['title']
+    return {title(p):[title(q) for q in polygons] for (p,polygons) in sts.classifyPoints().items()}
+
+def test_classifyPoints():
+    (srv,m)=geometryMap()
+    addMarkers(srv,m,{'m1':[-120.98,39.005],'m2':[-120.7,39.1],'m3':[-110,35]})
+    sts=newSession(srv,m)
+    assert classification(sts)=={'m1':['comb','bar'],'m2':['bar2','blob'],'m3':[]}
+    for (p,polygons) in sts.classifyPoints().items():
+        assert polygons==[f['id'] for f in sts.getFeaturesContaining(sts.getFeature(id=p)['geometry']['coordinates'],featureClassExcludeList=['Marker'])]
+    assert sts.classifyPoints(polygonClasses=['Assignment'])=={id:[] for id in sts.classifyPoints()}
+
+def test_classifyPoints_incremental_update():
+    (srv,m)=geometryMap()
+    ids=addMarkers(srv,m,{'m1':[-120.98,39.005],'m2':[-120.7,39.1],'m3':[-110,35]})
+    sts=newSession(srv,m)
+    classification(sts)
+    [classifier]=sts.pointClassifiers.values()
+    collected=[]
+    collect=classifier._collect
+    def countingCollect(features,geomFunc):
+        collected.append(len(features))
+        return collect(features,geomFunc)
+    classifier._collect=countingCollect
+    def check(expected,changed):
+        collected.clear()
+        assert classification(sts)==expected
+        assert collected==[changed] # only the changed features were reclassified
+        assert classification(newSession(srv,m))==expected # same as classifying from scratch
+    # edits from this session
+    sts.editFeature(id=ids['m3'],geometry={'coordinates':[-120.6,39.15]})
+    check({'m1':['comb','bar'],'m2':['bar2','blob'],'m3':['blob']},1)
+    blob=sts.getFeature(title='blob')['id']
+    sts.editFeature(id=blob,geometry={'coordinates':[[[-120.65,39.14],[-120.55,39.14],[-120.55,39.16],[-120.65,39.14]]]})
+    check({'m1':['comb','bar'],'m2':['bar2'],'m3':['blob']},1)
+    # add, edit, and delete from another client, picked up by sync
+    ids.update(addMarkers(srv,m,{'m4':[-120.99,39.105]}))
+    srv.editFeature(m,ids['m1'],'Marker',geometry={'type':'Point','coordinates':[-120.5,39.1]})
+    srv.deleteFeature(m,sts.getFeature(title='bar2')['id'],'Shape')
+    sts._refresh(forceImmediate=True)
+    check({'m1':[],'m2':[],'m3':['blob'],'m4':['AA 5']},2)
+
+def rectangle(x0,y0,x1,y1):
+    return [[[x0,y0],[x1,y0],[x1,y1],[x0,y1],[x0,y0]]]
+
+def coverageMap():
+    srv=FakeCalTopoServer(seed=1)
+    m=srv.addMap()
+    op1=srv.addFeature(m,{'properties':{'class':'OperationalPeriod','title':'op1'}})['id']
+    op2=srv.addFeature(m,{'properties':{'class':'OperationalPeriod','title':'op2'}})['id']
+    folder=srv.addFeature(m,{'properties':{'class':'Folder','title':'north'}})['id']
+    def add(cls,title,coords,**prop):
+        return srv.addFeature(m,{'properties':dict(prop,**{'class':cls,'title':title}),'geometry':{'type':'Polygon','coordinates':coords}})['id']
+    ids={
+        'A':add('Assignment','A',rectangle(0,39,0.06,39.1),letter='A',operationalPeriodId=op1,folderId=folder),
+        'B':add('Assignment','B',rectangle(0.05,39,0.1,39.05),letter='B',operationalPeriodId=op1),
+        'C':add('Assignment','C',rectangle(0.08,39.04,0.1,39.06),letter='C',operationalPeriodId=op2,folderId=folder)}
+    srv.addFeature(m,{'properties':{'class':'Assignment','title':'L','letter':'L'},'geometry':{'type':'LineString','coordinates':[[0,39],[0.1,39.1]]}})
+    add('Shape','search',rectangle(0,39,0.1,39.1))
+    # reference shapes, to measure the expected areas with getMeasurements
+    ids['AB']=add('Shape','AB',rectangle(0.05,39,0.06,39.05))
+    ids['BC']=add('Shape','BC',rectangle(0.08,39.04,0.1,39.05))
+    return (srv,m,ids)
+
+def test_analyzeCoverage():
+    (srv,m,ids)=coverageMap()
+    sts=newSession(srv,m)
+    area=lambda name: sts.getMeasurements([ids[name]])[ids[name]]['area']
+    search=sts.getFeature(title='search')['id']
+    r=sts.analyzeCoverage(boundary='search')
+    assert r['assignments']==[ids['A'],ids['B'],ids['C']] # the line assignment is ignored
+    assert [o['ids'] for o in r['overlaps']]==[[ids['A'],ids['B']],[ids['B'],ids['C']]]
+    for (o,name) in zip(r['overlaps'],['AB','BC']):
+        assert abs(o['area']-area(name))<1e-6*area(name)
+    assert r['coverage'].equals(shapely.union_all([shapely.box(0,39,0.06,39.1),shapely.box(0.05,39,0.1,39.05),shapely.box(0.08,39.04,0.1,39.06)]))
+    boundaryArea=sts.getMeasurements([search])[search]['area']
+    assert abs(r['boundaryArea']-boundaryArea)<1e-6*boundaryArea
+    # the one gap is the L-shaped area north of B and outside C
+    assert len(r['gaps'])==1 and r['gaps'][0]['geometry'].equals(shapely.box(0.06,39.05,0.1,39.1).difference(shapely.box(0.08,39.04,0.1,39.06)))
+    assert abs(r['gapArea']+r['coveredFraction']*r['boundaryArea']-r['boundaryArea'])<1e-6*r['boundaryArea']
+    assert abs(r['coveredFraction']-0.82)<0.005 # 1-0.0018/0.01 square degrees
+
+def test_analyzeCoverage_filters():
+    (srv,m,ids)=coverageMap()
+    sts=newSession(srv,m)
+    r=sts.analyzeCoverage(operationalPeriod='op1')
+    assert r['assignments']==[ids['A'],ids['B']]
+    assert [o['ids'] for o in r['overlaps']]==[[ids['A'],ids['B']]]
+    assert r['gaps']==[] and r['gapArea'] is None and r['coveredFraction'] is None
+    r=sts.analyzeCoverage(folder='north')
+    assert r['assignments']==[ids['A'],ids['C']] and r['overlaps']==[]
+    r=sts.analyzeCoverage(boundary='search',minArea=1e9) # overlaps and gaps are smaller than 1000 km^2
+    assert r['overlaps']==[] and r['gaps']==[] and r['gapArea']==0
+    assert sts.analyzeCoverage(operationalPeriod='nope') is False
+    assert sts.analyzeCoverage(boundary='nope') is False
+    assert sts.analyzeCoverage(boundary='L') is False # not a polygon
+
+#-----------------------------------------------------------------------------
+# write-behind edit buffer and delete rollback
+#-----------------------------------------------------------------------------
+
+@pytest.fixture
+def markerMap():
+    srv=FakeCalTopoServer(seed=1)
+    m=srv.addMap()
+    srv.populate(m,markers=5)
+    return (srv,m)
+
+def serverFeature(srv,mapID,id):
+    return [f for f in srv.getMapFeatures(mapID) if f['id']==id][0]
+
+def test_edits_are_coalesced(markerMap):
+    (srv,m)=markerMap
+    sts=newSession(srv,m,editCoalesceWindow=10)
+    marker=sts.getFeatures(featureClass='Marker')[0]
+    srv.resetStats()
+    for i in range(5):
+        sts.editFeature(id=marker['id'],properties={'description':str(i)})
+    sts.editFeature(id=marker['id'],geometry={'coordinates':[-120,39,0,0]})
+    assert srv.requestCounts[('POST','Marker')]==0
+    assert sts.flushEdits()=={marker['id']:marker['id']}
+    assert srv.requestCounts[('POST','Marker')]==1
+    f=serverFeature(srv,m,marker['id'])
+    assert f['properties']['description']=='4'
+    assert f['geometry']['coordinates'][0:2]==[-120,39]
+    assert sts.flushEdits()=={}
+
+def test_buffered_edit_does_not_overwrite_later_write(markerMap):
+    (srv,m)=markerMap
+    sts=newSession(srv,m,editCoalesceWindow=10)
+    marker=sts.getFeatures(featureClass='Marker')[0]
+    srv.resetStats()
+    sts.editFeature(id=marker['id'],properties={'description':'buffered'})
+    sts.editFeature(id=marker['id'],properties={'description':'immediate'},coalesce=False)
+    assert srv.requestCounts[('POST','Marker')]==2 # the buffered edit was sent first
+    assert sts.flushEdits()=={}
+    assert serverFeature(srv,m,marker['id'])['properties']['description']=='immediate'
+    # a buffered geometry edit must not overwrite a later write that does not go through the buffer
+    mid=sts.addMarker(39,-120,title='M')
+    sts.editFeature(id=mid,geometry={'type':'Point','coordinates':[-121,38]})
+    sts.addMarker(37,-122,title='M2',existingId=mid)
+    sts.flushEdits()
+    f=serverFeature(srv,m,mid)
+    assert f['properties']['title']=='M2'
+    assert f['geometry']['coordinates'][0:2]==[-122,37]
+
+def test_flush_thread_waits_for_write_in_flight(markerMap):
+    (srv,m)=markerMap
+    sts=newSession(srv,m,editCoalesceWindow=0.01)
+    marker=sts.getFeatures(featureClass='Marker')[0]
+    passes=[]
+    class CountingDict(dict):
+        def items(self):
+            passes.append(None) # once per pass of the flush loop
+            return super().items()
+    sts.pendingEdits=CountingDict()
+    srv.latency=0.5
+    immediate=threading.Thread(target=sts.editFeature,kwargs={'id':marker['id'],'properties':{'description':'immediate'},'coalesce':False})
+    immediate.start()
+    time.sleep(0.1)
+    srv.latency=0
+    sts.editFeature(id=marker['id'],properties={'description':'buffered'})
+    immediate.join()
+    sts.flushEdits()
+    # the buffered edit was due while the immediate write was in flight; the flush thread waited
+    #  to be notified instead of polling
+    assert len(passes)<20
+    assert serverFeature(srv,m,marker['id'])['properties']['description']=='buffered'
+
+def test_delete_drops_buffered_edit(markerMap):
+    (srv,m)=markerMap
+    sts=newSession(srv,m,editCoalesceWindow=10)
+    marker=sts.getFeatures(featureClass='Marker')[0]
+    sts.editFeature(id=marker['id'],properties={'description':'buffered'})
+    srv.resetStats()
+    assert sts.delFeature(marker['id'])
+    assert sts.flushEdits()=={}
+    assert srv.requestCounts[('POST','Marker')]==0
+    assert marker['id'] not in [f['id'] for f in srv.getMapFeatures(m)]
+
+def test_failed_delete_is_rolled_back(markerMap):
+    (srv,m)=markerMap
+    sts=newSession(srv,m)
+    (a,b)=sts.getFeatures(featureClass='Marker')[0:2]
+    deleted=[]
+    added=[]
+    sts.deletedFeatureCallback=lambda id,fClass: deleted.append(id)
+    sts.newFeatureCallback=lambda f: added.append(f['id'])
+    srv.failNext(1)
+    r=sts.delFeatures([a])
+    assert r=={a['id']:False}
+    assert deleted==[a['id']] and added==[a['id']]
+    assert sts.getFeature(id=a['id']) # back in the cache, and findable through the index
+    assert a['id'] in [f['id'] for f in srv.getMapFeatures(m)]
+    r=sts.delFeatures([b])
+    assert r[b['id']]
+    assert not sts.getFeatures(id=b['id'])
+    assert b['id'] not in [f['id'] for f in srv.getMapFeatures(m)]
+
+def test_delete_with_lowercase_class(markerMap):
+    (srv,m)=markerMap
+    sts=newSession(srv,m)
+    marker=sts.getFeatures(featureClass='Marker')[0]
+    deleted=[]
+    sts.deletedFeatureCallback=lambda id,fClass: deleted.append((id,fClass))
+    r=sts.delFeatures([{'id':marker['id'],'class':'marker'}])
+    assert r[marker['id']]
+    assert deleted==[(marker['id'],'Marker')]
+    assert not sts.getFeatures(id=marker['id'])
+    assert marker['id'] not in sts.mapData['ids']['Marker']
+    assert marker['id'] not in [f['id'] for f in srv.getMapFeatures(m)]
+
+#-----------------------------------------------------------------------------
+# in-flight write tracking and syncPause
+#-----------------------------------------------------------------------------
+
+def test_syncPause_tracks_writes_in_flight(markerMap):
+    (srv,m)=markerMap
+    sts=newSession(srv,m)
+    assert not sts.syncPause and sts.inFlightWrites==0
+    srv.latency=0.3
+    write=threading.Thread(target=sts.addMarker,args=(39,-120),kwargs={'title':'slow'})
+    write.start()
+    time.sleep(0.1)
+    assert sts.syncPause and sts.inFlightWrites==1
+    assert not sts._waitForWrites(0.05) # timed out
+    assert sts._waitForWrites(5)
+    write.join()
+    assert not sts.syncPause and sts.inFlightWrites==0
+
+def test_syncPause_setter_holds_off_sync(markerMap):
+    (srv,m)=markerMap
+    sts=SartopoSession('localhost:8080',m,sync=True,syncInterval=0.1,transport=srv.transport())
+    try:
+        time.sleep(0.3)
+        sts.syncPause=True
+        assert sts.syncPause
+        time.sleep(0.3) # let a sync that already started finish
+        count=sts.syncCompletedCount
+        time.sleep(0.5)
+        assert sts.syncCompletedCount==count
+        sts.syncPause=False
+        assert not sts.syncPause
+        time.sleep(0.5)
+        assert sts.syncCompletedCount>count
+    finally:
+        sts.sync=False
+
+#-----------------------------------------------------------------------------
+# capture and replay
+#-----------------------------------------------------------------------------
+
+def test_capture_and_replay(tmp_path):
+    credentialKey=base64.b64encode(b'k'*20).decode()
+    srv=FakeCalTopoServer(credentials={'ABCDEFGHIJKL':credentialKey},seed=1)
+    m=srv.addMap()
+    srv.populate(m,markers=50,assignments=5)
+    captureFile=str(tmp_path/'test.capture.gz')
+    sts=SartopoSession('caltopo.com',id='ABCDEFGHIJKL',key=credentialKey,accountId=srv.accountId,sync=False,captureFile=captureFile)
+    srv.mount(sts)
+    sts.openMap(m)
+    for i in range(3):
+        sts.addMarker(39,-120,'x'+str(i))
+        sts._doSync()
+    sts.captureWriter.close()
+    records=list(readCapture(captureFile))
+    assert [r['m'] for r in records].count('POST')==3
+    assert all(r['s']==200 for r in records)
+    # credentials are redacted
+    with gzip.open(captureFile,'rt') as f:
+        text=f.read()
+    assert 'ABCDEFGHIJKL' not in text and credentialKey not in text
+    assert all(r['p']['signature']=='.....' for r in records if 'p' in r)
+    # replay: the initial sync plus one per _doSync, with the same cache size as the live session
+    stats=replaySync(captureFile)
+    assert [s['sync'] for s in stats]==[0,1,2,3]
+    assert stats[0]['features']==55
+    assert stats[-1]['features']==len(sts.mapData['state']['features'])==58
+
+def test_replay_adapter_unmatched_request():
+    records=[{'t':0,'m':'GET','u':'https://caltopo.com/api/v1/map/ABC/since/123','s':200,'e':1,'b':'{"status":"ok"}'}]
+    adapter=ReplayAdapter(records)
+    s=requests.Session()
+    s.mount('https://',adapter)
+    # the since timestamp is ignored when matching
+    assert s.get('https://caltopo.com/api/v1/map/ABC/since/456').json()=={'status':'ok'}
+    assert adapter.remaining()==0
+    r=s.get('https://caltopo.com/api/v1/map/ABC/since/789')
+    assert r.status_code==404 and adapter.unmatched==1
+
+#-----------------------------------------------------------------------------
+# account data
+#-----------------------------------------------------------------------------
+
+class UrlRecorder():
+    """Transport wrapper that records the URL of every request."""
+    def __init__(self,transport):
+        self.transport=transport
+        self.urls=[]
+    def request(self,method,url,**kwargs):
+        self.urls.append(url)
+        return self.transport.request(method,url,**kwargs)
+    def reset(self):
+        self.transport.reset()
+    def close(self):
+        self.transport.close()
+
+def test_account_data_is_merged_incrementally():
+    srv=FakeCalTopoServer(groupAccounts={'GRP001':'SAR Team'},seed=1)
+    m=srv.addMap(title='one')
+    g=srv.addMap(title='team map',accountId='GRP001')
+    transport=UrlRecorder(srv.transport())
+    sts=SartopoSession('localhost:8080',sync=False,accountId=srv.accountId,transport=transport)
+    assert [x['title'] for x in sts.getMapList()]==['one']
+    assert sts.getGroupAccountTitles()==['SAR Team']
+    assert transport.urls[-1].endswith('/since/0')
+    version=sts.accountDataVersion
+    # new map and bookmark: only the changes are requested, and merged
+    m2=srv.addMap(title='two')
+    srv.addBookmark(m,title='bm')
+    assert sorted(x['title'] for x in sts.getMapList(refresh=True))==['bm','one','two']
+    assert not transport.urls[-1].endswith('/since/0')
+    assert sts.accountDataVersion==version+1
+    # no changes: the version, and so the account indexes, stay the same
+    groupAccounts=sts.groupAccounts
+    sts.getMapList(refresh=True)
+    assert sts.accountDataVersion==version+1
+    # deleted map: the server's id list drops it
+    del srv.maps[m2]
+    srv.acctIdsChanged=srv._now()
+    assert sorted(x['title'] for x in sts.getMapList(refresh=True))==['bm','one']
+    assert sts.groupAccounts is groupAccounts # group accounts did not change
+    assert sts.getMapTitle(g)=='team map'
+    # full=True starts over
+    sts.getAccountData(full=True)
+    assert transport.urls[-1].endswith('/since/0')
+
+#-----------------------------------------------------------------------------
+# transport
+#-----------------------------------------------------------------------------
+
+def test_assigning_requests_session(tmp_path):
+    # .s used to be a plain requests session attribute; assigning it still works, and capture still records
+    credentialKey=base64.b64encode(b'k'*20).decode()
+    srv=FakeCalTopoServer(credentials={'ABCDEFGHIJKL':credentialKey},seed=1)
+    m=srv.addMap()
+    captureFile=str(tmp_path/'test.capture')
+    sts=SartopoSession('caltopo.com',id='ABCDEFGHIJKL',key=credentialKey,accountId=srv.accountId,sync=False,captureFile=captureFile)
+    session=requests.Session()
+    session.mount('https://caltopo.com/',srv.adapter())
+    sts.s=session
+    assert sts.s is session
+    sts.openMap(m)
+    id=sts.addMarker(39,-120,title='through requests')
+    assert serverFeature(srv,m,id)['properties']['title']=='through requests'
+    sts.captureWriter.close()
+    assert [r['m'] for r in readCapture(captureFile)]==['GET','POST']